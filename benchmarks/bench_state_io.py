@@ -0,0 +1,167 @@
+"""State I/O benchmark: history operations at 10k-1M index.jsonl entries.
+
+Generates a synthetic history per scale (mostly chat messages, with
+function_call / function_call_output pairs whose outputs are a few KB and
+occasionally tens of KB) and measures each operation on a fresh copy of it:
+wall time over --repeats runs (p50/p95) and peak Python heap in a separate
+tracemalloc run.
+
+The default run stops at 100k entries and the stored baseline only covers
+10k and 100k: the 1M history is ~0.9 GB on disk and each operation copies
+it, so it is opt-in. Pass --scales to include it (results at 1M are reported
+but have no baseline to compare against).
+
+    python benchmarks/bench_state_io.py                       # 10k and 100k entries
+    python benchmarks/bench_state_io.py --scales 10000,100000,1000000
+    python benchmarks/bench_state_io.py --baseline benchmarks/baselines/state_io.json
+    python benchmarks/bench_state_io.py --update-baseline     # rewrite the stored baseline
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from bench_common import compare, environment, summarize, write_report
+from bench_turns import isolated_state
+
+import minimal_memory_chat as chat
+from research_manager.tools import context_manager
+
+BASELINE_PATH = Path(__file__).resolve().parent / "baselines" / "state_io.json"
+DEFAULT_SCALES = (10_000, 100_000)
+APPENDS_PER_RUN = 100
+
+
+def generate_history(path: Path, entries: int, seed: int = 0) -> int:
+    """Write entries synthetic items; returns the file size in bytes."""
+    rng = random.Random(seed)
+    words = "the model paper results method baseline dataset claim evidence experiment ablation".split()
+    written = 0
+    with open(path, "w", encoding="utf-8") as f:
+        while written < entries:
+            if rng.random() < 0.15 and entries - written >= 2:
+                call_id = f"call_{written}"
+                code = "papers = s2_search_papers(query)\n" * rng.randint(1, 5)
+                f.write(json.dumps({"type": "function_call", "name": "python", "call_id": call_id, "arguments": json.dumps({"code": code})}) + "\n")
+                size = 30_000 if rng.random() < 0.05 else rng.randint(500, 4_000)
+                output = json.dumps({"ok": True, "stdout": "", "result": "r" * size})
+                f.write(json.dumps({"type": "function_call_output", "call_id": call_id, "output": output}) + "\n")
+                written += 2
+            else:
+                role = "user" if written % 2 == 0 else "assistant"
+                content = " ".join(rng.choice(words) for _ in range(rng.randint(10, 120)))
+                f.write(json.dumps({"role": role, "content": content}) + "\n")
+                written += 1
+    return path.stat().st_size
+
+
+def _operations(index: Path, memory_dir: Path) -> Dict[str, Callable[[], Any]]:
+    paths = context_manager.ContextPaths(index_path=index, memory_dir=memory_dir)
+    entries: List[Dict[str, Any]] = []
+
+    def write_entries() -> None:
+        if not entries:
+            entries.extend(chat.read_index_entries())
+        chat.write_index_entries(entries)
+
+    def appends() -> None:
+        for i in range(APPENDS_PER_RUN):
+            chat.append_item({"role": "user", "content": f"appended message {i}"})
+
+    return {
+        "read_index_entries": chat.read_index_entries,
+        "build_model_history": lambda: chat.build_model_history_items(chat.read_index_entries()),
+        f"append_item_x{APPENDS_PER_RUN}": appends,
+        "write_index_entries": write_entries,
+        "delete_index_line": lambda: chat.delete_index_line(1),
+        "snapshot_index": lambda: context_manager.snapshot_index(paths, label="bench"),
+        "prune_keep_last_messages": lambda: context_manager.prune_index_keep_last_messages(paths, keep_last=50),
+        "prune_keep_last_dialog_turns": lambda: context_manager.prune_index_keep_last_dialog_turns(paths, keep_last_turns=80),
+    }
+
+
+def run_benchmark(scales: List[int], repeats: int = 3, memory: bool = True, only: List[str] | None = None) -> Dict[str, Any]:
+    results: Dict[str, Dict[str, Any]] = {}
+    files: Dict[str, int] = {}
+    with tempfile.TemporaryDirectory(prefix="rm-bench-state-") as tmp:
+        root = Path(tmp)
+        for scale in scales:
+            template = root / f"history_{scale}.jsonl"
+            files[str(scale)] = generate_history(template, scale)
+            with isolated_state(root / f"state_{scale}") as index:
+                memory_dir = index.parent / "memory"
+                for name, op in _operations(index, memory_dir).items():
+                    if only and name not in only:
+                        continue
+                    times: List[float] = []
+                    for _ in range(repeats):
+                        shutil.copyfile(template, index)
+                        t0 = time.perf_counter()
+                        op()
+                        times.append(time.perf_counter() - t0)
+                        shutil.rmtree(memory_dir, ignore_errors=True)
+                    stats: Dict[str, Any] = summarize(times)
+                    if memory:
+                        shutil.copyfile(template, index)
+                        tracemalloc.start()
+                        op()
+                        stats["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+                        tracemalloc.stop()
+                        shutil.rmtree(memory_dir, ignore_errors=True)
+                    results[f"{name}@{scale}"] = stats
+                    print(
+                        f"{name + '@' + str(scale):<40}{stats['p50'] * 1000:>12.2f} ms"
+                        + (f"{stats['peak_bytes'] / 1e6:>12.1f} MB" if memory else ""),
+                        flush=True,
+                    )
+    return {
+        "benchmark": "state_io",
+        "params": {"scales": scales, "repeats": repeats},
+        "environment": environment(),
+        "history_bytes": files,
+        "results": results,
+    }
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", default=",".join(map(str, DEFAULT_SCALES)), help="Comma-separated entry counts")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--only", default="", help="Comma-separated operation names")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc pass")
+    parser.add_argument("--out", type=Path, help="Write the JSON report here")
+    parser.add_argument("--baseline", type=Path, help="Exit 1 if time (p50) or peak memory regressed vs this report")
+    parser.add_argument("--update-baseline", action="store_true", help=f"Write the report to {BASELINE_PATH}")
+    parser.add_argument("--max-ratio", type=float, default=1.5)
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(
+        [int(s) for s in args.scales.split(",") if s.strip()],
+        repeats=args.repeats,
+        memory=not args.no_memory,
+        only=[s for s in args.only.split(",") if s] or None,
+    )
+    for path in filter(None, [args.out, BASELINE_PATH if args.update_baseline else None]):
+        write_report(path, report)
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))["results"]
+        failures = compare(report["results"], baseline, metric="p50", max_ratio=args.max_ratio)
+        if not args.no_memory:
+            failures += compare(report["results"], baseline, metric="peak_bytes", max_ratio=args.max_ratio, min_delta=1 << 20)
+        for line in failures:
+            print(f"REGRESSION {line}")
+        return 1 if failures else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,176 @@
+"""End-to-end chat turn latency benchmark against the local Responses stand-in.
+
+Drives minimal_memory_chat.run_turn (the turn logic behind main()) for N
+turns on a synthetic, growing history in a temporary state directory and
+reports p50/p95 per stage (history_read, request_build, model, tool_exec,
+append) and per turn. No API key or network is used.
+
+    python benchmarks/bench_turns.py --turns 100 --history 5000
+    python benchmarks/bench_turns.py --out benchmarks/results/turns.json
+    python benchmarks/bench_turns.py --baseline benchmarks/results/turns.json  # exit 1 on p95 regressions
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Iterator, List
+
+from bench_common import compare, environment, summarize, write_report
+
+import minimal_memory_chat as chat
+from research_manager.state.artifacts import ArtifactStore
+from research_manager.testing.fake_responses import FakeReply, FakeResponsesClient
+
+TOOL_CODE = "total = sum(i * i for i in range(20000))\ntotal"
+
+
+def seed_history(path: Path, entries: int, tool_output_chars: int = 4000) -> None:
+    """Synthetic history: user/assistant messages with a tool call pair every few turns."""
+    with open(path, "w", encoding="utf-8") as f:
+        i = 0
+        while i < entries:
+            f.write(json.dumps({"role": "user", "content": f"question {i}: " + "lorem ipsum " * 20}) + "\n")
+            if i % 3 == 0:
+                call_id = f"seed_{i}"
+                f.write(json.dumps({"type": "function_call", "name": "python", "call_id": call_id, "arguments": "{}"}) + "\n")
+                output = json.dumps({"ok": True, "result": "x" * tool_output_chars})
+                f.write(json.dumps({"type": "function_call_output", "call_id": call_id, "output": output}) + "\n")
+                i += 2
+            f.write(json.dumps({"role": "assistant", "content": f"answer {i}: " + "dolor sit amet " * 40}) + "\n")
+            i += 2
+
+
+def _responder(tool_every: int) -> Any:
+    turn = [0]
+
+    def respond(kwargs: Dict[str, Any]) -> FakeReply:
+        last = kwargs["input"][-1]
+        if last.get("type") == "function_call_output":
+            return FakeReply(text="The tool says " + last["output"][:60])
+        turn[0] += 1
+        if tool_every and turn[0] % tool_every == 0:
+            return FakeReply(text="Let me compute that.", calls=[TOOL_CODE])
+        return FakeReply(text="Here is a direct answer. " * 8)
+
+    return respond
+
+
+@contextlib.contextmanager
+def isolated_state(root: Path) -> Iterator[Path]:
+    """Point the chat module's state at root (restored afterwards)."""
+    root.mkdir(parents=True, exist_ok=True)
+    index = root / "index.jsonl"
+    index.touch()
+    instructions = root / "instructions.md"
+    instructions.write_text("You are a research assistant. " * 50, encoding="utf-8")
+    patch = {
+        "INDEX_PATH": str(index),
+        "INSTRUCTIONS_PATH": str(instructions),
+        "RESPONSE_CHAIN_PATH": str(root / "response_chain.json"),
+        "_ARTIFACT_STORE": ArtifactStore(root / "artifacts"),
+        "_PYTHON_WORKER": None,
+    }
+    saved = {name: getattr(chat, name) for name in patch}
+    for name, value in patch.items():
+        setattr(chat, name, value)
+    try:
+        yield index
+    finally:
+        for name, value in saved.items():
+            setattr(chat, name, value)
+
+
+def run_benchmark(
+    turns: int = 50,
+    history: int = 1000,
+    tool_every: int = 2,
+    latency_ms: float = 0.0,
+    stream: bool = True,
+    chain: bool = True,
+) -> Dict[str, Any]:
+    client = FakeResponsesClient(responder=_responder(tool_every), latency_s=latency_ms / 1000.0)
+    samples: Dict[str, List[float]] = {name: [] for name in chat.TURN_STAGES}
+    samples["total"] = []
+    old_chain = os.environ.get("RM_CHAIN")
+    os.environ["RM_CHAIN"] = "1" if chain else "0"
+    try:
+        with tempfile.TemporaryDirectory(prefix="rm-bench-turns-") as tmp, isolated_state(Path(tmp)) as index:
+            seed_history(index, history)
+            for i in range(turns):
+                with contextlib.redirect_stdout(io.StringIO()):
+                    result = chat.run_turn(client, "bench-model", f"benchmark turn {i}", stream=stream)
+                for name, value in result["stages"].items():
+                    samples[name].append(value)
+                samples["total"].append(result["total_s"])
+            final_bytes = index.stat().st_size
+    finally:
+        if old_chain is None:
+            os.environ.pop("RM_CHAIN", None)
+        else:
+            os.environ["RM_CHAIN"] = old_chain
+    return {
+        "benchmark": "turns",
+        "params": {
+            "turns": turns,
+            "history": history,
+            "tool_every": tool_every,
+            "latency_ms": latency_ms,
+            "stream": stream,
+            "chain": chain,
+        },
+        "environment": environment(),
+        "final_index_bytes": final_bytes,
+        "requests": len(client.requests),
+        "stages": {name: summarize(values) for name, values in samples.items()},
+    }
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    print(f"turns benchmark {json.dumps(report['params'])}")
+    print(f"{'stage':<15}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}")
+    for name, stats in report["stages"].items():
+        print(f"{name:<15}{stats['p50'] * 1000:>10.3f}{stats['p95'] * 1000:>10.3f}{stats['max'] * 1000:>10.3f}")
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turns", type=int, default=50)
+    parser.add_argument("--history", type=int, default=1000, help="Synthetic entries in index.jsonl before the first turn")
+    parser.add_argument("--tool-every", type=int, default=2, help="Every Nth turn makes one python tool call (0: never)")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Simulated model latency per request")
+    parser.add_argument("--no-stream", action="store_true")
+    parser.add_argument("--no-chain", action="store_true", help="RM_CHAIN=0: resend the budgeted history every turn")
+    parser.add_argument("--out", type=Path, help="Write the JSON report here")
+    parser.add_argument("--baseline", type=Path, help="Fail if a stage's p95 regressed vs this report")
+    parser.add_argument("--max-ratio", type=float, default=1.5)
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(
+        turns=args.turns,
+        history=args.history,
+        tool_every=args.tool_every,
+        latency_ms=args.latency_ms,
+        stream=not args.no_stream,
+        chain=not args.no_chain,
+    )
+    print_report(report)
+    if args.out:
+        write_report(args.out, report)
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        failures = compare(report["stages"], baseline["stages"], max_ratio=args.max_ratio)
+        for line in failures:
+            print(f"REGRESSION {line}")
+        return 1 if failures else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,23 +1,39 @@
 import ast
 import contextlib
+import contextvars
 import io
 import json
 import os
 import sys
+import threading
 import time
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 
-from dotenv import dotenv_values, load_dotenv
-from openai import OpenAI
-import requests
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 SRC_DIR = os.path.join(BASE_DIR, "src")
 if SRC_DIR not in sys.path and os.path.isdir(SRC_DIR):
     sys.path.insert(0, SRC_DIR)
 
+from research_manager import tracing
+from research_manager.clients.rate_limit import RateLimiter, TTLCache, cached_call, request_key
+from research_manager.lazy_imports import lazy_import, warm_imports
 from research_manager.state.paths import default_state_paths
+from research_manager.state.sessions import SessionRegistry
+from research_manager.state import response_chain
+from research_manager.state.artifacts import (
+    DEFAULT_THRESHOLD_CHARS as DEFAULT_ARTIFACT_THRESHOLD_CHARS,
+    ArtifactStore,
+    externalize_output,
+)
+from research_manager.tools.briefs import sha256_text
+from research_manager.tools.tool_executor import TeeStringIO, ToolExecutor, capture_stdout
+
+# Heavy third-party modules load on first use to keep startup fast.
+dotenv = lazy_import("dotenv")
+requests = lazy_import("requests")
 
 STATE_PATHS = default_state_paths()
 RM_ENV = STATE_PATHS.env_name
@@ -25,27 +41,138 @@ INSTRUCTIONS_PATH = str(STATE_PATHS.instructions_md)
 INDEX_PATH = str(STATE_PATHS.index_jsonl)
 ENV_PATH = str(STATE_PATHS.env_file)
 PYTHON_GLOBAL_SCOPE: Dict[str, Any] = {}
+DEFAULT_MODEL = "gpt-5.2"
 
 
 # ---- Auto-generated project briefs (lightweight repo memory) ----
 PROJECT_BRIEFS_PATH = str(STATE_PATHS.generated_dir / "_project_briefs.json")
 PROJECT_BRIEFS_META_PATH = str(STATE_PATHS.generated_dir / "_project_briefs_meta.json")
 REPO_MAP_PATH = str(STATE_PATHS.generated_dir / "_repo_map.json")
+REPO_MAP_STATE_PATH = str(STATE_PATHS.generated_dir / "_repo_map_state.json")
+SYMBOL_INDEX_PATH = str(STATE_PATHS.generated_dir / "_symbol_index.json")
+RESPONSE_CHAIN_PATH = str(STATE_PATHS.generated_dir / "_response_chain.json")
 
 
-def _sha256_text(text: str) -> str:
-    import hashlib
-    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+# ---- Sessions: named histories under state/{env}/sessions/ ----
+@dataclass
+class ChatSession:
+    """History file, response chain and (optionally private) python scope of one session.
 
+    With a registry, the history also includes the sealed segments shared with
+    forks (see state/sessions.py). scope=None means the shared interactive scope.
+    """
 
-def _load_json_file(path: str, default: Any) -> Any:
+    session_id: str
+    index_path: str
+    chain_path: str
+    scope: Optional[Dict[str, Any]] = None
+    registry: Optional[SessionRegistry] = None
+
+
+_SESSION: "contextvars.ContextVar[Optional[ChatSession]]" = contextvars.ContextVar("rm_session", default=None)
+# Session of the interactive chat (RM_SESSION / registry "current"); set before the
+# python worker forks so tool calls there see the same history.
+_DEFAULT_SESSION: Optional[ChatSession] = None
+
+
+def _active_session() -> Optional[ChatSession]:
+    return _SESSION.get() or _DEFAULT_SESSION
+
+
+@contextlib.contextmanager
+def use_session(session: ChatSession) -> Iterator[ChatSession]:
+    """Route history reads/writes and tool state to session for the current context."""
+    token = _SESSION.set(session)
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except FileNotFoundError:
-        return default
-    except json.JSONDecodeError:
-        return default
+        yield session
+    finally:
+        _SESSION.reset(token)
+
+
+def current_index_path() -> str:
+    session = _active_session()
+    return session.index_path if session is not None else INDEX_PATH
+
+
+def _current_chain_path() -> str:
+    session = _active_session()
+    return session.chain_path if session is not None else RESPONSE_CHAIN_PATH
+
+
+def _current_scope() -> Dict[str, Any]:
+    session = _active_session()
+    return session.scope if session is not None and session.scope is not None else PYTHON_GLOBAL_SCOPE
+
+
+def _uses_shared_scope() -> bool:
+    session = _active_session()
+    return session is None or session.scope is None
+
+
+def session_registry() -> SessionRegistry:
+    return SessionRegistry(STATE_PATHS.sessions_dir)
+
+
+def open_session(
+    session_id: str,
+    registry: Optional[SessionRegistry] = None,
+    scope: Optional[Dict[str, Any]] = None,
+    create: bool = True,
+) -> ChatSession:
+    """ChatSession for session_id, creating it in the registry if needed (KeyError if not and create=False)."""
+    registry = registry or session_registry()
+    if create:
+        registry.create(session_id, exist_ok=True)
+    elif registry.get(session_id) is None:
+        raise KeyError(f"Unknown session: {session_id}")
+    paths = registry.paths(session_id)
+    return ChatSession(
+        session_id=session_id,
+        index_path=str(paths.index_jsonl),
+        chain_path=str(paths.response_chain),
+        scope=scope,
+        registry=registry,
+    )
+
+
+def _history_paths() -> List[str]:
+    session = _active_session()
+    if session is None:
+        return [INDEX_PATH]
+    if session.registry is None:
+        return [session.index_path]
+    # Re-read per call: another process (the python worker) may have materialized the history.
+    return [str(p) for p in session.registry.history_files(session.session_id)]
+
+
+def context_paths() -> Any:
+    """ContextPaths for the active session, so snapshot/prune see (and rewrite) its whole history."""
+    from research_manager.tools.context_manager import ContextPaths
+
+    session = _active_session()
+    return ContextPaths(
+        index_path=Path(current_index_path()),
+        memory_dir=Path(BASE_DIR) / "memory",
+        registry=session.registry if session is not None else None,
+        session_id=session.session_id if session is not None else None,
+    )
+
+
+def _rewrite_history(data: str) -> None:
+    session = _active_session()
+    with tracing.span("history.rewrite", bytes=len(data)):
+        if session is not None and session.registry is not None:
+            # Shared segments are immutable: the rewritten history becomes this session's own.
+            session.registry.materialize(session.session_id, data.encode("utf-8"))
+            return
+        with open(current_index_path(), "w", encoding="utf-8") as f:
+            f.write(data)
+
+
+def _touch_session() -> None:
+    session = _active_session()
+    if session is not None and session.registry is not None:
+        session.registry.touch(session.session_id)
 
 
 def _write_json_file(path: str, obj: Any) -> None:
@@ -54,107 +181,115 @@ def _write_json_file(path: str, obj: Any) -> None:
         json.dump(obj, f, ensure_ascii=False, indent=2)
 
 
-def build_repo_map(max_files: int = 2000) -> Dict[str, Any]:
-    """Create a lightweight map of the repo to help the assistant navigate."""
-    repo_map: Dict[str, Any] = {"generated_at": time.time(), "files": []}
-    count = 0
-    for root, dirs, files in os.walk(BASE_DIR):
-        # Skip noisy dirs
-        dirs[:] = [d for d in dirs if d not in {".git", "__pycache__", ".venv", "venv", ".pytest_cache"}]
-        for name in files:
-            if name.startswith('.'):  # skip dotfiles
-                continue
-            rel = os.path.relpath(os.path.join(root, name), BASE_DIR)
-            generated_prefix = f"state/{RM_ENV}/generated/"
-            if rel.startswith(f"{generated_prefix}_project_briefs") or rel.startswith(f"{generated_prefix}_repo_map"):
-                continue
-            repo_map["files"].append(rel)
-            count += 1
-            if count >= max_files:
-                repo_map["truncated"] = True
-                return repo_map
-    repo_map["truncated"] = False
-    return repo_map
-
-
-def refresh_project_briefs(client: OpenAI, model: str = "gpt-4.1-mini", force: bool = False) -> Dict[str, Any]:
-    """Summarize each memory/*.md file into memory/_project_briefs.json with caching."""
-    os.makedirs(os.path.join(BASE_DIR, "memory"), exist_ok=True)
+_REPO_MAP_WATCHER: Any = None
 
-    meta: Dict[str, Any] = _load_json_file(PROJECT_BRIEFS_META_PATH, {})
-    briefs: Dict[str, Any] = _load_json_file(PROJECT_BRIEFS_PATH, {})
 
-    updated = []
-    skipped = []
+def _repo_map_state(stat_files: bool = False) -> Dict[str, Any]:
+    """Current repo map state: the watcher's (RM_REPO_MAP_WATCH_S) if it is running, else a refresh."""
+    from research_manager.tools.repo_map import restat_files, update_repo_map_state
 
-    # scan memory/*.md
-    mem_dir = os.path.join(BASE_DIR, "memory")
-    paths = sorted(
-        [os.path.join(mem_dir, p) for p in os.listdir(mem_dir) if p.endswith('.md') and not p.startswith('_')]
+    watcher = _REPO_MAP_WATCHER
+    # The watcher thread does not survive into the forked python worker; is_alive() is False there.
+    if watcher is not None and watcher.is_alive() and watcher.state is not None:
+        return restat_files(watcher.state) if stat_files else watcher.state
+    return update_repo_map_state(
+        Path(BASE_DIR), Path(REPO_MAP_STATE_PATH), extra_ignore=_REPO_MAP_IGNORE, stat_files=stat_files
     )
 
-    for path in paths:
-        rel = os.path.relpath(path, BASE_DIR)
-        try:
-            text = Path(path).read_text(encoding='utf-8')
-        except Exception as exc:  # noqa: BLE001
-            briefs[rel] = {"error": str(exc)}
-            updated.append(rel)
-            continue
 
-        sha = _sha256_text(text)
-        prev = meta.get(rel, {})
-        if not force and prev.get("sha256") == sha:
-            skipped.append(rel)
-            continue
+def build_repo_map(max_files: int = 2000) -> Dict[str, Any]:
+    """Create a lightweight map of the repo to help the assistant navigate.
+
+    Directory listings are cached in REPO_MAP_STATE_PATH, so only directories
+    whose mtime changed since the last call are re-listed.
+    """
+    from research_manager.tools.repo_map import repo_map_from_state
+
+    return repo_map_from_state(_repo_map_state(), max_files=max_files)
+
+
+# Runtime state (histories, metrics, generated files) changes every turn and is not part of the repo.
+_REPO_MAP_IGNORE = ("/state/",)
+_FILE_TABLE_CACHE: Dict[str, Any] = {}
+
+
+def query_repo_files(**filters: Any) -> List[Dict[str, Any]]:
+    """Query repo files by ext/prefix/min_size/max_size/modified_within_s (see FileTable.query).
+
+    Files are re-stat'ed on every query (in-place edits do not change their
+    directory's mtime), and the columnar table is rebuilt only when that or
+    the incremental refresh changed something.
+    """
+    from research_manager.tools.repo_map import FileTable
+
+    state = _repo_map_state(stat_files=True)
+    table = _FILE_TABLE_CACHE.get("table")
+    if table is None or _FILE_TABLE_CACHE.get("dirs") != state["dirs"]:
+        table = FileTable.from_state(state)
+        _FILE_TABLE_CACHE.update(table=table, dirs=state["dirs"])
+    return table.query(**filters)
 
-        prompt = f"""You are summarizing a project research memo for later reuse.
-Return STRICT JSON only.
 
-Schema:
-{{
-  "project_name": string,
-  "one_liner": string,
-  "goal": string,
-  "current_state": string,
-  "key_ideas": [string],
-  "open_questions": [string],
-  "next_actions": [string],
-  "keywords": [string]
-}}
+def find_symbol(name: str, kind: Optional[str] = None, exact: bool = False, limit: int = 50) -> List[Dict[str, Any]]:
+    """Find where Python modules/classes/functions are defined (path + line range).
 
-FILE: {rel}
+    kind: "module" | "class" | "function" | "method". The index is refreshed
+    incrementally from the repo map; only changed .py files are re-parsed.
+    """
+    from research_manager.tools.repo_map import iter_repo_files
+    from research_manager.tools.symbol_index import find_symbols, update_symbol_index
 
-CONTENT:
-{text}
-"""
+    py_files = [p for p in iter_repo_files(_repo_map_state()) if p.endswith(".py")]
+    index = update_symbol_index(Path(BASE_DIR), py_files, Path(SYMBOL_INDEX_PATH))
+    return find_symbols(index, name, kind=kind, exact=exact, limit=limit)
 
+
+def refresh_project_briefs(client: Any, model: str = "gpt-4.1-mini", force: bool = False) -> Dict[str, Any]:
+    """Summarize each memory/*.md file into per-file brief shards with stat/sha caching.
+
+    The briefs live as one JSON file per memo in the returned briefs_dir; read
+    them all with research_manager.tools.briefs.load_briefs(PROJECT_BRIEFS_PATH).
+    """
+    from research_manager.tools.briefs import BriefPaths, refresh_briefs
+
+    os.makedirs(os.path.join(BASE_DIR, "memory"), exist_ok=True)
+
+    # scan memory/*.md
+    mem_dir = os.path.join(BASE_DIR, "memory")
+    paths = sorted(
+        [Path(mem_dir) / p for p in os.listdir(mem_dir) if p.endswith('.md') and not p.startswith('_')]
+    )
+
+    def _summarize(prompt: str) -> str:
         resp = client.responses.create(
             model=model,
             input=prompt,
         )
-        raw = resp.output_text.strip()
-        try:
-            obj = json.loads(raw)
-        except Exception:
-            obj = {"parse_error": True, "raw": raw[:4000]}
-
-        briefs[rel] = obj
-        meta[rel] = {"sha256": sha, "updated_at": time.time(), "model": model}
-        updated.append(rel)
+        return resp.output_text.strip()
+
+    brief_paths = BriefPaths(briefs_path=Path(PROJECT_BRIEFS_PATH), meta_path=Path(PROJECT_BRIEFS_META_PATH))
+    result = refresh_briefs(
+        source_files=paths,
+        base_dir=Path(BASE_DIR),
+        paths=brief_paths,
+        llm_summarize_fn=_summarize,
+        force=force,
+    )
 
     # write repo map too
     repo_map = build_repo_map()
     _write_json_file(REPO_MAP_PATH, repo_map)
 
-    _write_json_file(PROJECT_BRIEFS_PATH, briefs)
-    _write_json_file(PROJECT_BRIEFS_META_PATH, meta)
+    from research_manager.tools.fs_utils import refresh_section_index
+
+    refresh_section_index("memory")
 
     return {
         "ok": True,
-        "updated": updated,
-        "skipped": skipped,
-        "briefs_path": PROJECT_BRIEFS_PATH,
+        "updated": result["updated"],
+        "skipped": result["skipped"],
+        "errors": result["errors"],
+        "briefs_dir": str(brief_paths.shards_dir),
         "repo_map_path": REPO_MAP_PATH,
     }
 
@@ -174,6 +309,39 @@ PYTHON_TOOL = [
 ]
 
 
+_CLAUDE_JOB_POOL: Any = None
+
+
+def claude_jobs(max_workers: int = 2) -> Any:
+    """Shared ClaudeJobPool persisted under state/{env}/generated/claude_jobs/.
+
+    pool.submit(prompt, cwd=..., add_dirs=[...]) -> job_id; pool.status(job_id);
+    pool.wait(job_id, timeout=...); pool.list_jobs(); pool.cancel(job_id).
+    """
+    global _CLAUDE_JOB_POOL
+    if _CLAUDE_JOB_POOL is None:
+        from research_manager.tools.claude_jobs import ClaudeJobPool
+
+        _CLAUDE_JOB_POOL = ClaudeJobPool(STATE_PATHS.generated_dir / "claude_jobs", max_workers=max_workers)
+    return _CLAUDE_JOB_POOL
+
+
+_CLAUDE_CACHE: Any = None
+
+
+def claude_cache(ttl_s: float = 24 * 3600) -> Any:
+    """Shared ClaudeResultCache under state/{env}/generated/claude_cache/.
+
+    Opt-in for read-only prompts: run_claude(prompt, cwd=..., cache=claude_cache()).
+    """
+    global _CLAUDE_CACHE
+    if _CLAUDE_CACHE is None:
+        from research_manager.tools.claude_cache import ClaudeResultCache
+
+        _CLAUDE_CACHE = ClaudeResultCache(STATE_PATHS.generated_dir / "claude_cache", ttl_s=ttl_s)
+    return _CLAUDE_CACHE
+
+
 def ensure_files() -> None:
     if not os.path.exists(INSTRUCTIONS_PATH):
         raise FileNotFoundError(f"Missing required file: {INSTRUCTIONS_PATH}")
@@ -195,17 +363,21 @@ def load_instructions() -> str:
 
 def read_index_entries() -> List[Dict[str, Any]]:
     entries: List[Dict[str, Any]] = []
-    with open(INDEX_PATH, "r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                obj = json.loads(line)
-                if isinstance(obj, dict):
-                    entries.append(obj)
-            except json.JSONDecodeError:
-                continue
+    with tracing.span("history.read") as sp:
+        for path in _history_paths():
+            sp.add("bytes", os.path.getsize(path))
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        obj = json.loads(line)
+                        if isinstance(obj, dict):
+                            entries.append(obj)
+                    except json.JSONDecodeError:
+                        continue
+        sp.set(entries=len(entries))
     return entries
 
 
@@ -223,7 +395,7 @@ def build_model_history_items(entries: List[Dict[str, Any]]) -> List[Dict[str, A
 def append_item(item: Dict[str, Any]) -> Dict[str, Any]:
     if not isinstance(item, dict):
         raise ValueError("item must be a JSON object")
-    with open(INDEX_PATH, "a", encoding="utf-8") as f:
+    with open(current_index_path(), "a", encoding="utf-8") as f:
         f.write(json.dumps(item, ensure_ascii=True) + "\n")
     return item
 
@@ -234,22 +406,21 @@ def append_message(role: str, content: str) -> Dict[str, Any]:
 
 
 def write_index_entries(entries: List[Dict[str, Any]]) -> int:
-    with open(INDEX_PATH, "w", encoding="utf-8") as f:
-        for entry in entries:
-            f.write(json.dumps(entry, ensure_ascii=True) + "\n")
+    _rewrite_history("".join(json.dumps(entry, ensure_ascii=True) + "\n" for entry in entries))
     return len(entries)
 
 
 def delete_index_line(line_number: int) -> bool:
     if line_number < 1:
         return False
-    with open(INDEX_PATH, "r", encoding="utf-8") as f:
-        lines = f.readlines()
+    lines: List[str] = []
+    for path in _history_paths():
+        with open(path, "r", encoding="utf-8") as f:
+            lines.extend(f.readlines())
     if line_number > len(lines):
         return False
     del lines[line_number - 1]
-    with open(INDEX_PATH, "w", encoding="utf-8") as f:
-        f.writelines(lines)
+    _rewrite_history("".join(lines))
     return True
 
 
@@ -259,123 +430,202 @@ def recent_entries(limit: int = 20) -> List[Dict[str, Any]]:
     return entries[-limit:]
 
 
-def run_python(code: str) -> Dict[str, Any]:
-    # Ensure tool calls always see latest .env values.
-    load_dotenv(dotenv_path=ENV_PATH, override=True)
-    for key, value in dotenv_values(ENV_PATH).items():
+_S2_PAPER_FIELDS = ",".join(
+    [
+        "paperId",
+        "title",
+        "authors",
+        "year",
+        "abstract",
+        "url",
+        "venue",
+        "citationCount",
+        "influentialCitationCount",
+        "openAccessPdf",
+        "externalIds",
+    ]
+)
+_S2_RECOMMEND_FIELDS = ",".join(
+    [
+        "paperId",
+        "title",
+        "authors",
+        "year",
+        "abstract",
+        "url",
+        "venue",
+        "citationCount",
+        "openAccessPdf",
+        "externalIds",
+    ]
+)
+
+
+def get_env(name: str, default: Optional[str] = None) -> Optional[str]:
+    return os.getenv(name, default)
+
+
+def _s2_key() -> str:
+    s2_key = os.getenv("S2_KEY")
+    if not s2_key:
+        raise ValueError("S2_KEY is not set in environment.")
+    return s2_key
+
+
+# Shared by every session in this process: S2 allows ~1 request/s per key.
+S2_LIMITER = RateLimiter(float(os.getenv("RM_S2_MIN_INTERVAL_S", "1.0")))
+S2_CACHE = TTLCache(ttl_s=float(os.getenv("RM_S2_CACHE_TTL_S", "3600")), max_entries=2048)
+
+
+def _s2_get(endpoint: str, url: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    def _fetch() -> Dict[str, Any]:
+        response = requests.get(url, headers={"x-api-key": _s2_key()}, params=params, timeout=30)
+        tracing.current_span().set(status=response.status_code, bytes=len(response.content))
+        response.raise_for_status()
+        return response.json()
+
+    with tracing.span("s2.request", endpoint=endpoint):
+        return cached_call(S2_CACHE, S2_LIMITER, request_key(url, params), _fetch)
+
+
+def s2_search_papers(query: str, limit: int = 20, year: Optional[str] = None) -> Dict[str, Any]:
+    params: Dict[str, Any] = {
+        "query": query,
+        "limit": max(1, min(limit, 100)),
+        "fields": _S2_PAPER_FIELDS,
+    }
+    if year:
+        params["year"] = year
+    return _s2_get("search", "https://api.semanticscholar.org/graph/v1/paper/search", params)
+
+
+def s2_paper_details(paper_id: str) -> Dict[str, Any]:
+    return _s2_get("paper", f"https://api.semanticscholar.org/graph/v1/paper/{paper_id}", {"fields": _S2_PAPER_FIELDS})
+
+
+def s2_recommend_papers(paper_id: str, limit: int = 20) -> Dict[str, Any]:
+    return _s2_get(
+        "recommendations",
+        f"https://api.semanticscholar.org/recommendations/v1/papers/forpaper/{paper_id}",
+        {"limit": max(1, min(limit, 100)), "fields": _S2_RECOMMEND_FIELDS},
+    )
+
+
+def http_get(url: str, params: Optional[Dict[str, Any]] = None, timeout: int = 30) -> Dict[str, Any]:
+    response = requests.get(url, params=params, timeout=timeout)
+    response.raise_for_status()
+    content_type = response.headers.get("content-type", "")
+    if "application/json" in content_type.lower():
+        return {"status_code": response.status_code, "json": response.json()}
+    return {"status_code": response.status_code, "text": response.text}
+
+
+def _file_sig(path: str) -> Optional[Tuple[int, int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_size, st.st_mtime_ns, st.st_ino)
+
+
+_RUNTIME: Dict[str, Any] = {
+    "scope": None,
+    "env_sig": None,
+    "instructions_path": None,
+    "instructions_sig": None,
+    "instructions_text": None,
+    "instructions_sha": None,
+    "instructions_active": 0,
+    "stats": {"calls": 0, "overhead_s": 0.0, "last_overhead_s": 0.0, "env_reloads": 0, "instructions_reads": 0},
+}
+
+
+def _refresh_env() -> None:
+    """Re-apply .env to os.environ, but only when its stat signature changed."""
+    sig = _file_sig(ENV_PATH)
+    if sig == _RUNTIME["env_sig"]:
+        return
+    for key, value in dotenv.dotenv_values(ENV_PATH).items():
         if value is not None:
             os.environ[key] = value
+    _RUNTIME["env_sig"] = sig
+    _RUNTIME["stats"]["env_reloads"] += 1
+
 
-    stdout = io.StringIO()
-    instructions_original = None
-    instructions_exists = os.path.exists(INSTRUCTIONS_PATH)
-    if instructions_exists:
+def _instructions_baseline() -> None:
+    """Cache instructions.md text + hash; re-read only if its stat signature changed since last call."""
+    sig = _file_sig(INSTRUCTIONS_PATH)
+    if _RUNTIME["instructions_path"] == INSTRUCTIONS_PATH and sig == _RUNTIME["instructions_sig"]:
+        return
+    text = None
+    if sig is not None:
         with open(INSTRUCTIONS_PATH, "r", encoding="utf-8") as _f:
-            instructions_original = _f.read()
-
-    def get_env(name: str, default: Optional[str] = None) -> Optional[str]:
-        return os.getenv(name, default)
-
-    def s2_search_papers(query: str, limit: int = 20, year: Optional[str] = None) -> Dict[str, Any]:
-        s2_key = os.getenv("S2_KEY")
-        if not s2_key:
-            raise ValueError("S2_KEY is not set in environment.")
-        fields = ",".join(
-            [
-                "paperId",
-                "title",
-                "authors",
-                "year",
-                "abstract",
-                "url",
-                "venue",
-                "citationCount",
-                "influentialCitationCount",
-                "openAccessPdf",
-                "externalIds",
-            ]
-        )
-        params: Dict[str, Any] = {
-            "query": query,
-            "limit": max(1, min(limit, 100)),
-            "fields": fields,
-        }
-        if year:
-            params["year"] = year
-        response = requests.get(
-            "https://api.semanticscholar.org/graph/v1/paper/search",
-            headers={"x-api-key": s2_key},
-            params=params,
-            timeout=30,
-        )
-        response.raise_for_status()
-        return response.json()
+            text = _f.read()
+        _RUNTIME["stats"]["instructions_reads"] += 1
+    _RUNTIME.update(
+        instructions_path=INSTRUCTIONS_PATH,
+        instructions_sig=sig,
+        instructions_text=text,
+        instructions_sha=sha256_text(text) if text is not None else None,
+    )
 
-    def s2_paper_details(paper_id: str) -> Dict[str, Any]:
-        s2_key = os.getenv("S2_KEY")
-        if not s2_key:
-            raise ValueError("S2_KEY is not set in environment.")
-        fields = ",".join(
-            [
-                "paperId",
-                "title",
-                "authors",
-                "year",
-                "abstract",
-                "url",
-                "venue",
-                "citationCount",
-                "influentialCitationCount",
-                "openAccessPdf",
-                "externalIds",
-            ]
-        )
-        response = requests.get(
-            f"https://api.semanticscholar.org/graph/v1/paper/{paper_id}",
-            headers={"x-api-key": s2_key},
-            params={"fields": fields},
-            timeout=30,
-        )
-        response.raise_for_status()
-        return response.json()
 
-    def s2_recommend_papers(paper_id: str, limit: int = 20) -> Dict[str, Any]:
-        s2_key = os.getenv("S2_KEY")
-        if not s2_key:
-            raise ValueError("S2_KEY is not set in environment.")
-        fields = ",".join(
-            [
-                "paperId",
-                "title",
-                "authors",
-                "year",
-                "abstract",
-                "url",
-                "venue",
-                "citationCount",
-                "openAccessPdf",
-                "externalIds",
-            ]
-        )
-        response = requests.get(
-            f"https://api.semanticscholar.org/recommendations/v1/papers/forpaper/{paper_id}",
-            headers={"x-api-key": s2_key},
-            params={"limit": max(1, min(limit, 100)), "fields": fields},
-            timeout=30,
-        )
-        response.raise_for_status()
-        return response.json()
+# Guards the instructions baseline and restore against concurrent run_python calls.
+_INSTRUCTIONS_LOCK = threading.Lock()
 
-    def http_get(url: str, params: Optional[Dict[str, Any]] = None, timeout: int = 30) -> Dict[str, Any]:
-        response = requests.get(url, params=params, timeout=timeout)
-        response.raise_for_status()
-        content_type = response.headers.get("content-type", "")
-        if "application/json" in content_type.lower():
-            return {"status_code": response.status_code, "json": response.json()}
-        return {"status_code": response.status_code, "text": response.text}
 
+def _enter_instructions_guard() -> None:
+    """Re-capture the baseline only when no other call is running, so one call's rewrite never becomes the next's baseline."""
+    with _INSTRUCTIONS_LOCK:
+        if _RUNTIME["instructions_active"] == 0:
+            _instructions_baseline()
+        _RUNTIME["instructions_active"] += 1
 
 
+def _exit_instructions_guard() -> bool:
+    with _INSTRUCTIONS_LOCK:
+        _RUNTIME["instructions_active"] -= 1
+        return _restore_instructions()
+
+
+def _restore_instructions() -> bool:
+    """Hard guard: instructions.md is immutable at runtime. Returns True if it had to be reverted."""
+    sig = _file_sig(INSTRUCTIONS_PATH)
+    if sig == _RUNTIME["instructions_sig"]:
+        return False
+    original = _RUNTIME["instructions_text"]
+    if original is None:
+        os.remove(INSTRUCTIONS_PATH)
+        _RUNTIME["instructions_sig"] = None
+        return True
+    if sig is not None:
+        with open(INSTRUCTIONS_PATH, "r", encoding="utf-8") as _f:
+            now_text = _f.read()
+        _RUNTIME["stats"]["instructions_reads"] += 1
+        if sha256_text(now_text) == _RUNTIME["instructions_sha"]:
+            # Touched but identical (e.g. rewritten with the same text).
+            _RUNTIME["instructions_sig"] = sig
+            return False
+    with open(INSTRUCTIONS_PATH, "w", encoding="utf-8") as _f:
+        _f.write(original)
+    _RUNTIME["instructions_sig"] = _file_sig(INSTRUCTIONS_PATH)
+    return True
+
+
+def tool_runtime_stats() -> Dict[str, Any]:
+    """Per-call setup/teardown overhead of run_python (excluding the user code itself)."""
+    stats = dict(_RUNTIME["stats"])
+    stats["avg_overhead_ms"] = round(1000 * stats["overhead_s"] / stats["calls"], 3) if stats["calls"] else None
+    stats["last_overhead_ms"] = round(1000 * stats.pop("last_overhead_s"), 3)
+    stats["overhead_s"] = round(stats["overhead_s"], 6)
+    return stats
+
+
+def _runtime_scope() -> Dict[str, Any]:
+    """Helpers exposed to the python tool; optional imports are attempted once."""
+    if _RUNTIME["scope"] is not None:
+        return _RUNTIME["scope"]
+
     # Context management helpers
     try:
         from research_manager.tools.context_manager import (
@@ -394,6 +644,15 @@ def run_python(code: str) -> Dict[str, Any]:
         format_for_summary = None
         write_summary_markdown = None
 
+    # Section-level reads and full-text search over memory/ and projects/
+    try:
+        from research_manager.tools.fs_utils import list_sections, read_range, read_section, search_text
+    except Exception:  # noqa: BLE001
+        list_sections = None
+        read_range = None
+        read_section = None
+        search_text = None
+
     # Claude Code CLI helper (if installed)
     try:
         from research_manager.tools.claude_code import run_claude, which_claude
@@ -401,13 +660,15 @@ def run_python(code: str) -> Dict[str, Any]:
         run_claude = None
         which_claude = None
 
-    runtime_scope = {
+    _RUNTIME["scope"] = {
         "append_item": append_item,
         "append_message": append_message,
         "write_index_entries": write_index_entries,
         "delete_index_line": delete_index_line,
         "read_index_entries": read_index_entries,
         "recent_entries": recent_entries,
+        "query_repo_files": query_repo_files,
+        "find_symbol": find_symbol,
         "get_env": get_env,
         "s2_search_papers": s2_search_papers,
         "s2_paper_details": s2_paper_details,
@@ -415,21 +676,55 @@ def run_python(code: str) -> Dict[str, Any]:
         "http_get": http_get,
         "run_claude": run_claude,
         "which_claude": which_claude,
+        "claude_jobs": claude_jobs,
+        "claude_cache": claude_cache,
         "ContextPaths": ContextPaths,
         "snapshot_index": snapshot_index,
         "prune_index_keep_last_messages": prune_index_keep_last_messages,
         "cm_read_jsonl": cm_read_jsonl,
         "format_for_summary": format_for_summary,
         "write_summary_markdown": write_summary_markdown,
+        "list_sections": list_sections,
+        "read_section": read_section,
+        "read_range": read_range,
+        "search_text": search_text,
+        "tool_runtime_stats": tool_runtime_stats,
+        "load_artifact": load_artifact,
         "os": os,
         "requests": requests,
-        "INDEX_PATH": INDEX_PATH,
-        "ENV_PATH": ENV_PATH,
     }
-    PYTHON_GLOBAL_SCOPE.update(runtime_scope)
+    return _RUNTIME["scope"]
+
+
+def run_python(
+    code: str,
+    scope: Optional[Dict[str, Any]] = None,
+    on_output: Optional[Callable[[str], None]] = None,
+) -> Dict[str, Any]:
+    """Execute a python tool snippet in scope (default: the current session's scope).
+
+    on_output receives stdout text as it is printed. Setup is cached: .env is
+    re-applied and instructions.md re-read only when their stat signatures
+    change (see tool_runtime_stats() for the per-call overhead).
+    """
+    if scope is None:
+        scope = _current_scope()
+    t0 = time.perf_counter()
+    # Ensure tool calls always see latest .env values.
+    _refresh_env()
+    _enter_instructions_guard()
+    guarded = True
+
+    stdout = TeeStringIO(on_output) if on_output else io.StringIO()
+    scope.update(_runtime_scope())
+    scope["INDEX_PATH"] = current_index_path()
+    # Forked sessions keep most of their history in shared segments; INDEX_PATH is only the live tail.
+    scope["CONTEXT_PATHS"] = context_paths()
+    scope["ENV_PATH"] = ENV_PATH
+    overhead = time.perf_counter() - t0
 
     try:
-        PYTHON_GLOBAL_SCOPE.pop("__last_expression_result__", None)
+        scope.pop("__last_expression_result__", None)
 
         tree = ast.parse(code, mode="exec")
         if tree.body and isinstance(tree.body[-1], ast.Expr):
@@ -442,27 +737,13 @@ def run_python(code: str) -> Dict[str, Any]:
         else:
             compiled = compile(code, "<python_tool>", "exec")
 
-        with contextlib.redirect_stdout(stdout):
-            exec(compiled, PYTHON_GLOBAL_SCOPE, PYTHON_GLOBAL_SCOPE)
+        with capture_stdout(stdout):
+            exec(compiled, scope, scope)
 
-        # Hard guard: instructions.md is immutable at runtime.
-        instructions_changed = False
-        if instructions_original is None:
-            if os.path.exists(INSTRUCTIONS_PATH):
-                instructions_changed = True
-                os.remove(INSTRUCTIONS_PATH)
-        else:
-            if not os.path.exists(INSTRUCTIONS_PATH):
-                instructions_changed = True
-                with open(INSTRUCTIONS_PATH, "w", encoding="utf-8") as _f:
-                    _f.write(instructions_original)
-            else:
-                with open(INSTRUCTIONS_PATH, "r", encoding="utf-8") as _f:
-                    now_text = _f.read()
-                if now_text != instructions_original:
-                    instructions_changed = True
-                    with open(INSTRUCTIONS_PATH, "w", encoding="utf-8") as _f:
-                        _f.write(instructions_original)
+        t1 = time.perf_counter()
+        guarded = False
+        instructions_changed = _exit_instructions_guard()
+        overhead += time.perf_counter() - t1
 
         if instructions_changed:
             return {
@@ -472,7 +753,7 @@ def run_python(code: str) -> Dict[str, Any]:
             }
 
         stdout_text = stdout.getvalue()
-        result = PYTHON_GLOBAL_SCOPE.get("result", PYTHON_GLOBAL_SCOPE.get("__last_expression_result__"))
+        result = scope.get("result", scope.get("__last_expression_result__"))
         if result is None and stdout_text.strip():
             result = stdout_text.strip()
         return {
@@ -485,7 +766,15 @@ def run_python(code: str) -> Dict[str, Any]:
             "ok": False,
             "stdout": stdout.getvalue(),
             "error": str(exc),
+            "error_type": type(exc).__name__,
         }
+    finally:
+        if guarded:
+            _exit_instructions_guard()
+        stats = _RUNTIME["stats"]
+        stats["calls"] += 1
+        stats["overhead_s"] += overhead
+        stats["last_overhead_s"] = overhead
 
 
 def _to_json_safe(value: Any) -> Any:
@@ -506,25 +795,378 @@ def _to_json_safe(value: Any) -> Any:
     return str(value)
 
 
-def main() -> None:
-    ensure_files()
-    load_dotenv(dotenv_path=ENV_PATH, override=True)
+_PYTHON_WORKER: Any = None
+
+
+def start_python_worker() -> Any:
+    """Fork the warm python tool worker (limits via RM_PYTHON_TIMEOUT_S / _CPU_S / _MEMORY_MB)."""
+    global _PYTHON_WORKER
+    if _PYTHON_WORKER is None:
+        from research_manager.tools import python_worker as pw
+
+        _PYTHON_WORKER = pw.PythonWorker(
+            _run_python_in_worker,
+            PYTHON_GLOBAL_SCOPE,
+            timeout_s=float(os.getenv("RM_PYTHON_TIMEOUT_S", pw.DEFAULT_TIMEOUT_S)),
+            cpu_s=int(os.getenv("RM_PYTHON_CPU_S", pw.DEFAULT_CPU_S)),
+            memory_mb=int(os.getenv("RM_PYTHON_MEMORY_MB", pw.DEFAULT_MEMORY_MB)),
+        ).start()
+    return _PYTHON_WORKER
+
+
+def _run_python_in_worker(code: str, scope: Dict[str, Any], emit: Callable[[str], None]) -> Dict[str, Any]:
+    return _to_json_safe(run_python(code, scope, on_output=emit))
+
+
+_ARTIFACT_STORE: Any = None
+
+
+def artifact_store() -> ArtifactStore:
+    global _ARTIFACT_STORE
+    if _ARTIFACT_STORE is None:
+        _ARTIFACT_STORE = ArtifactStore(STATE_PATHS.artifacts_dir)
+    return _ARTIFACT_STORE
+
+
+def load_artifact(ref: str, parse: bool = True) -> Any:
+    """Full content of a stored tool output (hash or >= 8-char prefix); JSON is decoded when parse=True."""
+    text = artifact_store().get_text(ref)
+    if parse:
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError:
+            pass
+    return text
+
+
+def run_tool_call(call: Any, scope: Any = None) -> Dict[str, Any]:
+    """Dispatch one model function call and return its (JSON-safe) output.
+
+    With the python worker running, scope is a worker scope handle (or the
+    shared scope, meaning the worker's own). Outputs over
+    RM_ARTIFACT_THRESHOLD_CHARS are moved to the artifact store and replaced
+    by a preview plus hash.
+    """
+    with tracing.span("tool.call", tool=call.name) as sp:
+        try:
+            args = json.loads(call.arguments) if call.arguments else {}
+            if call.name != "python":
+                output = {"ok": False, "error": f"Unknown tool: {call.name}"}
+            elif _PYTHON_WORKER is not None and _uses_shared_scope():
+                token = scope if isinstance(scope, str) else None
+                output = _PYTHON_WORKER.run(args.get("code", ""), scope_token=token)
+                sp.set(worker=True)
+            else:
+                code = args.get("code", "")
+                output = run_python(code, scope)
+        except Exception as exc:  # noqa: BLE001
+            output = {"ok": False, "error": str(exc)}
+        threshold = int(os.getenv("RM_ARTIFACT_THRESHOLD_CHARS", DEFAULT_ARTIFACT_THRESHOLD_CHARS))
+        result = externalize_output(_to_json_safe(output), artifact_store(), threshold_chars=threshold)
+        sp.set(tool_ok=bool(result.get("ok")), artifact="artifact" in result, bytes=result.get("chars") or len(json.dumps(result)))
+        return result
+
+
+def make_tool_executor(log: Optional[Callable[[Dict[str, Any]], Any]] = None) -> ToolExecutor:
+    """Executor for one response's calls; RM_PARALLEL_TOOLS=0 forces sequential runs."""
+    # Sessions with a private scope (headless runs) stay in-process; the worker holds the shared one.
+    worker = _PYTHON_WORKER if _uses_shared_scope() else None
+    return ToolExecutor(
+        run=run_tool_call,
+        log=log or append_item,
+        scope=_current_scope(),
+        parallel=os.getenv("RM_PARALLEL_TOOLS", "1") != "0",
+        fork_scope=worker.fork_scope if worker is not None else None,
+        merge_scope=worker.merge_scope if worker is not None else None,
+    )
+
+
+def _consume_stream(
+    events: Any,
+    on_text: Any,
+    on_call: Any,
+) -> Any:
+    """Drain a Responses event stream; returns the completed response.
+
+    Text deltas go to on_text as they arrive, and each function call is handed to
+    on_call as soon as its output item is done (i.e. its arguments are complete),
+    while the rest of the response is still streaming.
+    """
+    final = None
+    for event in events:
+        etype = getattr(event, "type", "")
+        if etype == "response.output_text.delta":
+            on_text(event.delta)
+        elif etype == "response.output_item.done":
+            if getattr(event.item, "type", "") == "function_call":
+                on_call(event.item)
+        elif etype == "response.completed":
+            final = event.response
+        elif etype in {"response.failed", "error"}:
+            err = getattr(getattr(event, "response", None), "error", None) or getattr(event, "message", None)
+            raise RuntimeError(f"Response stream failed: {err}")
+    if final is None:
+        raise RuntimeError("Response stream ended without response.completed")
+    return final
+
+
+TURN_STAGES = ("history_read", "request_build", "model", "tool_exec", "append")
+
+
+class _StageTimer:
+    """Exclusive wall time per stage: time spent in a nested stage is not counted for its parent."""
+
+    def __init__(self, names: Tuple[str, ...]) -> None:
+        self.totals: Dict[str, float] = {name: 0.0 for name in names}
+        self._children: List[float] = []
+
+    @contextlib.contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        t0 = time.perf_counter()
+        self._children.append(0.0)
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - t0
+            self.totals[name] += elapsed - self._children.pop()
+            if self._children:
+                self._children[-1] += elapsed
+
+
+def run_turn(client: Any, model: str, user_input: str, stream: bool = False) -> Dict[str, Any]:
+    """One user turn: model call, tool rounds, final assistant message.
+
+    With stream=True text deltas are printed as they arrive and tool calls start
+    while the response is still streaming. Independent calls from one response
+    run concurrently (see ToolExecutor). Either way index.jsonl receives the
+    same items. Returns the assistant text plus timing stats (ttft_s is the
+    time to the first streamed text delta, None when not streaming),
+    per-call durations and per-stage wall time (TURN_STAGES; "model" is time
+    waiting on the API, "append" covers index/chain writes).
+
+    New turns chain from the previous turn's response id and send only the new
+    user message, unless index.jsonl changed since (history digest mismatch),
+    the model changed, the id was rejected, or RM_CHAIN=0; then a budgeted
+    history (RM_HISTORY_BUDGET_CHARS) is sent instead. Each turn is recorded
+    as a "turn" span (see research_manager.tracing).
+    """
+    session = _active_session()
+    with tracing.turn(model=model, stream=stream, session=session.session_id if session else None) as sp:
+        result = _run_turn(client, model, user_input, stream)
+        sp.set(
+            rounds=result["rounds"],
+            tool_calls=result["tool_calls"],
+            chained=result["chained"],
+            ttft_s=result["ttft_s"],
+            stages={name: round(value, 6) for name, value in result["stages"].items()},
+        )
+    return result
+
+
+def _run_turn(client: Any, model: str, user_input: str, stream: bool) -> Dict[str, Any]:
+    started = time.perf_counter()
+    ttft: List[float] = []
+    printed = [False]
+
+    def _on_text(delta: str) -> None:
+        if not ttft:
+            ttft.append(time.perf_counter() - started)
+        if not printed[0]:
+            print("\nAssistant: ", end="")
+            printed[0] = True
+        print(delta, end="", flush=True)
+
+    durations: List[Dict[str, Any]] = []
+    timer = _StageTimer(TURN_STAGES)
+
+    def _append(item: Dict[str, Any]) -> Dict[str, Any]:
+        with timer.stage("append"):
+            return append_item(item)
+
+    def _create(**kwargs: Any) -> Tuple[Any, List[Dict[str, Any]]]:
+        executor = make_tool_executor(log=_append)
+
+        def _submit(item: Any) -> None:
+            with timer.stage("tool_exec"):
+                executor.submit(item)
+
+        try:
+            with timer.stage("model"), tracing.span("model.request", model=model, stream=stream) as sp:
+                if not stream:
+                    response = client.responses.create(model=model, tools=PYTHON_TOOL, **kwargs)
+                    calls = [item for item in response.output if item.type == "function_call"]
+                else:
+                    events = client.responses.create(model=model, tools=PYTHON_TOOL, stream=True, **kwargs)
+                    calls = []
+                    response = _consume_stream(events, _on_text, _submit)
+                usage = getattr(response, "usage", None)
+                for key in ("input_tokens", "output_tokens"):
+                    if isinstance(getattr(usage, key, None), int):
+                        sp.set(**{key: getattr(usage, key)})
+            for item in calls:
+                _submit(item)
+        finally:
+            with timer.stage("tool_exec"):
+                outputs = executor.finish()
+            durations.extend(executor.durations)
+        return response, outputs
+
+    chain_path = Path(_current_chain_path())
+    with timer.stage("history_read"):
+        prior_items = build_model_history_items(read_index_entries())
+    # index.jsonl is the full chat history; append current user turn first.
+    user_item = _append({"role": "user", "content": user_input})
+    with timer.stage("request_build"):
+        history_items = prior_items + [user_item]
+        prior_digest = response_chain.history_digest(prior_items)
+        digest = response_chain.roll_digest(prior_digest, user_item)
+        instructions = load_instructions()
+
+        chain = response_chain.load_chain(chain_path) if os.getenv("RM_CHAIN", "1") != "0" else None
+        chained = bool(chain and chain.get("model") == model and chain.get("digest") == prior_digest)
+    response = None
+    if chained:
+        try:
+            response, tool_outputs = _create(
+                instructions=instructions,
+                previous_response_id=chain["response_id"],
+                input=[user_item],
+            )
+        except Exception as exc:  # noqa: BLE001
+            if not response_chain.is_stale_chain_error(exc):
+                raise
+            chained = False
+    if response is None:
+        with timer.stage("request_build"):
+            budget = int(os.getenv("RM_HISTORY_BUDGET_CHARS", response_chain.DEFAULT_HISTORY_BUDGET_CHARS))
+            history_input = response_chain.budget_history(history_items, budget)
+        response, tool_outputs = _create(instructions=instructions, input=history_input)
+    rounds = 1
+    while tool_outputs:
+        if printed[0]:
+            print()
+            printed[0] = False
+        # Instructions are not carried over by previous_response_id, so resend them.
+        response, tool_outputs = _create(
+            instructions=instructions,
+            previous_response_id=response.id,
+            input=tool_outputs,
+        )
+        rounds += 1
+
+    assistant_text = response.output_text or ""
+    if printed[0]:
+        print("\n")
+    if assistant_text.strip():
+        digest = response_chain.roll_digest(digest, _append({"role": "assistant", "content": assistant_text}))
+    # Tool calls that wrote chat messages make index.jsonl diverge from the
+    # server's view; the digest check sends the next turn down the rebuild path.
+    with timer.stage("append"):
+        response_chain.save_chain(chain_path, response.id, digest, model)
+        _touch_session()
+    return {
+        "text": assistant_text,
+        "ttft_s": ttft[0] if ttft else None,
+        "total_s": time.perf_counter() - started,
+        "rounds": rounds,
+        "tool_calls": len(durations),
+        "tool_durations": durations,
+        "chained": chained,
+        "stages": timer.totals,
+    }
 
+
+def load_api_key() -> Tuple[str, str]:
+    """Load .env and return (env var name, OpenAI key)."""
+    dotenv.load_dotenv(dotenv_path=ENV_PATH, override=True)
     api_key_source = "OPENAI_API_KEY_COMPANY" if os.getenv("OPENAI_API_KEY_COMPANY") else "OPENAI_API_KEY"
     api_key = os.getenv(api_key_source)
     if not api_key:
         raise ValueError("Missing OpenAI key in .env: OPENAI_API_KEY_COMPANY or OPENAI_API_KEY")
+    return api_key_source, api_key
+
+
+def _select_session(session_id: Optional[str], create: bool = True) -> None:
+    """Make session_id (None: the legacy state/{env}/index.jsonl) the interactive session."""
+    global _DEFAULT_SESSION
+    _DEFAULT_SESSION = open_session(session_id, create=create) if session_id else None
+
+
+def _session_command(user_input: str) -> bool:
+    """Handle /sessions, /new <id>, /switch <id> and /fork <id>; True if user_input was one of them.
+
+    Only /new and /fork create sessions; /switch to an unknown id is an error.
+    """
+    parts = user_input.split()
+    if not parts or parts[0] not in {"/sessions", "/new", "/switch", "/fork"}:
+        return False
+    registry = session_registry()
+    current = _DEFAULT_SESSION.session_id if _DEFAULT_SESSION else None
+    try:
+        if parts[0] == "/sessions":
+            for entry in registry.list():
+                marker = "*" if entry["id"] == current else " "
+                age = time.time() - entry["last_activity"]
+                print(f"{marker} {entry['id']:<24} {entry['size_bytes']:>10} B  {age / 60:8.1f} min ago")
+            return True
+        if len(parts) != 2:
+            print(f"Usage: {parts[0]} <session id>")
+            return True
+        if parts[0] == "/new":
+            registry.create(parts[1])
+        elif parts[0] == "/fork":
+            if current is None:
+                print("Forking needs a named session; /new or /switch to one first.")
+                return True
+            registry.fork(current, parts[1])
+        registry.switch(parts[1])
+        _select_session(parts[1], create=False)
+        if _PYTHON_WORKER is not None:
+            # The worker holds the previous session's scope and history paths.
+            _PYTHON_WORKER.restart()
+        print(f"Session: {parts[1]}")
+    except (KeyError, ValueError) as exc:
+        print(f"Session error: {exc}")
+    return True
 
-    client = OpenAI(api_key=api_key)
-    model = "gpt-5.2"
+
+def main() -> None:
+    global _REPO_MAP_WATCHER
+    ensure_files()
+    api_key_source, api_key = load_api_key()
+    _select_session(os.getenv("RM_SESSION") or session_registry().current())
+
+    # Configure the sink first so the forked worker inherits it.
+    if os.getenv("RM_METRICS", "1") != "0":
+        tracing.configure(STATE_PATHS.metrics_jsonl)
+    # Fork before any background threads start.
+    if os.getenv("RM_PYTHON_WORKER", "1") != "0":
+        start_python_worker()
+    # The OpenAI SDK takes a noticeable time to import; load it while the user types.
+    warm_imports(["openai"])
+    client = None
+    model = DEFAULT_MODEL
     print("Minimal memory chat")
     print(f"Model: {model}")
     print(f"API key source: {api_key_source} ({api_key[:10]}...)")
     print(f"S2_KEY loaded: {bool(os.getenv('S2_KEY'))}")
     print(f"RM_ENV: {RM_ENV}")
-    print(f"State index: {INDEX_PATH}")
+    print(f"Session: {_DEFAULT_SESSION.session_id if _DEFAULT_SESSION else '(default)'}")
+    print(f"State index: {current_index_path()}")
     print("Type 'exit' to quit.\n")
 
+    watch_interval = os.getenv("RM_REPO_MAP_WATCH_S")
+    if watch_interval:
+        from research_manager.tools.repo_map import RepoMapWatcher
+
+        _REPO_MAP_WATCHER = RepoMapWatcher(
+            Path(BASE_DIR), Path(REPO_MAP_STATE_PATH), interval_s=float(watch_interval), extra_ignore=_REPO_MAP_IGNORE
+        )
+        _REPO_MAP_WATCHER.start()
+
+    stream = os.getenv("RM_STREAM", "1") != "0"
+    show_timings = bool(os.getenv("RM_TIMINGS"))
+
     while True:
         user_input = input("You: ").strip()
         if not user_input:
@@ -532,72 +1174,24 @@ def main() -> None:
         if user_input.lower() in {"exit", "quit"}:
             print("Bye.")
             break
+        if _session_command(user_input):
+            continue
 
-        # index.jsonl is the full chat history; append current user turn first.
-        append_message("user", user_input)
-        history_items = build_model_history_items(read_index_entries())
-        instructions = load_instructions()
-
-        response = client.responses.create(
-            model=model,
-            instructions=instructions,
-            input=history_items,
-            tools=PYTHON_TOOL,
-        )
-
-        while True:
-            function_calls = [item for item in response.output if item.type == "function_call"]
-            if not function_calls:
-                break
-
-            tool_outputs: List[Dict[str, Any]] = []
-            for call in function_calls:
-                append_item(
-                    {
-                        "type": "function_call",
-                        "name": call.name,
-                        "call_id": call.call_id,
-                        "arguments": call.arguments or "",
-                    }
-                )
-                try:
-                    args = json.loads(call.arguments) if call.arguments else {}
-                    if call.name != "python":
-                        output = {"ok": False, "error": f"Unknown tool: {call.name}"}
-                    else:
-                        code = args.get("code", "")
-                        output = run_python(code)
-                except Exception as exc:  # noqa: BLE001
-                    output = {"ok": False, "error": str(exc)}
-
-                output_str = json.dumps(_to_json_safe(output))
-                append_item(
-                    {
-                        "type": "function_call_output",
-                        "call_id": call.call_id,
-                        "output": output_str,
-                    }
-                )
-                tool_outputs.append(
-                    {
-                        "type": "function_call_output",
-                        "call_id": call.call_id,
-                        "output": output_str,
-                    }
-                )
-
-            response = client.responses.create(
-                model=model,
-                previous_response_id=response.id,
-                input=tool_outputs,
-                tools=PYTHON_TOOL,
+        if client is None:
+            from openai import OpenAI
+
+            client = OpenAI(api_key=api_key)
+        turn = run_turn(client, model, user_input, stream=stream)
+        if not stream:
+            print(f"\nAssistant: {turn['text']}\n")
+        if show_timings:
+            ttft = turn["ttft_s"]
+            print(
+                f"[ttft {ttft:.2f}s, " if ttft is not None else "[ttft -, ",
+                f"total {turn['total_s']:.2f}s, rounds {turn['rounds']}, tool calls {turn['tool_calls']}]",
+                sep="",
             )
 
-        assistant_text = response.output_text or ""
-        print(f"\nAssistant: {assistant_text}\n")
-        if assistant_text.strip():
-            append_message("assistant", assistant_text)
-
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,111 @@
+"""python -m research_manager.app {chat,batch,sessions,metrics} ..."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import time
+from pathlib import Path
+from typing import List, Optional
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m research_manager.app")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sub.add_parser("chat", help="Interactive chat (same as python minimal_memory_chat.py)")
+
+    batch = sub.add_parser("batch", help="Run a JSONL file of prompts headlessly, one session per prompt")
+    batch.add_argument("prompts", type=Path, help="JSONL: strings or {\"id\", \"prompt\"} objects")
+    batch.add_argument("--concurrency", "-n", type=int, default=4)
+    batch.add_argument("--model", default=None)
+    batch.add_argument("--out", type=Path, default=None, help="Summary JSONL (default: state/{env}/sessions/batch-*.jsonl)")
+    batch.add_argument("--resume", action="store_true", help="Continue sessions whose id already exists instead of failing")
+
+    sessions = sub.add_parser("sessions", help="List, create, fork or switch named sessions")
+    sessions_sub = sessions.add_subparsers(dest="action", required=True)
+    sessions_sub.add_parser("list")
+    for action in ("new", "switch"):
+        sessions_sub.add_parser(action).add_argument("id")
+    fork = sessions_sub.add_parser("fork")
+    fork.add_argument("source")
+    fork.add_argument("id")
+
+    metrics = sub.add_parser("metrics", help="Latency percentiles and slowest turns from state/{env}/metrics.jsonl")
+    metrics.add_argument("--path", type=Path, default=None)
+    metrics.add_argument("--since-hours", type=float, default=None)
+    metrics.add_argument("--top", type=int, default=5, help="Number of slowest turns to show")
+    metrics.add_argument("--json", action="store_true")
+
+    args = parser.parse_args(argv)
+    if args.command == "sessions":
+        return _sessions(args)
+    if args.command == "metrics":
+        return _metrics(args)
+    if args.command == "chat":
+        from research_manager.app.batch import _chat_module
+
+        _chat_module().main()
+        return 0
+
+    from research_manager import tracing
+    from research_manager.app.batch import run_batch
+    from research_manager.state.paths import default_state_paths
+
+    if os.getenv("RM_METRICS", "1") != "0":
+        tracing.configure(default_state_paths().metrics_jsonl)
+    result = run_batch(
+        args.prompts, concurrency=args.concurrency, model=args.model, out_path=args.out, resume=args.resume
+    )
+    print(json.dumps(result, indent=2))
+    return 0 if result["ok"] else 1
+
+
+def _sessions(args: argparse.Namespace) -> int:
+    from research_manager.state.paths import default_state_paths
+    from research_manager.state.sessions import SessionRegistry
+
+    registry = SessionRegistry(default_state_paths().sessions_dir)
+    try:
+        if args.action == "list":
+            current = registry.current()
+            for entry in registry.list():
+                marker = "*" if entry["id"] == current else " "
+                last = time.strftime("%Y-%m-%d %H:%M", time.localtime(entry["last_activity"]))
+                parent = f"  (fork of {entry['parent']})" if entry.get("parent") else ""
+                print(f"{marker} {entry['id']:<24} {entry['size_bytes']:>10} B  {last}{parent}")
+            return 0
+        if args.action == "new":
+            registry.create(args.id)
+        elif args.action == "fork":
+            registry.fork(args.source, args.id)
+        registry.switch(args.id)
+    except (KeyError, ValueError) as exc:
+        print(f"error: {exc}")
+        return 1
+    print(f"Current session: {args.id}")
+    return 0
+
+
+def _metrics(args: argparse.Namespace) -> int:
+    from research_manager import tracing
+    from research_manager.state.paths import default_state_paths
+
+    path = args.path or default_state_paths().metrics_jsonl
+    since = time.time() - args.since_hours * 3600 if args.since_hours else None
+    records = tracing.load_records(path, since=since)
+    if not records:
+        print(f"No metrics in {path}")
+        return 1
+    summary = tracing.summarize_metrics(records)
+    turns = tracing.slowest_turns(records, top=args.top)
+    if args.json:
+        print(json.dumps({"operations": summary, "slowest_turns": turns}, indent=2))
+    else:
+        print(tracing.format_report(summary, turns))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
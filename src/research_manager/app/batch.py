@@ -0,0 +1,166 @@
+"""Headless batch mode: run many prompts concurrently, one isolated session each.
+
+Input is JSONL; each line is either a string or an object
+{"id": ..., "prompt": "..." | ["turn 1", "turn 2", ...]}. Every prompt gets its
+own registered session (state/{env}/sessions/{id}/, see state/sessions.py)
+with a private python tool scope. Prompts without an id get one namespaced
+by the batch run (batch-<time>-<rand>-0001, ...). A prompt whose session
+already exists fails unless resume=True (--resume), which continues it. The Semantic Scholar rate limiter and response cache in the
+chat module are shared by all sessions. One summary line per prompt is
+appended to the output JSONL as soon as it finishes.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+import sys
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from research_manager.state.paths import default_state_paths, repo_root
+from research_manager.state.sessions import SessionRegistry
+
+DEFAULT_CONCURRENCY = 4
+PREVIEW_CHARS = 500
+
+
+def _chat_module() -> Any:
+    root = str(repo_root())
+    if root not in sys.path:
+        sys.path.insert(0, root)
+    import minimal_memory_chat
+
+    return minimal_memory_chat
+
+
+def _session_id(raw: Any, line_no: int, auto_prefix: str) -> str:
+    auto = f"{auto_prefix}-{line_no:04d}"
+    text = str(raw) if raw not in (None, "") else auto
+    return re.sub(r"[^A-Za-z0-9._-]+", "_", text).strip("._-")[:128] or auto
+
+
+def load_prompts(path: Path, auto_prefix: str = "prompt") -> List[Dict[str, Any]]:
+    """Parse the prompts file into [{"id", "turns"}]; ids must be unique.
+
+    Prompts without an id get "<auto_prefix>-<line number>".
+    """
+    prompts: List[Dict[str, Any]] = []
+    seen = set()
+    with open(path, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            obj = json.loads(line)
+            if isinstance(obj, str):
+                obj = {"prompt": obj}
+            if not isinstance(obj, dict) or "prompt" not in obj:
+                raise ValueError(f"{path}:{line_no}: expected a string or an object with 'prompt'")
+            turns = obj["prompt"] if isinstance(obj["prompt"], list) else [obj["prompt"]]
+            session_id = _session_id(obj.get("id"), line_no, auto_prefix)
+            if session_id in seen:
+                raise ValueError(f"{path}:{line_no}: duplicate prompt id {session_id!r}")
+            seen.add(session_id)
+            prompts.append({"id": session_id, "turns": [str(t) for t in turns]})
+    return prompts
+
+
+def run_session(
+    chat: Any,
+    client: Any,
+    model: str,
+    prompt: Dict[str, Any],
+    registry: SessionRegistry,
+    resume: bool = False,
+) -> Dict[str, Any]:
+    """Run all turns of one prompt in its own session; never raises."""
+    summary: Dict[str, Any] = {"session": prompt["id"], "ok": False}
+    started = time.perf_counter()
+    turns: List[Dict[str, Any]] = []
+    try:
+        if not resume:
+            try:
+                registry.create(prompt["id"])
+            except ValueError:
+                raise ValueError(f"Session {prompt['id']!r} already exists; resume to continue it") from None
+        session = chat.open_session(prompt["id"], registry=registry, scope={})
+        summary["index_path"] = session.index_path
+        with chat.use_session(session):
+            for user_input in prompt["turns"]:
+                turns.append(chat.run_turn(client, model, user_input, stream=False))
+        summary["ok"] = True
+    except Exception as exc:  # noqa: BLE001 - reported in the summary
+        summary["error"] = f"{type(exc).__name__}: {exc}"
+        summary["traceback"] = traceback.format_exc(limit=5)
+    text = turns[-1]["text"] if turns else ""
+    ttfts = [t["ttft_s"] for t in turns if t.get("ttft_s") is not None]
+    summary.update(
+        {
+            "turns": len(turns),
+            "text_preview": text[:PREVIEW_CHARS],
+            "total_s": round(time.perf_counter() - started, 3),
+            "ttft_s": round(ttfts[0], 3) if ttfts else None,
+            "rounds": sum(t["rounds"] for t in turns),
+            "tool_calls": sum(t["tool_calls"] for t in turns),
+        }
+    )
+    return summary
+
+
+def run_batch(
+    prompts_path: Path,
+    *,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    model: Optional[str] = None,
+    out_path: Optional[Path] = None,
+    client: Any = None,
+    sessions_dir: Optional[Path] = None,
+    resume: bool = False,
+) -> Dict[str, Any]:
+    """Run every prompt in prompts_path; returns counts, wall time and the summary path."""
+    chat = _chat_module()
+    run_id = f"batch-{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:4]}"
+    prompts = load_prompts(Path(prompts_path), auto_prefix=run_id)
+    model = model or chat.DEFAULT_MODEL
+    sessions_dir = Path(sessions_dir) if sessions_dir else default_state_paths().sessions_dir
+    if out_path is None:
+        out_path = sessions_dir / f"{run_id}.jsonl"
+    out_path = Path(out_path)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    if client is None:
+        from openai import OpenAI
+
+        chat.ensure_files()
+        client = OpenAI(api_key=chat.load_api_key()[1])
+
+    registry = SessionRegistry(sessions_dir)
+    write_lock = threading.Lock()
+    counts = {"ok": 0, "failed": 0}
+
+    def _one(prompt: Dict[str, Any]) -> None:
+        summary = run_session(chat, client, model, prompt, registry, resume=resume)
+        with write_lock:
+            counts["ok" if summary["ok"] else "failed"] += 1
+            with open(out_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(summary, ensure_ascii=False) + "\n")
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="rm-batch") as pool:
+        list(pool.map(_one, prompts))
+    s2_cache = chat.S2_CACHE
+    return {
+        "ok": counts["failed"] == 0,
+        "prompts": len(prompts),
+        "succeeded": counts["ok"],
+        "failed": counts["failed"],
+        "wall_s": round(time.perf_counter() - started, 3),
+        "run_id": run_id,
+        "summary_path": str(out_path),
+        "s2_cache": {"hits": s2_cache.hits, "misses": s2_cache.misses},
+    }
@@ -0,0 +1,93 @@
+"""Thread-safe request pacing and response caching shared across chat sessions."""
+
+from __future__ import annotations
+
+import copy
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from research_manager.tracing import current_span
+
+
+class RateLimiter:
+    """Space calls at least min_interval_s apart across all threads."""
+
+    def __init__(self, min_interval_s: float) -> None:
+        self.min_interval_s = min_interval_s
+        self._lock = threading.Lock()
+        self._next_at = 0.0
+
+    def wait(self) -> float:
+        """Block until the caller may proceed; returns the time slept."""
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_at)
+            self._next_at = start + self.min_interval_s
+        delay = start - now
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+
+class TTLCache:
+    """Bounded LRU mapping whose entries expire after ttl_s.
+
+    Values are deep-copied on put and on get, so sessions sharing the cache
+    can mutate what they get back without affecting each other.
+    """
+
+    def __init__(self, ttl_s: float, max_entries: int = 1024) -> None:
+        self.ttl_s = ttl_s
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or time.monotonic() - entry[0] > self.ttl_s:
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            value = entry[1]
+        return copy.deepcopy(value)
+
+    def put(self, key: Hashable, value: Any) -> None:
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._data[key] = (time.monotonic(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+
+def request_key(url: str, params: Optional[Dict[str, Any]]) -> str:
+    return url + "?" + json.dumps(params or {}, sort_keys=True, default=str)
+
+
+def cached_call(
+    cache: TTLCache,
+    limiter: RateLimiter,
+    key: str,
+    fetch: Callable[[], Any],
+) -> Any:
+    """Serve key from cache, else wait for the limiter and fetch (only successful fetches are cached).
+
+    The enclosing tracing span (if any) gets cache_hit and rate_limit_wait_s.
+    """
+    hit = cache.get(key)
+    current_span().set(cache_hit=hit is not None)
+    if hit is not None:
+        return hit
+    current_span().set(rate_limit_wait_s=round(limiter.wait(), 6))
+    value = fetch()
+    cache.put(key, value)
+    return value
@@ -2,8 +2,12 @@ import os
 import tempfile
 from typing import Any, Dict, Optional
 
-import fitz
-import requests
+from research_manager.lazy_imports import lazy_import
+from research_manager.tracing import span
+
+# Imported on first use: PyMuPDF is only needed when a PDF is actually read.
+fitz = lazy_import("fitz")
+requests = lazy_import("requests")
 
 
 GRAPH_BASE_URL = "https://api.semanticscholar.org/graph/v1"
@@ -20,9 +24,11 @@ class SemanticScholarClient:
         self.session.headers.update({"x-api-key": self.api_key})
 
     def _get(self, url: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-        response = self.session.get(url, params=params, timeout=self.timeout_seconds)
-        response.raise_for_status()
-        return response.json()
+        with span("s2.request", endpoint=url.rsplit("/", 1)[-1]) as sp:
+            response = self.session.get(url, params=params, timeout=self.timeout_seconds)
+            sp.set(status=response.status_code, bytes=len(response.content or b""))
+            response.raise_for_status()
+            return response.json()
 
     def search_papers(self, query: str, limit: int = 10, year: Optional[str] = None) -> Dict[str, Any]:
         fields = ",".join(
@@ -100,10 +106,14 @@ class SemanticScholarClient:
                 "reason": "No open-access PDF URL available from Semantic Scholar for this paper.",
             }
 
-        pdf_response = self.session.get(pdf_url, timeout=self.timeout_seconds)
-        pdf_response.raise_for_status()
+        with span("pdf.download") as sp:
+            pdf_response = self.session.get(pdf_url, timeout=self.timeout_seconds)
+            pdf_response.raise_for_status()
+            sp.set(bytes=len(pdf_response.content))
 
-        with tempfile.NamedTemporaryFile(suffix=".pdf", delete=True) as tmp_pdf:
+        with span("pdf.extract", bytes=len(pdf_response.content)) as sp, tempfile.NamedTemporaryFile(
+            suffix=".pdf", delete=True
+        ) as tmp_pdf:
             tmp_pdf.write(pdf_response.content)
             tmp_pdf.flush()
 
@@ -112,6 +122,7 @@ class SemanticScholarClient:
             for page in doc:
                 all_text.append(page.get_text("text"))
             doc.close()
+            sp.set(pages=len(all_text))
 
         full_text = "\n".join(all_text).strip()
         if len(full_text) > max_chars:
@@ -0,0 +1,85 @@
+"""Deferred imports for heavy optional dependencies (openai, requests, fitz, ...).
+
+lazy_import(name) returns a stand-in module that imports the real one on
+first attribute access and forwards to it, so `requests = lazy_import("requests")`
+at module level costs a spec lookup instead of a full import. The real import
+goes through importlib.import_module under a lock, so threads racing on the
+first access all see the fully executed module (importlib's LazyLoader can
+hand a half-initialized module to concurrent callers). Attribute patching
+(unittest.mock.patch("pkg.mod.requests.Session.get")) works as usual because
+patching reads the attribute first, which triggers the real import.
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import sys
+import threading
+from types import ModuleType
+from typing import Any, Dict, Iterable, List, Optional
+
+_REGISTRY_LOCK = threading.Lock()
+_PENDING: Dict[str, "_LazyModule"] = {}
+
+
+class _LazyModule(ModuleType):
+    """Placeholder for a module that is imported on first attribute access."""
+
+    def __init__(self, name: str) -> None:
+        super().__init__(name)
+        self.__dict__["_rm_lock"] = threading.RLock()
+
+    def _load(self) -> ModuleType:
+        module = self.__dict__.get("_rm_module")
+        if module is None:
+            with self.__dict__["_rm_lock"]:
+                module = self.__dict__.get("_rm_module")
+                if module is None:
+                    module = importlib.import_module(self.__name__)
+                    self.__dict__["_rm_module"] = module
+                    with _REGISTRY_LOCK:
+                        _PENDING.pop(self.__name__, None)
+        return module
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._load(), attr)
+
+    def __dir__(self) -> List[str]:
+        return dir(self._load())
+
+
+def lazy_import(name: str) -> ModuleType:
+    """Return sys.modules[name] if already imported, else a module that imports it on first use."""
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    pending = _PENDING.get(name)
+    if pending is not None:
+        return pending
+    spec = importlib.util.find_spec(name)
+    if spec is None or spec.loader is None:
+        raise ModuleNotFoundError(f"No module named {name!r}", name=name)
+    with _REGISTRY_LOCK:
+        return _PENDING.setdefault(name, _LazyModule(name))
+
+
+def warm_imports(names: Iterable[str]) -> threading.Thread:
+    """Import modules in a daemon thread so they are ready by the time they are needed."""
+
+    def _run() -> None:
+        for name in names:
+            try:
+                importlib.import_module(name)
+            except Exception:  # noqa: BLE001 - the real import site reports errors
+                pass
+
+    t = threading.Thread(target=_run, name="warm-imports", daemon=True)
+    t.start()
+    return t
+
+
+def is_loaded(name: str) -> Optional[bool]:
+    """True if name has been fully imported, False if only lazily registered, None if absent."""
+    if name in sys.modules:
+        return True
+    return False if name in _PENDING else None
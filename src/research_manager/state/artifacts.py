@@ -0,0 +1,73 @@
+"""Content-addressed store for large tool outputs.
+
+Blobs live at <root>/<sha[:2]>/<sha> and are written once (tmp + rename), so
+identical outputs share one file. History items keep only a preview and the
+hash; load_artifact(hash) in the tool scope brings the full text back.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Union
+
+DEFAULT_THRESHOLD_CHARS = 20_000
+DEFAULT_PREVIEW_CHARS = 2_000
+MIN_PREFIX = 8
+
+
+class ArtifactStore:
+    def __init__(self, root: Path) -> None:
+        self.root = Path(root)
+
+    def path_for(self, digest: str) -> Path:
+        return self.root / digest[:2] / digest
+
+    def put(self, data: Union[str, bytes]) -> str:
+        raw = data.encode("utf-8") if isinstance(data, str) else data
+        digest = hashlib.sha256(raw).hexdigest()
+        path = self.path_for(digest)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            tmp.write_bytes(raw)
+            os.replace(tmp, path)
+        return digest
+
+    def resolve(self, ref: str) -> Path:
+        """Full path for a hash or a unique prefix of at least MIN_PREFIX chars."""
+        ref = ref.strip().lower()
+        if len(ref) < MIN_PREFIX:
+            raise ValueError(f"Artifact reference must have at least {MIN_PREFIX} hex chars")
+        path = self.path_for(ref)
+        if path.exists():
+            return path
+        matches = [p for p in (self.root / ref[:2]).glob(f"{ref}*") if not p.name.endswith(".tmp")]
+        if len(matches) != 1:
+            raise KeyError(f"Artifact not found: {ref}" if not matches else f"Ambiguous artifact prefix: {ref}")
+        return matches[0]
+
+    def get_text(self, ref: str) -> str:
+        return self.resolve(ref).read_text(encoding="utf-8")
+
+
+def externalize_output(
+    output: Dict[str, Any],
+    store: ArtifactStore,
+    threshold_chars: int = DEFAULT_THRESHOLD_CHARS,
+    preview_chars: int = DEFAULT_PREVIEW_CHARS,
+) -> Dict[str, Any]:
+    """Replace an oversized tool output with a preview + artifact reference."""
+    text = json.dumps(output)
+    if len(text) <= threshold_chars:
+        return output
+    digest = store.put(text)
+    return {
+        "ok": output.get("ok"),
+        "artifact": digest,
+        "chars": len(text),
+        "preview": text[:preview_chars],
+        "note": f"Output truncated; full result stored as artifact. Use load_artifact({digest[:12]!r}).",
+    }
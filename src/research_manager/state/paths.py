@@ -1,16 +1,43 @@
 from __future__ import annotations
 
+import re
 from dataclasses import dataclass
 from pathlib import Path
 
 from research_manager.config import get_rm_env
 
+_SESSION_ID_RE = re.compile(r"^[A-Za-z0-9][A-Za-z0-9._-]{0,127}$")
+
 
 def repo_root() -> Path:
     # src/research_manager/state/paths.py -> repo root is 3 levels up
     return Path(__file__).resolve().parents[3]
 
 
+def validate_session_id(session_id: str) -> str:
+    if not _SESSION_ID_RE.match(session_id or ""):
+        raise ValueError(f"Invalid session id {session_id!r}: use letters, digits, '.', '_' or '-'")
+    return session_id
+
+
+@dataclass(frozen=True)
+class SessionPaths:
+    session_id: str
+    session_dir: Path
+    index_jsonl: Path
+    response_chain: Path
+
+
+def session_paths(sessions_dir: Path, session_id: str) -> SessionPaths:
+    session_dir = Path(sessions_dir) / validate_session_id(session_id)
+    return SessionPaths(
+        session_id=session_id,
+        session_dir=session_dir,
+        index_jsonl=session_dir / "index.jsonl",
+        response_chain=session_dir / "response_chain.json",
+    )
+
+
 @dataclass(frozen=True)
 class StatePaths:
     env_name: str
@@ -21,6 +48,21 @@ class StatePaths:
     instructions_md: Path
     env_file: Path
 
+    @property
+    def artifacts_dir(self) -> Path:
+        return self.generated_dir / "artifacts"
+
+    @property
+    def metrics_jsonl(self) -> Path:
+        return self.state_dir / "metrics.jsonl"
+
+    @property
+    def sessions_dir(self) -> Path:
+        return self.state_dir / "sessions"
+
+    def session(self, session_id: str) -> SessionPaths:
+        return session_paths(self.sessions_dir, session_id)
+
 
 def default_state_paths() -> StatePaths:
     root = repo_root()
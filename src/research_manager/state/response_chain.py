@@ -0,0 +1,90 @@
+"""Server-side conversation chaining across chat turns.
+
+After each turn the runtime records the last response id together with a
+rolling digest of the model-visible history it corresponds to. The next turn
+chains from that id (sending only the new user message) as long as the digest
+of the current index.jsonl history still matches; otherwise it rebuilds a
+budgeted history.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+RESPONSE_CHAIN_VERSION = 1
+DEFAULT_HISTORY_BUDGET_CHARS = 400_000
+
+
+def roll_digest(prev: str, item: Dict[str, Any]) -> str:
+    data = json.dumps(item, sort_keys=True, ensure_ascii=True)
+    return hashlib.sha256((prev + "\n" + data).encode("utf-8")).hexdigest()
+
+
+def history_digest(items: List[Dict[str, Any]], start: str = "") -> str:
+    digest = start
+    for item in items:
+        digest = roll_digest(digest, item)
+    return digest
+
+
+def load_chain(path: Path) -> Optional[Dict[str, Any]]:
+    try:
+        obj = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if not isinstance(obj, dict) or obj.get("version") != RESPONSE_CHAIN_VERSION or not obj.get("response_id"):
+        return None
+    return obj
+
+
+def save_chain(path: Path, response_id: str, digest: str, model: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    obj = {
+        "version": RESPONSE_CHAIN_VERSION,
+        "response_id": response_id,
+        "digest": digest,
+        "model": model,
+        "updated_at": time.time(),
+    }
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(obj), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def clear_chain(path: Path) -> None:
+    try:
+        path.unlink()
+    except FileNotFoundError:
+        pass
+
+
+STALE_CHAIN_ERROR_CODE = "previous_response_not_found"
+
+
+def is_stale_chain_error(exc: BaseException) -> bool:
+    """True only for API errors saying the previous response no longer exists; other 400s are real errors."""
+    if getattr(exc, "status_code", None) not in (400, 404):
+        return False
+    if getattr(exc, "code", None) == STALE_CHAIN_ERROR_CODE:
+        return True
+    message = str(getattr(exc, "message", None) or exc).lower()
+    return "previous response" in message and "not found" in message
+
+
+def budget_history(items: List[Dict[str, Any]], max_chars: int = DEFAULT_HISTORY_BUDGET_CHARS) -> List[Dict[str, Any]]:
+    """Newest items whose content fits in max_chars (the last item is always kept)."""
+    out: List[Dict[str, Any]] = []
+    total = 0
+    for item in reversed(items):
+        size = len(str(item.get("content", "")))
+        if out and total + size > max_chars:
+            break
+        out.append(item)
+        total += size
+    out.reverse()
+    return out
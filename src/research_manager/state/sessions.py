@@ -0,0 +1,186 @@
+"""Named chat sessions under state/{env}/sessions/ with a small registry.
+
+Layout:
+
+    sessions/registry.json          ids, parent, last activity, sizes, current session
+    sessions/segments/<sha256>      sealed, immutable history prefixes (shared)
+    sessions/<id>/index.jsonl       the session's own (live) history tail
+    sessions/<id>/response_chain.json
+
+A session's history is its segments (in order) followed by its live file.
+Forking seals the parent's live tail into a content-addressed segment and
+gives the child the parent's segment list, so histories are shared rather
+than copied; the parent is left untouched. Rewriting a session's history
+(deleting an entry, say) materializes it into its live file and drops its
+segment references. Listing and switching only read registry.json.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX
+    fcntl = None  # type: ignore[assignment]
+
+from research_manager.state.paths import SessionPaths, session_paths
+
+REGISTRY_VERSION = 1
+_THREAD_LOCK = threading.Lock()
+
+
+def _file_size(path: Path) -> int:
+    try:
+        return path.stat().st_size
+    except FileNotFoundError:
+        return 0
+
+
+class SessionRegistry:
+    def __init__(self, sessions_dir: Path) -> None:
+        self.sessions_dir = Path(sessions_dir)
+        self.registry_path = self.sessions_dir / "registry.json"
+        self.segments_dir = self.sessions_dir / "segments"
+
+    # ---- registry file ----
+    def _load(self) -> Dict[str, Any]:
+        try:
+            obj = json.loads(self.registry_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            obj = None
+        if not isinstance(obj, dict) or obj.get("version") != REGISTRY_VERSION:
+            obj = {"version": REGISTRY_VERSION, "current": None, "sessions": {}}
+        return obj
+
+    def _save(self, obj: Dict[str, Any]) -> None:
+        tmp = self.registry_path.with_name(f"registry.json.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(obj, indent=2, sort_keys=True), encoding="utf-8")
+        os.replace(tmp, self.registry_path)
+
+    @contextlib.contextmanager
+    def _locked(self) -> Iterator[Dict[str, Any]]:
+        """Read-modify-write the registry under a thread lock and an flock."""
+        self.sessions_dir.mkdir(parents=True, exist_ok=True)
+        with _THREAD_LOCK, open(self.sessions_dir / ".registry.lock", "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            obj = self._load()
+            yield obj
+            self._save(obj)
+
+    # ---- queries (registry only; no history is read) ----
+    def list(self) -> List[Dict[str, Any]]:
+        """Sessions sorted by most recent activity."""
+        sessions = self._load()["sessions"]
+        return sorted(sessions.values(), key=lambda s: s.get("last_activity") or 0, reverse=True)
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        return self._load()["sessions"].get(session_id)
+
+    def current(self) -> Optional[str]:
+        return self._load().get("current")
+
+    def paths(self, session_id: str) -> SessionPaths:
+        return session_paths(self.sessions_dir, session_id)
+
+    def history_files(self, session_id: str) -> List[Path]:
+        """Segment files followed by the live index, in history order."""
+        entry = self.get(session_id) or {}
+        segments = [self.segments_dir / digest for digest in entry.get("segments", [])]
+        return segments + [self.paths(session_id).index_jsonl]
+
+    # ---- mutations ----
+    def _new_entry(self, session_id: str, parent: Optional[str] = None) -> Dict[str, Any]:
+        now = time.time()
+        return {
+            "id": session_id,
+            "parent": parent,
+            "created_at": now,
+            "last_activity": now,
+            "segments": [],
+            "segment_bytes": 0,
+            "size_bytes": 0,
+        }
+
+    def create(self, session_id: str, *, exist_ok: bool = False) -> Dict[str, Any]:
+        paths = self.paths(session_id)
+        with self._locked() as obj:
+            entry = obj["sessions"].get(session_id)
+            if entry is not None and not exist_ok:
+                raise ValueError(f"Session already exists: {session_id}")
+            if entry is None:
+                entry = obj["sessions"][session_id] = self._new_entry(session_id)
+            paths.session_dir.mkdir(parents=True, exist_ok=True)
+            paths.index_jsonl.touch()
+            return dict(entry)
+
+    def switch(self, session_id: str) -> Dict[str, Any]:
+        with self._locked() as obj:
+            if session_id not in obj["sessions"]:
+                raise KeyError(f"Unknown session: {session_id}")
+            obj["current"] = session_id
+            return dict(obj["sessions"][session_id])
+
+    def touch(self, session_id: str) -> Dict[str, Any]:
+        """Record activity and refresh the size of session_id (one stat of its live file)."""
+        live = self.paths(session_id).index_jsonl
+        with self._locked() as obj:
+            entry = obj["sessions"].setdefault(session_id, self._new_entry(session_id))
+            entry["last_activity"] = time.time()
+            entry["size_bytes"] = entry["segment_bytes"] + _file_size(live)
+            return dict(entry)
+
+    def _seal(self, data: bytes) -> str:
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.segments_dir / digest
+        if not path.exists():
+            self.segments_dir.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f"{digest}.{os.getpid()}.tmp")
+            tmp.write_bytes(data)
+            os.replace(tmp, path)
+        return digest
+
+    def fork(self, source_id: str, new_id: str) -> Dict[str, Any]:
+        """New session sharing source_id's history; only the source's live tail is written (once)."""
+        src = self.paths(source_id)
+        dst = self.paths(new_id)
+        with self._locked() as obj:
+            parent = obj["sessions"].get(source_id)
+            if parent is None:
+                raise KeyError(f"Unknown session: {source_id}")
+            if new_id in obj["sessions"]:
+                raise ValueError(f"Session already exists: {new_id}")
+            entry = self._new_entry(new_id, parent=source_id)
+            entry["segments"] = list(parent["segments"])
+            entry["segment_bytes"] = parent["segment_bytes"]
+            tail = src.index_jsonl.read_bytes() if src.index_jsonl.exists() else b""
+            if tail:
+                entry["segments"].append(self._seal(tail))
+                entry["segment_bytes"] += len(tail)
+            entry["size_bytes"] = entry["segment_bytes"]
+            dst.session_dir.mkdir(parents=True, exist_ok=True)
+            dst.index_jsonl.touch()
+            if src.response_chain.exists():
+                # Same history, so the child can keep chaining from the parent's last response.
+                dst.response_chain.write_bytes(src.response_chain.read_bytes())
+            obj["sessions"][new_id] = entry
+            return dict(entry)
+
+    def materialize(self, session_id: str, data: bytes) -> None:
+        """Replace session_id's whole history with data (copy-on-write for shared segments)."""
+        live = self.paths(session_id).index_jsonl
+        live.parent.mkdir(parents=True, exist_ok=True)
+        tmp = live.with_name(f"index.jsonl.{os.getpid()}.tmp")
+        tmp.write_bytes(data)
+        with self._locked() as obj:
+            entry = obj["sessions"].setdefault(session_id, self._new_entry(session_id))
+            os.replace(tmp, live)
+            entry.update(segments=[], segment_bytes=0, size_bytes=len(data), last_activity=time.time())
@@ -0,0 +1 @@
+"""Test doubles for research_manager (no network or API keys needed)."""
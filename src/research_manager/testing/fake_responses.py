@@ -0,0 +1,110 @@
+"""In-process stand-in for the OpenAI Responses API (client.responses.create).
+
+Returns objects shaped like the SDK's: responses with id / output /
+output_text, function_call items, and (with stream=True) an iterator of
+response.output_text.delta, response.output_item.done and
+response.completed events. Replies come from a script (consumed in order) or
+a responder callable, with optional latency so benchmarks see realistic
+time-to-first-token and generation time without network calls.
+"""
+
+from __future__ import annotations
+
+import itertools
+import json
+import threading
+import time
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Union
+
+
+def function_call(code: str, call_id: str, name: str = "python") -> SimpleNamespace:
+    return SimpleNamespace(type="function_call", name=name, call_id=call_id, arguments=json.dumps({"code": code}))
+
+
+def make_response(response_id: str, output: Sequence[Any] = (), text: str = "") -> SimpleNamespace:
+    return SimpleNamespace(id=response_id, output=list(output), output_text=text)
+
+
+def response_events(response: Any, deltas: Sequence[str] = (), delta_delay_s: float = 0.0) -> Iterator[SimpleNamespace]:
+    for delta in deltas:
+        if delta_delay_s:
+            time.sleep(delta_delay_s)
+        yield SimpleNamespace(type="response.output_text.delta", delta=delta)
+    for item in response.output:
+        yield SimpleNamespace(type="response.output_item.done", item=item)
+    yield SimpleNamespace(type="response.completed", response=response)
+
+
+@dataclass
+class FakeReply:
+    """One scripted model reply: text (streamed as deltas) and/or python calls."""
+
+    text: str = ""
+    calls: List[str] = field(default_factory=list)
+    deltas: Optional[List[str]] = None
+    latency_s: Optional[float] = None
+
+
+Reply = Union[FakeReply, Any]
+
+
+class FakeResponsesClient:
+    """client.responses.create stand-in; every request's kwargs are kept in .requests.
+
+    script entries are FakeReply objects or prebuilt (response, deltas) pairs;
+    responder(kwargs) -> FakeReply is used once the script is exhausted.
+    latency_s is slept before a reply starts (time to first token) and
+    delta_delay_s between streamed deltas.
+    """
+
+    def __init__(
+        self,
+        script: Sequence[Reply] = (),
+        *,
+        responder: Optional[Callable[[Dict[str, Any]], Reply]] = None,
+        latency_s: float = 0.0,
+        delta_delay_s: float = 0.0,
+        chunk_chars: int = 16,
+    ) -> None:
+        self.script = list(script)
+        self.responder = responder
+        self.latency_s = latency_s
+        self.delta_delay_s = delta_delay_s
+        self.chunk_chars = chunk_chars
+        self.requests: List[Dict[str, Any]] = []
+        self.responses = self
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def _next(self, kwargs: Dict[str, Any]) -> Reply:
+        with self._lock:
+            self.requests.append(kwargs)
+            if self.script:
+                return self.script.pop(0)
+        if self.responder is None:
+            raise AssertionError("FakeResponsesClient script exhausted")
+        return self.responder(kwargs)
+
+    def _build(self, reply: FakeReply) -> Any:
+        with self._lock:
+            n = next(self._ids)
+        calls = [function_call(code, f"call_{n}_{i}") for i, code in enumerate(reply.calls)]
+        response = make_response(f"resp_{n}", calls, reply.text)
+        deltas = reply.deltas
+        if deltas is None:
+            deltas = [reply.text[i : i + self.chunk_chars] for i in range(0, len(reply.text), self.chunk_chars)]
+        return response, deltas
+
+    def create(self, **kwargs: Any) -> Any:
+        reply = self._next(kwargs)
+        response, deltas = self._build(reply) if isinstance(reply, FakeReply) else reply
+        latency = reply.latency_s if isinstance(reply, FakeReply) and reply.latency_s is not None else self.latency_s
+        if latency:
+            time.sleep(latency)
+        if kwargs.get("stream"):
+            return response_events(response, deltas, self.delta_delay_s)
+        if self.delta_delay_s:
+            time.sleep(self.delta_delay_s * len(deltas))
+        return response
@@ -3,12 +3,14 @@
 from __future__ import annotations
 
 import json
+import os
 import re
 import time
 import hashlib
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Callable, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 
 
 def sha256_text(text: str) -> str:
@@ -27,11 +29,63 @@ def write_json(path: Path, obj: Any) -> None:
     path.write_text(json.dumps(obj, ensure_ascii=False, indent=2), encoding="utf-8")
 
 
+def write_json_atomic(path: Path, obj: Any) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(obj, ensure_ascii=False, indent=2), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def stat_signature(st: os.stat_result) -> Dict[str, int]:
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "inode": st.st_ino}
+
+
+def _stat_matches(prev: Dict[str, Any], sig: Dict[str, int]) -> bool:
+    return all(prev.get(k) == v for k, v in sig.items())
+
+
+def shards_dir_for(briefs_path: Path) -> Path:
+    """Directory holding one JSON shard per brief, next to the legacy briefs file."""
+    return briefs_path.with_name(briefs_path.stem + "_shards")
+
+
+def shard_path_for(briefs_path: Path, rel: str) -> Path:
+    return shards_dir_for(briefs_path) / f"{sha256_text(rel)[:16]}.json"
+
+
+def load_briefs(briefs_path: Path) -> Dict[str, Any]:
+    """Load briefs from the legacy monolithic file overlaid with per-file shards."""
+    briefs: Dict[str, Any] = load_json(briefs_path, {})
+    if not isinstance(briefs, dict):
+        briefs = {}
+    shards = shards_dir_for(briefs_path)
+    if shards.is_dir():
+        for fp in sorted(shards.glob("*.json")):
+            shard = load_json(fp, None)
+            if isinstance(shard, dict) and isinstance(shard.get("rel"), str):
+                briefs[shard["rel"]] = shard.get("brief", {})
+    return briefs
+
+
+def write_brief_shard(briefs_path: Path, rel: str, brief: Dict[str, Any]) -> Path:
+    out = shard_path_for(briefs_path, rel)
+    write_json_atomic(out, {"rel": rel, "brief": brief})
+    return out
+
+
 @dataclass
 class BriefPaths:
     briefs_path: Path
     meta_path: Path
 
+    @property
+    def shards_dir(self) -> Path:
+        return shards_dir_for(self.briefs_path)
+
+    @property
+    def chunks_dir(self) -> Path:
+        return self.briefs_path.with_name(self.briefs_path.stem + "_chunks")
+
 
 BRIEF_SCHEMA = {
     "project_name": "string",
@@ -59,6 +113,167 @@ CONTENT:
 """
 
 
+# Memos longer than this are briefed chunk-by-chunk (map) and then merged (reduce).
+CHUNK_CHARS = 24_000
+# Sections shorter than this are merged into the following one to avoid tiny chunks.
+MIN_CHUNK_CHARS = 2_000
+
+_HEADING_RE = re.compile(r"^#{1,6}\s+\S")
+_FENCE_RE = re.compile(r"^\s*(```|~~~)")
+
+
+def split_markdown_sections(text: str) -> List[str]:
+    """Split markdown into sections that each start at a heading (fenced code is ignored)."""
+    sections: List[str] = []
+    cur: List[str] = []
+    in_fence = False
+    for line in text.splitlines(keepends=True):
+        if _FENCE_RE.match(line):
+            in_fence = not in_fence
+        elif not in_fence and _HEADING_RE.match(line) and cur:
+            sections.append("".join(cur))
+            cur = []
+        cur.append(line)
+    if cur:
+        sections.append("".join(cur))
+    return sections
+
+
+def _split_oversized(section: str, max_chars: int) -> List[str]:
+    if len(section) <= max_chars:
+        return [section]
+    parts: List[str] = []
+    buf = ""
+    for para in re.split(r"(?<=\n\n)", section):
+        while len(para) > max_chars:
+            if buf:
+                parts.append(buf)
+                buf = ""
+            parts.append(para[:max_chars])
+            para = para[max_chars:]
+        if len(buf) + len(para) > max_chars:
+            parts.append(buf)
+            buf = ""
+        buf += para
+    if buf:
+        parts.append(buf)
+    return parts
+
+
+def chunk_markdown(text: str, max_chars: int = CHUNK_CHARS, min_chars: int = MIN_CHUNK_CHARS) -> List[str]:
+    """Chunk a memo along heading boundaries.
+
+    Boundaries depend only on nearby section sizes, so editing one section
+    leaves the hashes of the other chunks (and their cached summaries) intact.
+    """
+    chunks: List[str] = []
+    buf = ""
+    for section in split_markdown_sections(text):
+        for part in _split_oversized(section, max_chars):
+            if buf and len(buf) + len(part) > max_chars:
+                chunks.append(buf)
+                buf = ""
+            buf += part
+            if len(buf) >= min_chars:
+                chunks.append(buf)
+                buf = ""
+    if buf:
+        chunks.append(buf)
+    return chunks
+
+
+def make_chunk_prompt(rel: str, index: int, total: int, chunk: str) -> str:
+    return f"""You are taking notes on one section of a project research memo.
+Return concise plain-text notes (no JSON): goals, current state, key ideas,
+open questions, next actions and keywords that appear in this section only.
+
+FILE: {rel} (part {index + 1} of {total})
+
+CONTENT:
+{chunk}
+"""
+
+
+def make_reduce_prompt(rel: str, notes: List[str]) -> str:
+    joined = "\n\n".join(f"--- part {i + 1} ---\n{n.strip()}" for i, n in enumerate(notes))
+    return f"""You are summarizing a project research memo for later reuse.
+The memo was too long to read at once; below are notes on each of its parts, in order.
+Return STRICT JSON only. No markdown.
+
+Schema (keys required):
+{json.dumps(BRIEF_SCHEMA, indent=2)}
+
+FILE: {rel}
+
+PART NOTES:
+{joined}
+"""
+
+
+def _cached_summary(
+    cache_dir: Path, prompt_key: str, prompt: str, llm_summarize_fn: Callable[[str], str]
+) -> Tuple[str, bool]:
+    cache_fp = cache_dir / f"{prompt_key}.json"
+    cached = load_json(cache_fp, None)
+    if isinstance(cached, dict) and isinstance(cached.get("summary"), str):
+        return cached["summary"], True
+    summary = llm_summarize_fn(prompt)
+    write_json_atomic(cache_fp, {"summary": summary, "created_at": time.time()})
+    return summary, False
+
+
+def chunked_brief(
+    rel: str,
+    text: str,
+    llm_summarize_fn: Callable[[str], str],
+    *,
+    cache_dir: Path,
+    max_chars: int = CHUNK_CHARS,
+    max_workers: int = 4,
+    used_keys: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    """Map-reduce brief for memos larger than max_chars.
+
+    Chunks are summarized in parallel and each chunk summary is cached by the
+    chunk's SHA-256, so re-briefing an edited memo only re-summarizes the
+    changed sections. The cache keys used are appended to used_keys. Raises
+    if any LLM call fails.
+    """
+    chunks = chunk_markdown(text, max_chars=max_chars)
+    stats = {"chunks": len(chunks), "cached": 0}
+
+    def _map_all(parts: List[str]) -> List[str]:
+        if used_keys is not None:
+            used_keys.extend(sha256_text(part) for part in parts)
+
+        def _one(i: int) -> Tuple[str, bool]:
+            prompt = make_chunk_prompt(rel, i, len(parts), parts[i])
+            return _cached_summary(cache_dir, sha256_text(parts[i]), prompt, llm_summarize_fn)
+
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+            results = list(pool.map(_one, range(len(parts))))
+        stats["cached"] += sum(1 for _, hit in results if hit)
+        return [summary for summary, _ in results]
+
+    notes = _map_all(chunks)
+
+    # Collapse notes until the reduce prompt fits in a single call.
+    while len(notes) > 1 and sum(len(n) for n in notes) > max_chars:
+        groups = chunk_markdown("".join(n.strip() + "\n\n" for n in notes), max_chars=max_chars, min_chars=max_chars)
+        if len(groups) >= len(notes):
+            break
+        notes = _map_all(groups)
+
+    raw = llm_summarize_fn(make_reduce_prompt(rel, notes))
+    try:
+        obj = json.loads(raw)
+    except Exception:
+        obj = {"parse_error": True, "raw": raw[:4000]}
+    if isinstance(obj, dict):
+        obj["_chunks"] = stats
+    return obj
+
+
 def _heuristic_brief(fp: Path, base_dir: Path) -> Dict[str, Any]:
     """Fallback: extract one_liner from file without LLM."""
     rel = str(fp.relative_to(base_dir))
@@ -91,6 +306,30 @@ def _heuristic_brief(fp: Path, base_dir: Path) -> Dict[str, Any]:
     }
 
 
+def prune_chunk_cache(chunks_dir: Path, meta: Dict[str, Any], base_dir: Path, live_rels: Set[str]) -> int:
+    """Delete cached chunk summaries no current memo uses; returns how many were removed.
+
+    A memo's chunk keys (meta[rel]["chunks"]) stay live while the memo is in
+    live_rels or still exists on disk; keys from an older version are gone
+    once the memo is re-briefed.
+    """
+    if not chunks_dir.is_dir():
+        return 0
+    live: Set[str] = set()
+    for rel, entry in meta.items():
+        if rel in live_rels or (base_dir / rel).exists():
+            live.update(entry.get("chunks") or ())
+    removed = 0
+    for fp in chunks_dir.glob("*.json"):
+        if fp.stem not in live:
+            try:
+                fp.unlink()
+                removed += 1
+            except OSError:
+                continue
+    return removed
+
+
 def refresh_briefs(
     *,
     source_files: List[Path],
@@ -98,55 +337,95 @@ def refresh_briefs(
     paths: BriefPaths,
     llm_summarize_fn: Optional[Callable[[str], str]] = None,
     force: bool = False,
+    chunk_chars: int = CHUNK_CHARS,
+    max_workers: int = 4,
 ) -> Dict[str, Any]:
     """Refresh briefs for source_files.
 
     llm_summarize_fn(prompt: str) -> str should return JSON text.
     If None or if it raises, falls back to heuristic brief so result is never empty.
+
+    Files whose size/mtime_ns/inode match the recorded meta are skipped without
+    being read; the SHA-256 is only computed on a stat mismatch. Each updated
+    brief is written to its own shard under paths.shards_dir (see load_briefs),
+    and the meta file is only rewritten when an entry changed.
+
+    Memos longer than chunk_chars go through chunked_brief (map-reduce with
+    per-chunk summaries cached under paths.chunks_dir); the chunk keys each
+    memo uses are recorded in its meta entry, and cached chunks no current memo
+    uses are pruned at the end of every refresh.
     """
     meta: Dict[str, Any] = load_json(paths.meta_path, {})
-    briefs: Dict[str, Any] = load_json(paths.briefs_path, {})
+    meta_dirty = False
 
     updated, skipped, errors = [], [], []
 
     for fp in source_files:
         rel = str(fp.relative_to(base_dir))
+        prev = meta.get(rel, {})
+        try:
+            sig = stat_signature(fp.stat())
+        except OSError:
+            sig = None
+        if not force and sig is not None and prev.get("sha256") and _stat_matches(prev, sig):
+            skipped.append(rel)
+            continue
+
         try:
             text = fp.read_text(encoding="utf-8")
         except Exception as exc:
-            briefs[rel] = _heuristic_brief(fp, base_dir)
-            briefs[rel]["_read_error"] = str(exc)
+            brief = _heuristic_brief(fp, base_dir)
+            brief["_read_error"] = str(exc)
+            write_brief_shard(paths.briefs_path, rel, brief)
             updated.append(rel)
             continue
 
         sha = sha256_text(text)
-        if not force and meta.get(rel, {}).get("sha256") == sha:
+        if not force and prev.get("sha256") == sha:
+            # Touched but unchanged: refresh the stat so the next run takes the fast path.
+            meta[rel] = {**prev, **(sig or {})}
+            meta_dirty = True
             skipped.append(rel)
             continue
 
         obj: Dict[str, Any] = {}
+        chunk_keys: List[str] = []
         if llm_summarize_fn is not None:
             try:
-                prompt = make_prompt(rel, text)
-                raw = llm_summarize_fn(prompt)
-                try:
-                    obj = json.loads(raw)
-                except Exception:
-                    obj = {"parse_error": True, "raw": raw[:4000]}
+                if len(text) > chunk_chars:
+                    obj = chunked_brief(
+                        rel,
+                        text,
+                        llm_summarize_fn,
+                        cache_dir=paths.chunks_dir,
+                        max_chars=chunk_chars,
+                        max_workers=max_workers,
+                        used_keys=chunk_keys,
+                    )
+                else:
+                    prompt = make_prompt(rel, text)
+                    raw = llm_summarize_fn(prompt)
+                    try:
+                        obj = json.loads(raw)
+                    except Exception:
+                        obj = {"parse_error": True, "raw": raw[:4000]}
             except Exception as exc:
                 errors.append({"rel": rel, "error": str(exc)})
                 obj = {}
 
         if not obj or obj.get("parse_error"):
             obj = _heuristic_brief(fp, base_dir)
-            if not obj:
-                obj = _heuristic_brief(fp, base_dir)
 
-        briefs[rel] = obj
-        meta[rel] = {"sha256": sha, "updated_at": time.time()}
+        write_brief_shard(paths.briefs_path, rel, obj)
+        meta[rel] = {"sha256": sha, "updated_at": time.time(), **(sig or {})}
+        if chunk_keys:
+            meta[rel]["chunks"] = sorted(set(chunk_keys))
+        meta_dirty = True
         updated.append(rel)
 
-    write_json(paths.briefs_path, briefs)
-    write_json(paths.meta_path, meta)
+    if meta_dirty:
+        write_json_atomic(paths.meta_path, meta)
+    live_rels = {str(fp.relative_to(base_dir)) for fp in source_files}
+    pruned = prune_chunk_cache(paths.chunks_dir, meta, base_dir, live_rels)
 
-    return {"ok": True, "updated": updated, "skipped": skipped, "errors": errors}
+    return {"ok": True, "updated": updated, "skipped": skipped, "errors": errors, "chunks_pruned": pruned}
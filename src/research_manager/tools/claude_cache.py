@@ -0,0 +1,205 @@
+"""Opt-in result cache for deterministic (read-only) Claude Code invocations.
+
+Entries are keyed on the prompt, the CLI argv, cwd/add_dirs and a fingerprint
+of those directories' contents: the git tree hash plus a digest of
+`git status` (and the stat of dirty files) inside a git work tree, otherwise a
+stat digest of the walked files. Runtime state (state/ and the cache
+directory itself) is left out, since writing a cache entry must not change
+the key of the next lookup. Entries expire after ttl_s and the cache is
+trimmed least-recently-used first to max_bytes.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import subprocess
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from research_manager.tools.repo_map import DEFAULT_SKIP_DIRS
+
+CLAUDE_CACHE_VERSION = 1
+DEFAULT_TTL_S = 24 * 3600
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+# Top-level directories of a fingerprinted tree that hold runtime output, not inputs.
+RUNTIME_DIRS = ("state",)
+
+
+def _excluded_relpaths(path: str, exclude: Sequence[str]) -> List[str]:
+    """RUNTIME_DIRS plus the directories in exclude that lie inside path, relative to path."""
+    out = list(RUNTIME_DIRS)
+    base = os.path.realpath(path)
+    for d in exclude:
+        rel = os.path.relpath(os.path.realpath(d), base)
+        if rel != "." and not rel.startswith(".."):
+            out.append(rel.replace(os.sep, "/"))
+    return out
+
+
+def _git_fingerprint(path: str, excluded: Sequence[str] = RUNTIME_DIRS) -> Optional[str]:
+    try:
+        rev = subprocess.run(
+            ["git", "-C", path, "rev-parse", "--show-toplevel", "HEAD:./"],
+            capture_output=True,
+            text=True,
+            timeout=10,
+        )
+        if rev.returncode != 0:
+            return None
+        toplevel, tree = rev.stdout.split()
+        status = subprocess.run(
+            ["git", "-C", path, "status", "--porcelain=v1", "-z", "--untracked-files=all", "--", "."]
+            + [f":(exclude){rel}" for rel in excluded],
+            capture_output=True,
+            timeout=30,
+        )
+        if status.returncode != 0:
+            return None
+    except (OSError, ValueError, subprocess.TimeoutExpired):
+        return None
+    h = hashlib.sha256(tree.encode("ascii"))
+    h.update(status.stdout)
+    # A file that is already dirty keeps the same status line when edited again.
+    for entry in status.stdout.split(b"\0"):
+        if len(entry) < 4:
+            continue
+        try:
+            st = os.stat(os.path.join(toplevel, entry[3:].decode("utf-8", errors="surrogateescape")))
+        except OSError:
+            continue
+        h.update(f"{st.st_size}:{st.st_mtime_ns}".encode("ascii"))
+    return "git:" + h.hexdigest()
+
+
+def _stat_fingerprint(
+    path: str,
+    skip_dirs: Sequence[str] = tuple(DEFAULT_SKIP_DIRS),
+    excluded: Sequence[str] = RUNTIME_DIRS,
+) -> str:
+    h = hashlib.sha256()
+    excluded_abs = {os.path.join(path, rel) for rel in excluded}
+    for root, dirs, files in os.walk(path):
+        dirs[:] = sorted(d for d in dirs if d not in skip_dirs and os.path.join(root, d) not in excluded_abs)
+        for name in sorted(files):
+            full = os.path.join(root, name)
+            try:
+                st = os.stat(full)
+            except OSError:
+                continue
+            h.update(f"{os.path.relpath(full, path)}\0{st.st_size}\0{st.st_mtime_ns}\n".encode("utf-8", "surrogateescape"))
+    return "stat:" + h.hexdigest()
+
+
+def dir_fingerprint(path: str, exclude: Sequence[str] = ()) -> str:
+    """Content fingerprint of a directory: git tree + status when possible, else a stat digest.
+
+    state/ and any directory in exclude (absolute or cwd-relative paths) are ignored.
+    """
+    if not os.path.isdir(path):
+        return "missing"
+    excluded = _excluded_relpaths(path, exclude)
+    return _git_fingerprint(path, excluded) or _stat_fingerprint(path, excluded=excluded)
+
+
+def cache_key(
+    prompt: str,
+    cmd: Sequence[str],
+    cwd: Optional[str],
+    add_dirs: Optional[Sequence[str]],
+    exclude: Sequence[str] = (),
+) -> str:
+    """Key for one invocation; exclude should contain the cache directory."""
+    dirs = [cwd or os.getcwd()] + list(add_dirs or [])
+    payload = {
+        "v": CLAUDE_CACHE_VERSION,
+        "prompt": prompt,
+        # The binary path is an install detail, not part of the request.
+        "args": list(cmd[1:]),
+        "dirs": [[os.path.abspath(d), dir_fingerprint(d, exclude)] for d in dirs],
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class ClaudeResultCache:
+    """JSON-per-entry cache directory with TTL expiry and size-bounded LRU eviction."""
+
+    def __init__(
+        self,
+        cache_dir: Path,
+        ttl_s: float = DEFAULT_TTL_S,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ) -> None:
+        self.cache_dir = Path(cache_dir)
+        self.ttl_s = ttl_s
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self._path(key)
+        try:
+            obj = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        age = time.time() - float(obj.get("created_at", 0))
+        if age > self.ttl_s:
+            path.unlink(missing_ok=True)
+            self.misses += 1
+            return None
+        # mtime doubles as the LRU clock.
+        os.utime(path, None)
+        self.hits += 1
+        result = dict(obj["result"])
+        result["cached"] = True
+        result["cache_age_s"] = round(age, 1)
+        return result
+
+    def put(self, key: str, result: Dict[str, Any]) -> None:
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        path = self._path(key)
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(json.dumps({"created_at": time.time(), "result": result}, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, path)
+        self.evict()
+
+    def evict(self) -> Dict[str, int]:
+        """Drop expired entries, then least-recently-used ones until under max_bytes."""
+        removed = 0
+        now = time.time()
+        with self._lock:
+            entries: List[Any] = []
+            for p in self.cache_dir.glob("*.json"):
+                try:
+                    st = p.stat()
+                except OSError:
+                    continue
+                # created_at <= mtime, so an mtime past the TTL is definitely expired.
+                if now - st.st_mtime > self.ttl_s:
+                    p.unlink(missing_ok=True)
+                    removed += 1
+                    continue
+                entries.append((st.st_mtime, st.st_size, p))
+            total = sum(size for _, size, _ in entries)
+            for _, size, p in sorted(entries, key=lambda e: e[0]):
+                if total <= self.max_bytes:
+                    break
+                p.unlink(missing_ok=True)
+                total -= size
+                removed += 1
+        return {"removed": removed, "bytes": total}
+
+    def clear(self) -> None:
+        for p in self.cache_dir.glob("*.json"):
+            p.unlink(missing_ok=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"hits": self.hits, "misses": self.misses, "dir": str(self.cache_dir)}
@@ -1,11 +1,18 @@
 from __future__ import annotations
 
+import codecs
+import json
 import os
+import selectors
 import shutil
 import subprocess
-import threading
 import time
-from typing import Any, Dict, List, Optional
+import uuid
+from collections import deque
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from research_manager.tracing import current_span, traced
 
 
 def _candidate_paths() -> List[str]:
@@ -38,31 +45,25 @@ def default_claude_bin() -> str:
     return found.get('claude') or found.get('claude-code') or found.get('anthropic') or found.get('claude_local') or 'claude'
 
 
-def run_claude(
+def build_claude_cmd(
     prompt: str,
     *,
-    cwd: Optional[str] = None,
     bin_name: Optional[str] = None,
     extra_args: Optional[List[str]] = None,
     add_dirs: Optional[List[str]] = None,
     print_mode: bool = True,
+    dangerously_skip_permissions: bool = False,
     pass_prompt_as_arg: bool = False,
-    timeout_s: int = 1800,
-) -> Dict[str, Any]:
-    """Run Claude Code CLI non-interactively.
-
-    By default, uses -p/--print and passes the prompt via stdin for reliability.
-    If pass_prompt_as_arg=True, also appends the prompt as the final CLI argument.
-    Use add_dirs to grant Claude tool access to directories.
-    """
-    if bin_name is None:
-        bin_name = default_claude_bin()
-
-    cmd: List[str] = [bin_name]
+) -> List[str]:
+    """Build the Claude Code CLI argv shared by run_claude, run_claude_stream and job pools."""
+    cmd: List[str] = [bin_name or default_claude_bin()]
 
     if print_mode:
         cmd.append('-p')
 
+    if dangerously_skip_permissions:
+        cmd.append('--dangerously-skip-permissions')
+
     if add_dirs:
         for d in add_dirs:
             cmd += ['--add-dir', d]
@@ -73,25 +74,276 @@ def run_claude(
     if pass_prompt_as_arg:
         cmd.append(prompt)
 
-    p = subprocess.run(
+    return cmd
+
+
+@traced("claude.run")
+def run_claude(
+    prompt: str,
+    *,
+    cwd: Optional[str] = None,
+    bin_name: Optional[str] = None,
+    extra_args: Optional[List[str]] = None,
+    add_dirs: Optional[List[str]] = None,
+    print_mode: bool = True,
+    pass_prompt_as_arg: bool = False,
+    timeout_s: int = 1800,
+    spill_dir: Optional[str] = None,
+    cache: Optional[Any] = None,
+) -> Dict[str, Any]:
+    """Run Claude Code CLI non-interactively.
+
+    By default, uses -p/--print and passes the prompt via stdin for reliability.
+    If pass_prompt_as_arg=True, also appends the prompt as the final CLI argument.
+    Use add_dirs to grant Claude tool access to directories.
+
+    Output is captured with OutputCapture: "stdout"/"stderr" hold head/tail
+    excerpts, and long streams are spilled in full to files under spill_dir
+    (see "stdout_path"/"stderr_path").
+
+    Pass a ClaudeResultCache as cache= for read-only prompts: a successful
+    result is reused while the prompt, args and directory contents are unchanged.
+    """
+    cmd = build_claude_cmd(
+        prompt,
+        bin_name=bin_name,
+        extra_args=extra_args,
+        add_dirs=add_dirs,
+        print_mode=print_mode,
+        pass_prompt_as_arg=pass_prompt_as_arg,
+    )
+
+    key = None
+    if cache is not None:
+        from research_manager.tools.claude_cache import cache_key
+
+        key = cache_key(prompt, cmd, cwd, add_dirs, exclude=[str(cache.cache_dir)])
+        hit = cache.get(key)
+        current_span().set(cache_hit=hit is not None)
+        if hit is not None:
+            return hit
+
+    p = subprocess.Popen(
         cmd,
-        input=prompt if print_mode else None,
-        text=True,
-        capture_output=True,
+        stdin=subprocess.PIPE if print_mode else subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
         cwd=cwd,
-        timeout=timeout_s,
     )
-
-    return {
-        "ok": p.returncode == 0,
-        "returncode": p.returncode,
-        "stdout": p.stdout,
-        "stderr": p.stderr,
+    out = OutputCapture("stdout", spill_dir=spill_dir)
+    err = OutputCapture("stderr", spill_dir=spill_dir)
+    captures = {"stdout": out, "stderr": err}
+    try:
+        rc = pump_process(
+            p,
+            stdin_data=prompt.encode("utf-8") if print_mode else None,
+            timeout_s=timeout_s,
+            on_bytes=lambda label, chunk: captures[label].write(chunk),
+        )
+    except TimeoutError:
+        raise subprocess.TimeoutExpired(cmd, timeout_s) from None
+    finally:
+        out.close()
+        err.close()
+
+    result = {
+        "ok": rc == 0,
+        "returncode": rc,
+        **out.summary(),
+        **err.summary(),
         "cmd": cmd,
         "cwd": cwd,
     }
+    current_span().set(returncode=rc, bytes=result["stdout_bytes"] + result["stderr_bytes"])
+    if key is not None and result["ok"]:
+        cache.put(key, result)
+    return result
+
+
+HEAD_BYTES = 16_384
+TAIL_BYTES = 16_384
 
 
+def _default_spill_dir() -> Path:
+    from research_manager.state.paths import default_state_paths
+
+    return default_state_paths().generated_dir / "claude_output"
+
+
+class OutputCapture:
+    """Bounded capture of one output stream: head + tail in memory, full stream spilled to disk.
+
+    Nothing touches the disk until the stream outgrows head_bytes + tail_bytes;
+    at that point the buffered bytes and everything after them go to a log file.
+    """
+
+    def __init__(
+        self,
+        label: str,
+        *,
+        spill_dir: Optional[str] = None,
+        head_bytes: int = HEAD_BYTES,
+        tail_bytes: int = TAIL_BYTES,
+    ) -> None:
+        self.label = label
+        self.spill_dir = spill_dir
+        self.head_bytes = head_bytes
+        self.tail_bytes = tail_bytes
+        self.total = 0
+        self.spill_path: Optional[Path] = None
+        self._head = bytearray()
+        self._tail: Deque[bytes] = deque()
+        self._tail_len = 0
+        self._spill_f: Optional[Any] = None
+
+    def write(self, chunk: bytes) -> None:
+        self.total += len(chunk)
+        if self._spill_f is not None:
+            self._spill_f.write(chunk)
+        room = self.head_bytes - len(self._head)
+        if room > 0:
+            self._head += chunk[:room]
+            chunk = chunk[room:]
+        if not chunk:
+            return
+        self._tail.append(chunk)
+        self._tail_len += len(chunk)
+        if self._spill_f is None and self.total > self.head_bytes + self.tail_bytes:
+            self._open_spill()
+        while self._tail_len - len(self._tail[0]) >= self.tail_bytes:
+            self._tail_len -= len(self._tail.popleft())
+
+    def _open_spill(self) -> None:
+        d = Path(self.spill_dir) if self.spill_dir else _default_spill_dir()
+        d.mkdir(parents=True, exist_ok=True)
+        self.spill_path = d / f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}.{self.label}.log"
+        self._spill_f = self.spill_path.open("wb", buffering=1 << 16)
+        # Everything seen so far is still in memory: head plus the whole tail deque.
+        self._spill_f.write(bytes(self._head))
+        for part in self._tail:
+            self._spill_f.write(part)
+
+    def close(self) -> None:
+        if self._spill_f is not None:
+            self._spill_f.close()
+
+    @property
+    def truncated(self) -> bool:
+        return self.total > self.head_bytes + self.tail_bytes
+
+    def excerpt(self) -> str:
+        tail = b"".join(self._tail)[-self.tail_bytes :]
+        if not self.truncated:
+            return (bytes(self._head) + tail).decode("utf-8", errors="replace")
+        omitted = self.total - len(self._head) - len(tail)
+        head = bytes(self._head).decode("utf-8", errors="ignore")
+        return (
+            f"{head}\n...[{omitted} bytes omitted; full output in {self.spill_path}]...\n"
+            f"{tail.decode('utf-8', errors='ignore')}"
+        )
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            self.label: self.excerpt(),
+            f"{self.label}_bytes": self.total,
+            f"{self.label}_truncated": self.truncated,
+            f"{self.label}_path": str(self.spill_path) if self.spill_path else None,
+        }
+
+
+_READ_CHUNK = 65536
+
+
+def pump_process(
+    p: subprocess.Popen,
+    *,
+    stdin_data: Optional[bytes] = None,
+    timeout_s: Optional[float] = None,
+    on_line: Optional[Callable[[str, str], None]] = None,
+    on_bytes: Optional[Callable[[str, bytes], None]] = None,
+) -> int:
+    """Multiplex a binary-pipe process's stdin/stdout/stderr in one selector loop.
+
+    on_line(label, line) gets each decoded line ("stdout"/"stderr", newline
+    stripped); on_bytes(label, chunk) gets raw chunks. The deadline is enforced
+    through the select() timeout, so there is no sleep-polling. Raises
+    TimeoutError (after killing the process) when timeout_s elapses.
+    """
+    deadline = None if timeout_s is None else time.monotonic() + timeout_s
+    sel = selectors.DefaultSelector()
+    decoders: Dict[str, Any] = {}
+    partial: Dict[str, str] = {}
+    for label, stream in (("stdout", p.stdout), ("stderr", p.stderr)):
+        if stream is not None:
+            sel.register(stream, selectors.EVENT_READ, label)
+            decoders[label] = codecs.getincrementaldecoder("utf-8")(errors="replace")
+            partial[label] = ""
+    pending = memoryview(stdin_data or b"")
+    if p.stdin is not None:
+        if pending:
+            os.set_blocking(p.stdin.fileno(), False)
+            sel.register(p.stdin, selectors.EVENT_WRITE, "stdin")
+        else:
+            p.stdin.close()
+
+    def _emit(label: str, text: str, final: bool = False) -> None:
+        if on_line is None:
+            return
+        buf = partial[label] + text
+        lines = buf.split("\n")
+        partial[label] = "" if final else lines.pop()
+        for line in lines:
+            if final and not line:
+                continue
+            on_line(label, line)
+
+    def _remaining() -> Optional[float]:
+        if deadline is None:
+            return None
+        left = deadline - time.monotonic()
+        if left <= 0:
+            p.kill()
+            p.wait()
+            raise TimeoutError(f"Claude CLI timed out after {timeout_s}s")
+        return left
+
+    try:
+        while sel.get_map():
+            for key, _ in sel.select(timeout=_remaining()):
+                label = key.data
+                if label == "stdin":
+                    try:
+                        written = os.write(key.fd, pending[:_READ_CHUNK])
+                    except BrokenPipeError:
+                        written = len(pending)
+                    pending = pending[written:]
+                    if not pending:
+                        sel.unregister(key.fileobj)
+                        key.fileobj.close()
+                    continue
+                chunk = os.read(key.fd, _READ_CHUNK)
+                if not chunk:
+                    sel.unregister(key.fileobj)
+                    key.fileobj.close()
+                    _emit(label, decoders[label].decode(b"", final=True), final=True)
+                    continue
+                if on_bytes is not None:
+                    on_bytes(label, chunk)
+                _emit(label, decoders[label].decode(chunk))
+        left = _remaining()
+        try:
+            return p.wait(timeout=left)
+        except subprocess.TimeoutExpired:
+            _remaining()
+            raise
+    finally:
+        sel.close()
+        if p.poll() is None:
+            p.kill()
+            p.wait()
+
+
+@traced("claude.stream")
 def run_claude_stream(
     prompt: str,
     *,
@@ -103,101 +355,110 @@ def run_claude_stream(
     dangerously_skip_permissions: bool = False,
     pass_prompt_as_arg: bool = False,
     log_path: Optional[str] = None,
+    spill_dir: Optional[str] = None,
+    max_events: int = 200,
+    on_line: Optional[Callable[[str, str], None]] = None,
+    on_event: Optional[Callable[[Dict[str, Any]], None]] = None,
+    stream_json: bool = False,
+    echo: bool = True,
 ) -> Dict[str, Any]:
     """Run Claude Code CLI and stream stdout/stderr.
 
     - Uses stdin by default for prompt.
-    - Returns a dict with stdout/stderr captured as well.
+    - Returns a dict with stdout/stderr captured as well (bounded head/tail
+      excerpts; long streams spill in full to files under spill_dir).
+    - on_line(label, line) is called for every output line as it arrives.
+    - stream_json=True adds `--output-format stream-json --verbose`; stdout
+      lines that parse as JSON objects are passed to on_event and collected
+      in "events" (the last max_events), and the final "result" event's text is returned as "result".
 
     Note: requires a TTY-less compatible mode; uses -p/--print.
     """
-    import subprocess
-    import threading
-
     bin_path = bin_name or default_claude_bin()
     if not bin_path:
         raise FileNotFoundError("Claude CLI not found. Install and/or ensure it is on PATH or in ~/.local/bin/claude")
 
-    cmd: List[str] = [bin_path, "-p"]
-
-    if dangerously_skip_permissions:
-        cmd.append("--dangerously-skip-permissions")
-
-    if add_dirs:
-        for d in add_dirs:
-            cmd += ["--add-dir", d]
-
-    if extra_args:
-        cmd += extra_args
-
-    if pass_prompt_as_arg:
-        cmd.append(prompt)
+    args = list(extra_args or [])
+    if stream_json and "--output-format" not in args:
+        args += ["--output-format", "stream-json", "--verbose"]
+
+    cmd = build_claude_cmd(
+        prompt,
+        bin_name=bin_path,
+        extra_args=args,
+        add_dirs=add_dirs,
+        dangerously_skip_permissions=dangerously_skip_permissions,
+        pass_prompt_as_arg=pass_prompt_as_arg,
+    )
 
     # ensure logging dir
     if log_path:
         lp = Path(log_path)
-        ensure_dir(lp.parent)
-        log_f = lp.open('w', encoding='utf-8')
+        lp.parent.mkdir(parents=True, exist_ok=True)
+        log_f = lp.open('w', encoding='utf-8', buffering=1 << 16)
     else:
         log_f = None
 
-    stdout_lines: List[str] = []
-    stderr_lines: List[str] = []
+    captures = {
+        "stdout": OutputCapture("stdout", spill_dir=spill_dir),
+        "stderr": OutputCapture("stderr", spill_dir=spill_dir),
+    }
+    events: Deque[Dict[str, Any]] = deque(maxlen=max_events)
+    final: Dict[str, Any] = {}
+
+    def _handle(label: str, line: str) -> None:
+        out = f"[{label}] {line}"
+        if echo:
+            print(out)
+        if log_f:
+            log_f.write(out + "\n")
+        if on_line is not None:
+            on_line(label, line)
+        if stream_json and label == "stdout" and line.startswith("{"):
+            try:
+                event = json.loads(line)
+            except json.JSONDecodeError:
+                return
+            if isinstance(event, dict):
+                events.append(event)
+                if event.get("type") == "result":
+                    final.update(event)
+                if on_event is not None:
+                    on_event(event)
 
     p = subprocess.Popen(
         cmd,
         stdin=subprocess.PIPE,
         stdout=subprocess.PIPE,
         stderr=subprocess.PIPE,
-        text=True,
         cwd=cwd,
-        bufsize=1,
     )
 
-    start = time.time()
-
-    def _reader(stream, sink, label):
-        for line in iter(stream.readline, ''):
-            sink.append(line)
-            out = f"[{label}] {line.rstrip()}"
-            print(out)
-            if log_f:
-                log_f.write(out + "\n")
-                log_f.flush()
-        stream.close()
-
-    t_out = threading.Thread(target=_reader, args=(p.stdout, stdout_lines, 'stdout'), daemon=True)
-    t_err = threading.Thread(target=_reader, args=(p.stderr, stderr_lines, 'stderr'), daemon=True)
-    t_out.start(); t_err.start()
-
+    stdin_text = prompt if prompt.endswith("\n") else prompt + "\n"
     try:
-        if p.stdin:
-            p.stdin.write(prompt)
-            if not prompt.endswith("\n"):
-                p.stdin.write("\n")
-            p.stdin.close()
-
-        while True:
-            rc = p.poll()
-            if rc is not None:
-                break
-            if time.time() - start > timeout_s:
-                p.kill()
-                raise TimeoutError(f"Claude CLI timed out after {timeout_s}s")
-            time.sleep(0.1)
-
-        t_out.join(timeout=1)
-        t_err.join(timeout=1)
-
-        result = {
-            "ok": rc == 0,
-            "returncode": rc,
-            "stdout": "".join(stdout_lines),
-            "stderr": "".join(stderr_lines),
-            "cmd": cmd,
-            "cwd": cwd,
-        }
-        return result
+        rc = pump_process(
+            p,
+            stdin_data=stdin_text.encode("utf-8"),
+            timeout_s=timeout_s,
+            on_line=_handle,
+            on_bytes=lambda label, chunk: captures[label].write(chunk),
+        )
     finally:
+        for cap in captures.values():
+            cap.close()
         if log_f:
             log_f.close()
+
+    result = {
+        "ok": rc == 0,
+        "returncode": rc,
+        **captures["stdout"].summary(),
+        **captures["stderr"].summary(),
+        "cmd": cmd,
+        "cwd": cwd,
+    }
+    current_span().set(returncode=rc, bytes=result["stdout_bytes"] + result["stderr_bytes"])
+    if stream_json:
+        result["events"] = list(events)
+        result["result"] = final.get("result")
+    return result
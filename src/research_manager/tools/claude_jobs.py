@@ -0,0 +1,296 @@
+"""Concurrent Claude Code job pool with a persistent, file-backed job queue.
+
+Each job lives in its own directory (job.json, prompt.txt, stdout.log,
+stderr.log), so state survives restarts and can be inspected from another
+process. At most max_workers CLI subprocesses run at once; submit() returns
+immediately and callers poll status() or block in wait().
+
+job.json is only changed under a per-job flock, and state changes are
+compare-and-set (queued -> running -> done/failed, cancel from either), so a
+cancel is never overwritten by a runner. Each queued job records the pid of
+the pool that owns it; a new pool only adopts queued jobs whose owner exited.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import json
+import os
+import queue
+import signal
+import subprocess
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Set
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX
+    fcntl = None  # type: ignore[assignment]
+
+from research_manager.tools.claude_code import build_claude_cmd
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+INTERRUPTED = "interrupted"
+FINAL_STATES = {DONE, FAILED, CANCELLED, INTERRUPTED}
+
+
+def _write_json_atomic(path: Path, obj: Dict[str, Any]) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(obj, ensure_ascii=False, indent=2), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def _tail(path: Path, max_chars: int) -> str:
+    try:
+        with path.open("rb") as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            f.seek(max(0, size - max_chars * 4))
+            data = f.read()
+    except OSError:
+        return ""
+    return data.decode("utf-8", errors="ignore")[-max_chars:]
+
+
+def _pid_alive(pid: Optional[int]) -> bool:
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except OSError:
+        return False
+    return True
+
+
+class ClaudeJobPool:
+    """Run Claude Code prompts on a bounded set of worker subprocesses."""
+
+    def __init__(self, jobs_dir: Path, max_workers: int = 2, bin_name: Optional[str] = None) -> None:
+        self.jobs_dir = jobs_dir
+        self.max_workers = max(1, max_workers)
+        self.bin_name = bin_name
+        self._queue: "queue.Queue[str]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._events: Dict[str, threading.Event] = {}
+        self._procs: Dict[str, subprocess.Popen] = {}
+        self._workers: List[threading.Thread] = []
+        self.jobs_dir.mkdir(parents=True, exist_ok=True)
+        self._recover()
+
+    # ---- persistence ----
+    def _job_dir(self, job_id: str) -> Path:
+        return self.jobs_dir / job_id
+
+    def _load(self, job_id: str) -> Dict[str, Any]:
+        return json.loads((self._job_dir(job_id) / "job.json").read_text(encoding="utf-8"))
+
+    @contextlib.contextmanager
+    def _locked_job(self, job_id: str) -> Iterator[Dict[str, Any]]:
+        """Current job record, held under the thread lock and an flock shared with other processes."""
+        with self._lock, open(self._job_dir(job_id) / "job.lock", "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            yield self._load(job_id)
+
+    def _update(self, job_id: str, **fields: Any) -> Dict[str, Any]:
+        with self._locked_job(job_id) as job:
+            job.update(fields)
+            _write_json_atomic(self._job_dir(job_id) / "job.json", job)
+        return job
+
+    def _transition(self, job_id: str, from_states: Set[str], **fields: Any) -> Optional[Dict[str, Any]]:
+        """Apply fields only if the job is still in one of from_states; None if it moved on."""
+        with self._locked_job(job_id) as job:
+            if job["state"] not in from_states:
+                return None
+            job.update(fields)
+            _write_json_atomic(self._job_dir(job_id) / "job.json", job)
+        return job
+
+    def _adopt(self, job_id: str) -> bool:
+        """Take over a queued job whose owning pool's process has exited."""
+        with self._locked_job(job_id) as job:
+            owner = job.get("owner_pid")
+            if job["state"] != QUEUED or (owner is not None and _pid_alive(owner)):
+                return False
+            job["owner_pid"] = os.getpid()
+            _write_json_atomic(self._job_dir(job_id) / "job.json", job)
+        return True
+
+    def _recover(self) -> None:
+        """Re-queue orphaned queued jobs (owner process gone); mark dead running jobs interrupted."""
+        for job in self.list_jobs():
+            if job["state"] == QUEUED:
+                if not self._adopt(job["id"]):
+                    continue
+                self._events[job["id"]] = threading.Event()
+                self._queue.put(job["id"])
+            elif job["state"] == RUNNING:
+                # The owner sets pid only after Popen, so a live owner means the job is still in hand;
+                # once the owner is gone, the CLI process itself decides.
+                if _pid_alive(job.get("owner_pid")) or _pid_alive(job.get("pid")):
+                    continue
+                self._transition(
+                    job["id"], {RUNNING}, state=INTERRUPTED, finished_at=time.time(), error="runner process exited"
+                )
+        if not self._queue.empty():
+            self._ensure_workers()
+
+    # ---- workers ----
+    def _ensure_workers(self) -> None:
+        with self._lock:
+            self._workers = [t for t in self._workers if t.is_alive()]
+            while len(self._workers) < self.max_workers:
+                t = threading.Thread(target=self._worker, name=f"claude-job-{len(self._workers)}", daemon=True)
+                t.start()
+                self._workers.append(t)
+
+    def _worker(self) -> None:
+        while True:
+            job_id = self._queue.get()
+            try:
+                self._run(job_id)
+            except Exception as exc:  # noqa: BLE001
+                self._transition(job_id, {QUEUED, RUNNING}, state=FAILED, finished_at=time.time(), error=str(exc))
+            finally:
+                event = self._events.get(job_id)
+                if event is not None:
+                    event.set()
+                self._queue.task_done()
+
+    def _run(self, job_id: str) -> None:
+        job = self._transition(job_id, {QUEUED}, state=RUNNING, started_at=time.time())
+        if job is None:
+            return
+        d = self._job_dir(job_id)
+        with (d / "prompt.txt").open("r", encoding="utf-8") as stdin, (d / "stdout.log").open(
+            "wb"
+        ) as out, (d / "stderr.log").open("wb") as err:
+            p = subprocess.Popen(job["cmd"], stdin=stdin, stdout=out, stderr=err, cwd=job.get("cwd"))
+            with self._lock:
+                self._procs[job_id] = p
+            if self._transition(job_id, {RUNNING}, pid=p.pid) is None:
+                p.terminate()  # cancelled between the claim and the spawn
+            error = None
+            try:
+                rc = p.wait(timeout=job.get("timeout_s"))
+            except subprocess.TimeoutExpired:
+                p.kill()
+                rc = p.wait()
+                error = f"Claude CLI timed out after {job.get('timeout_s')}s"
+            finally:
+                with self._lock:
+                    self._procs.pop(job_id, None)
+        state = DONE if rc == 0 and error is None else FAILED
+        if self._transition(job_id, {RUNNING}, state=state, finished_at=time.time(), returncode=rc, error=error) is None:
+            self._update(job_id, returncode=rc)
+
+    # ---- public API ----
+    def submit(
+        self,
+        prompt: str,
+        *,
+        cwd: Optional[str] = None,
+        add_dirs: Optional[List[str]] = None,
+        extra_args: Optional[List[str]] = None,
+        dangerously_skip_permissions: bool = False,
+        timeout_s: Optional[int] = 1800,
+        label: Optional[str] = None,
+    ) -> str:
+        """Queue a prompt and return its job id immediately."""
+        job_id = time.strftime("%Y%m%d-%H%M%S-") + uuid.uuid4().hex[:8]
+        d = self._job_dir(job_id)
+        d.mkdir(parents=True)
+        (d / "prompt.txt").write_text(prompt if prompt.endswith("\n") else prompt + "\n", encoding="utf-8")
+        cmd = build_claude_cmd(
+            prompt,
+            bin_name=self.bin_name,
+            extra_args=extra_args,
+            add_dirs=add_dirs,
+            dangerously_skip_permissions=dangerously_skip_permissions,
+        )
+        job = {
+            "id": job_id,
+            "label": label,
+            "state": QUEUED,
+            "cmd": cmd,
+            "cwd": cwd,
+            "timeout_s": timeout_s,
+            "created_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+            "pid": None,
+            "owner_pid": os.getpid(),
+            "returncode": None,
+            "error": None,
+            "stdout_path": str(d / "stdout.log"),
+            "stderr_path": str(d / "stderr.log"),
+        }
+        _write_json_atomic(d / "job.json", job)
+        self._events[job_id] = threading.Event()
+        self._queue.put(job_id)
+        self._ensure_workers()
+        return job_id
+
+    def status(self, job_id: str, tail_chars: int = 2000) -> Dict[str, Any]:
+        """Job record plus the last tail_chars of stdout/stderr."""
+        job = self._load(job_id)
+        if tail_chars:
+            job["stdout_tail"] = _tail(Path(job["stdout_path"]), tail_chars)
+            job["stderr_tail"] = _tail(Path(job["stderr_path"]), tail_chars)
+        return job
+
+    def wait(self, job_id: str, timeout: Optional[float] = None, tail_chars: int = 2000) -> Dict[str, Any]:
+        """Block until the job reaches a final state (or timeout) and return its status."""
+        event = self._events.get(job_id)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        if event is not None:
+            event.wait(timeout)
+        else:
+            # Job owned by another process: fall back to watching job.json.
+            while self._load(job_id)["state"] not in FINAL_STATES:
+                if deadline is not None and time.monotonic() >= deadline:
+                    break
+                time.sleep(0.5)
+        return self.status(job_id, tail_chars=tail_chars)
+
+    def wait_all(self, job_ids: List[str], timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        out = []
+        for job_id in job_ids:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            out.append(self.wait(job_id, timeout=remaining, tail_chars=0))
+        return out
+
+    def cancel(self, job_id: str) -> Dict[str, Any]:
+        job = self._transition(job_id, {QUEUED, RUNNING}, state=CANCELLED, finished_at=time.time())
+        if job is None:
+            return self._load(job_id)
+        with self._lock:
+            proc = self._procs.get(job_id)
+        if proc is not None:
+            proc.terminate()
+        elif job.get("pid") and _pid_alive(job["pid"]):
+            os.kill(job["pid"], signal.SIGTERM)
+        event = self._events.get(job_id)
+        if event is not None and proc is None:
+            event.set()
+        return job
+
+    def list_jobs(self, state: Optional[str] = None) -> List[Dict[str, Any]]:
+        jobs = []
+        for d in sorted(self.jobs_dir.iterdir()) if self.jobs_dir.exists() else []:
+            try:
+                job = json.loads((d / "job.json").read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                continue
+            if state is None or job.get("state") == state:
+                jobs.append(job)
+        return jobs
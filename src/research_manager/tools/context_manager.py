@@ -9,13 +9,22 @@ import json
 import time
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
+
+from research_manager.state.sessions import SessionRegistry
+from research_manager.tracing import current_span, traced
 
 
 @dataclass
 class ContextPaths:
+    """index_path alone is a plain history file. With registry + session_id the
+    history is the session's sealed segments plus its live file (index_path),
+    and pruning materializes it (see state/sessions.py)."""
+
     index_path: Path
     memory_dir: Path
+    registry: Optional[SessionRegistry] = None
+    session_id: Optional[str] = None
 
 
 def read_jsonl(path: Path) -> List[Dict[str, Any]]:
@@ -39,17 +48,36 @@ def write_jsonl(path: Path, items: List[Dict[str, Any]]) -> None:
     path.write_text("\n".join(json.dumps(it, ensure_ascii=True) for it in items) + "\n", encoding="utf-8")
 
 
+def read_history(paths: ContextPaths) -> List[Dict[str, Any]]:
+    if paths.registry is None or paths.session_id is None:
+        return read_jsonl(paths.index_path)
+    out: List[Dict[str, Any]] = []
+    for path in paths.registry.history_files(paths.session_id):
+        out.extend(read_jsonl(path))
+    return out
+
+
+def _write_history(paths: ContextPaths, items: List[Dict[str, Any]]) -> None:
+    if paths.registry is None or paths.session_id is None:
+        write_jsonl(paths.index_path, items)
+        return
+    data = "".join(json.dumps(it, ensure_ascii=True) + "\n" for it in items)
+    paths.registry.materialize(paths.session_id, data.encode("utf-8"))
+
+
 def append_jsonl(path: Path, item: Dict[str, Any]) -> None:
     with path.open("a", encoding="utf-8") as f:
         f.write(json.dumps(item, ensure_ascii=True) + "\n")
 
 
+@traced("history.snapshot")
 def snapshot_index(paths: ContextPaths, label: str = "snapshot") -> Dict[str, Any]:
     ts = int(time.time())
-    items = read_jsonl(paths.index_path)
+    items = read_history(paths)
     paths.memory_dir.mkdir(parents=True, exist_ok=True)
     snap_path = paths.memory_dir / f"index_snapshot_{ts}_{label}.jsonl"
     write_jsonl(snap_path, items)
+    current_span().set(entries=len(items), bytes=snap_path.stat().st_size)
     return {"ok": True, "snapshot": str(snap_path), "count": len(items)}
 
 
@@ -79,32 +107,34 @@ def write_summary_markdown(paths: ContextPaths, summary_md: str, label: str = "s
     return str(out_path)
 
 
+@traced("history.prune")
 def prune_index_keep_last_messages(paths: ContextPaths, keep_last: int = 50) -> Dict[str, Any]:
     """Keep only last N user/assistant/system messages.
 
 Conservative: keeps items after the earliest kept message index.
 Prefer snapshot before pruning.
 """
-    items = read_jsonl(paths.index_path)
+    items = read_history(paths)
     msg_idxs = [i for i, it in enumerate(items) if it.get("role") in {"user", "assistant", "system"} and isinstance(it.get("content"), str)]
     if not msg_idxs:
         return {"ok": True, "kept": 0, "original": len(items)}
     keep_last = max(1, keep_last)
     start_idx = msg_idxs[-keep_last] if len(msg_idxs) >= keep_last else msg_idxs[0]
     pruned = items[start_idx:]
-    write_jsonl(paths.index_path, pruned)
+    _write_history(paths, pruned)
     return {"ok": True, "original": len(items), "kept": len(pruned), "start_index": start_idx}
 
 
+@traced("history.prune")
 def prune_index_keep_last_dialog_turns(paths: ContextPaths, keep_last_turns: int = 80) -> Dict[str, Any]:
     """Aggressively prune index.jsonl by keeping only the last N dialog messages (user/assistant/system).
 
     Drops older tool call artifacts entirely. This WILL break tool-call threading, but keeps future context small.
     Prefer snapshot before pruning.
     """
-    items = read_jsonl(paths.index_path)
+    items = read_history(paths)
     msgs = [it for it in items if it.get("role") in {"user", "assistant", "system"} and isinstance(it.get("content"), str)]
     keep_last_turns = max(1, keep_last_turns)
     kept_msgs = msgs[-keep_last_turns:] if len(msgs) > keep_last_turns else msgs
-    write_jsonl(paths.index_path, kept_msgs)
+    _write_history(paths, kept_msgs)
     return {"ok": True, "original": len(items), "original_messages": len(msgs), "kept": len(kept_msgs)}
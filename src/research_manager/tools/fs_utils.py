@@ -2,9 +2,16 @@
 
 from __future__ import annotations
 
+import fnmatch
+import itertools
 import os
 from pathlib import Path
-from typing import Iterable, List, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from research_manager.tools.section_index import SectionIndex, find_section
+from research_manager.tools.text_search import TrigramIndex, search_files
+
+DEFAULT_SEARCH_ROOTS = ("memory", "projects")
 
 
 def repo_base() -> Path:
@@ -32,12 +39,30 @@ def safe_resolve(rel_path: str, allow_roots: Optional[Iterable[str]] = None) ->
     return p
 
 
-def read_text(rel_path: str, allow_roots: Optional[Iterable[str]] = None, max_chars: int = 200_000) -> str:
+def read_text(
+    rel_path: str,
+    allow_roots: Optional[Iterable[str]] = None,
+    max_chars: int = 200_000,
+    offset: int = 0,
+) -> str:
+    """Read at most max_chars characters starting at byte offset.
+
+    The offset is a seek, so paging through a large log costs the same per
+    page; pass the offset given in the truncation marker. Partial characters
+    at the offset are dropped, as in read_range.
+    """
     p = safe_resolve(rel_path, allow_roots=allow_roots)
-    text = p.read_text(encoding="utf-8")
-    if len(text) > max_chars:
-        return text[:max_chars] + "\n\n...[TRUNCATED]"
-    return text
+    start = max(0, offset)
+    with p.open("rb") as f:
+        f.seek(start)
+        # A UTF-8 character is at most 4 bytes, so this covers max_chars + 1 characters.
+        data = f.read(4 * (max_chars + 1))
+    # surrogateescape keeps one character per undecodable byte, so the window maps back to exact bytes.
+    text = data.decode("utf-8", errors="surrogateescape")
+    if len(text) <= max_chars:
+        return data.decode("utf-8", errors="ignore")
+    window = text[:max_chars].encode("utf-8", errors="surrogateescape")
+    return window.decode("utf-8", errors="ignore") + f"\n\n...[TRUNCATED: continue with offset={start + len(window)}]"
 
 
 def write_text(rel_path: str, content: str, allow_roots: Optional[Iterable[str]] = None) -> None:
@@ -46,12 +71,213 @@ def write_text(rel_path: str, content: str, allow_roots: Optional[Iterable[str]]
     p.write_text(content, encoding="utf-8")
 
 
-def list_files(rel_dir: str, pattern: str = "*", allow_roots: Optional[Iterable[str]] = None, max_results: int = 2000) -> List[str]:
+def _match_parts(parts: Sequence[str], pat: Sequence[str]) -> bool:
+    if not pat:
+        return not parts
+    if pat[0] == "**":
+        return any(_match_parts(parts[i:], pat[1:]) for i in range(len(parts) + 1))
+    return bool(parts) and fnmatch.fnmatchcase(parts[0], pat[0]) and _match_parts(parts[1:], pat[1:])
+
+
+def _may_descend(parts: Sequence[str], pat: Sequence[str]) -> bool:
+    """Whether files below directory parts could still match pat."""
+    for i, name in enumerate(parts):
+        if i >= len(pat) - 1:
+            return False
+        if pat[i] == "**":
+            return True
+        if not fnmatch.fnmatchcase(name, pat[i]):
+            return False
+    return True
+
+
+def iter_files(
+    rel_dir: str,
+    pattern: str = "*",
+    allow_roots: Optional[Iterable[str]] = None,
+    after: Optional[str] = None,
+) -> Iterator[str]:
+    """Lazily yield repo-relative files under rel_dir matching a glob pattern.
+
+    Uses os.scandir with names sorted per directory, so the order is stable
+    and `after` (a previously yielded path) resumes just past that entry
+    without revisiting earlier subtrees. Supports "*", "sub/*.md", "**/*.md".
+    """
     d = safe_resolve(rel_dir, allow_roots=allow_roots)
-    out = []
-    for fp in d.glob(pattern):
-        if fp.is_file():
-            out.append(str(fp.relative_to(repo_base())))
-        if len(out) >= max_results:
-            break
-    return sorted(out)
+    prefix = os.path.relpath(d, repo_base())
+    pat = [x for x in pattern.split("/") if x]
+    cursor: Optional[Tuple[str, ...]] = None
+    if after:
+        cursor = tuple(Path(os.path.relpath(after, prefix)).parts)
+
+    def _walk(abs_dir: str, parts: Tuple[str, ...]) -> Iterator[str]:
+        try:
+            with os.scandir(abs_dir) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except OSError:
+            return
+        for entry in entries:
+            child = parts + (entry.name,)
+            try:
+                is_dir = entry.is_dir(follow_symlinks=False)
+                is_file = not is_dir and entry.is_file()
+            except OSError:
+                continue
+            if is_dir:
+                if cursor is not None and child < cursor and cursor[: len(child)] != child:
+                    continue
+                if _may_descend(child, pat):
+                    yield from _walk(entry.path, child)
+            elif is_file and (cursor is None or child > cursor) and _match_parts(child, pat):
+                yield os.path.normpath(os.path.join(prefix, *child))
+
+    return _walk(str(d), ())
+
+
+def list_files(rel_dir: str, pattern: str = "*", allow_roots: Optional[Iterable[str]] = None, max_results: int = 2000) -> List[str]:
+    return list(itertools.islice(iter_files(rel_dir, pattern, allow_roots=allow_roots), max_results))
+
+
+def list_files_page(
+    rel_dir: str,
+    pattern: str = "*",
+    allow_roots: Optional[Iterable[str]] = None,
+    cursor: Optional[str] = None,
+    page_size: int = 500,
+) -> Dict[str, Any]:
+    """One page of iter_files; pass the returned next_cursor to get the following page."""
+    files = list(itertools.islice(iter_files(rel_dir, pattern, allow_roots=allow_roots, after=cursor), page_size + 1))
+    more = len(files) > page_size
+    files = files[:page_size]
+    return {"files": files, "next_cursor": files[-1] if more and files else None}
+
+
+_SECTION_INDEX: Optional[SectionIndex] = None
+_TRIGRAM_INDEX: Optional[TrigramIndex] = None
+
+
+def _generated_path(name: str) -> Optional[Path]:
+    try:
+        from research_manager.state.paths import default_state_paths
+
+        return default_state_paths().generated_dir / name
+    except ValueError:
+        return None
+
+
+def section_index() -> SectionIndex:
+    """Process-wide section index, persisted under state/{env}/generated/ when available."""
+    global _SECTION_INDEX
+    if _SECTION_INDEX is None:
+        _SECTION_INDEX = SectionIndex(_generated_path("_section_index.json"))
+    return _SECTION_INDEX
+
+
+def trigram_index() -> TrigramIndex:
+    """Process-wide trigram index for search_text, persisted like section_index."""
+    global _TRIGRAM_INDEX
+    if _TRIGRAM_INDEX is None:
+        _TRIGRAM_INDEX = TrigramIndex(_generated_path("_trigram_index.json"))
+    return _TRIGRAM_INDEX
+
+
+def refresh_section_index(
+    rel_dir: str = "memory",
+    pattern: str = "*.md",
+    allow_roots: Optional[Iterable[str]] = None,
+) -> Dict[str, Any]:
+    """Incrementally (re)index every markdown memo under rel_dir.
+
+    rel_dir must pass safe_resolve against allow_roots (default: memory, projects);
+    matches of pattern that resolve outside rel_dir are skipped.
+    """
+    allow = list(allow_roots) if allow_roots is not None else list(DEFAULT_SEARCH_ROOTS)
+    d = safe_resolve(rel_dir, allow_roots=allow)
+    files = [p for p in sorted(d.glob(pattern)) if p.resolve().is_relative_to(d)]
+    return section_index().refresh(files)
+
+
+def list_sections(rel_path: str, allow_roots: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+    """Return [{"path", "heading", "level", "start", "length"}] for a markdown file."""
+    p = safe_resolve(rel_path, allow_roots=allow_roots)
+    idx = section_index()
+    sections = idx.get(p)
+    idx.save()
+    return sections
+
+
+def read_range(rel_path: str, start: int, length: int, allow_roots: Optional[Iterable[str]] = None) -> str:
+    """Read length bytes at byte offset start (decoded as UTF-8, partial characters dropped)."""
+    p = safe_resolve(rel_path, allow_roots=allow_roots)
+    with p.open("rb") as f:
+        f.seek(max(0, start))
+        data = f.read(max(0, length))
+    return data.decode("utf-8", errors="ignore")
+
+
+def read_section(
+    rel_path: str,
+    heading: str,
+    allow_roots: Optional[Iterable[str]] = None,
+    max_chars: int = 200_000,
+) -> str:
+    """Read one heading's section (including subsections) without loading the whole file.
+
+    heading may be a bare heading ("Results") or a path ("Plan > Results").
+    """
+    sections = list_sections(rel_path, allow_roots=allow_roots)
+    sec = find_section(sections, heading)
+    if sec is None:
+        raise ValueError(f"Section not found: {heading!r} in {rel_path}")
+    text = read_range(rel_path, sec["start"], sec["length"], allow_roots=allow_roots)
+    if len(text) > max_chars:
+        return text[:max_chars] + "\n\n...[TRUNCATED]"
+    return text
+
+
+def _walk_files(root: Path) -> List[str]:
+    out: List[str] = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if not d.startswith('.') and d != "__pycache__"]
+        out.extend(os.path.join(dirpath, name) for name in filenames if not name.startswith('.'))
+    return out
+
+
+def search_text(
+    pattern: str,
+    roots: Iterable[str] = DEFAULT_SEARCH_ROOTS,
+    allow_roots: Optional[Iterable[str]] = None,
+    *,
+    regex: bool = False,
+    case_sensitive: bool = False,
+    context: int = 1,
+    max_hits: int = 200,
+) -> Dict[str, Any]:
+    """Search files under repo-relative roots; hits are [{"path", "line", "text", "context"}].
+
+    Every root must pass safe_resolve against allow_roots (default: memory, projects);
+    missing roots are skipped. A persistent trigram index narrows the files to scan.
+    """
+    roots = list(roots)
+    allow = list(allow_roots) if allow_roots is not None else list(DEFAULT_SEARCH_ROOTS)
+    files: List[str] = []
+    for root in roots:
+        d = safe_resolve(root, allow_roots=allow)
+        if d.is_file():
+            files.append(str(d))
+        elif d.is_dir():
+            files.extend(_walk_files(d))
+    res = search_files(
+        trigram_index(),
+        pattern,
+        files,
+        regex=regex,
+        case_sensitive=case_sensitive,
+        context=context,
+        max_hits=max_hits,
+    )
+    base = str(repo_base()) + os.sep
+    for hit in res["hits"]:
+        if hit["path"].startswith(base):
+            hit["path"] = hit["path"][len(base):]
+    return res
@@ -0,0 +1,136 @@
+"""Compiled .gitignore-style matchers for repo walking."""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Iterable, List, Optional, Pattern, Sequence, Tuple
+
+DEFAULT_IGNORE_FILES = (".gitignore", ".rmignore")
+
+
+@dataclass(frozen=True)
+class IgnoreRule:
+    regex: Pattern[str]
+    negate: bool
+    dir_only: bool
+
+
+def _translate(pattern: str) -> str:
+    out: List[str] = []
+    i, n = 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        if pattern.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("/**", i) and i + 3 == n:
+            out.append("(?:/.*)?")
+            i += 3
+        elif pattern.startswith("**", i):
+            out.append(".*")
+            i += 2
+        elif c == "*":
+            out.append("[^/]*")
+            i += 1
+        elif c == "?":
+            out.append("[^/]")
+            i += 1
+        elif c == "[":
+            j = pattern.find("]", i + 2)
+            if j == -1:
+                out.append(re.escape(c))
+                i += 1
+                continue
+            body = pattern[i + 1 : j]
+            if body.startswith("!"):
+                body = "^" + body[1:]
+            out.append("[" + body.replace("\\", "\\\\") + "]")
+            i = j + 1
+        elif c == "\\" and i + 1 < n:
+            out.append(re.escape(pattern[i + 1]))
+            i += 2
+        else:
+            out.append(re.escape(c))
+            i += 1
+    return "".join(out)
+
+
+def parse_ignore_line(line: str) -> Optional[IgnoreRule]:
+    """Compile one gitignore line, or return None for blanks/comments."""
+    line = line.rstrip("\n")
+    if not line.endswith("\\ "):
+        line = line.rstrip()
+    if not line or line.startswith("#"):
+        return None
+    negate = line.startswith("!")
+    if negate:
+        line = line[1:]
+    elif line.startswith("\\!") or line.startswith("\\#"):
+        line = line[1:]
+    dir_only = line.endswith("/")
+    line = line.rstrip("/")
+    if not line:
+        return None
+    anchored = "/" in line
+    line = line.lstrip("/")
+    prefix = "^" if anchored else "^(?:.*/)?"
+    return IgnoreRule(re.compile(prefix + _translate(line) + "$"), negate, dir_only)
+
+
+class IgnoreRules:
+    """Rules from one ignore file; paths are matched relative to that file's directory.
+
+    Without negations all rules collapse into one alternation regex per kind
+    (any path / directories only), so a lookup is a single regex match.
+    """
+
+    def __init__(self, rules: Sequence[IgnoreRule]) -> None:
+        self.rules = list(rules)
+        self._has_negation = any(r.negate for r in self.rules)
+        self._any: Optional[Pattern[str]] = None
+        self._dirs: Optional[Pattern[str]] = None
+        if not self._has_negation and self.rules:
+            self._any = _combine([r for r in self.rules if not r.dir_only])
+            self._dirs = _combine(self.rules)
+
+    def match(self, rel_path: str, is_dir: bool) -> Optional[bool]:
+        """Return True (ignored), False (re-included by '!') or None (no rule applies)."""
+        if not self._has_negation:
+            regex = self._dirs if is_dir else self._any
+            return True if regex is not None and regex.match(rel_path) else None
+        for rule in reversed(self.rules):
+            if rule.dir_only and not is_dir:
+                continue
+            if rule.regex.match(rel_path):
+                return not rule.negate
+        return None
+
+
+def _combine(rules: Sequence[IgnoreRule]) -> Optional[Pattern[str]]:
+    if not rules:
+        return None
+    return re.compile("|".join(f"(?:{r.regex.pattern})" for r in rules))
+
+
+@lru_cache(maxsize=256)
+def compile_ignore_lines(lines: Tuple[str, ...]) -> IgnoreRules:
+    rules = [r for r in (parse_ignore_line(ln) for ln in lines) if r is not None]
+    return IgnoreRules(rules)
+
+
+def is_ignored(chain: Iterable[Tuple[str, IgnoreRules]], rel_path: str, is_dir: bool) -> bool:
+    """Evaluate nested ignore files (outermost first); deeper files take precedence."""
+    ignored = False
+    for base, rules in chain:
+        if base:
+            if not rel_path.startswith(base + "/"):
+                continue
+            sub = rel_path[len(base) + 1 :]
+        else:
+            sub = rel_path
+        verdict = rules.match(sub, is_dir)
+        if verdict is not None:
+            ignored = verdict
+    return ignored
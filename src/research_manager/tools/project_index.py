@@ -1,11 +1,15 @@
 from __future__ import annotations
 
-import json
+import os
 import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
+from research_manager.tools.briefs import load_briefs
+
 
 @dataclass
 class ProjectIndexConfig:
@@ -16,9 +20,7 @@ class ProjectIndexConfig:
 
 
 def _load_briefs(briefs_path: Path) -> Dict[str, dict]:
-    if not briefs_path.exists():
-        return {}
-    return json.loads(briefs_path.read_text(encoding='utf-8'))
+    return load_briefs(briefs_path)
 
 
 def _is_project_memo(p: Path) -> bool:
@@ -34,41 +36,84 @@ def _is_project_memo(p: Path) -> bool:
     return True
 
 
+# Only this many bytes of a memo are read when looking for its one-liner.
+HEAD_BYTES = 16_384
+
+_ONE_LINER_RE = re.compile(r'(?i)one.?liner\s*[:\-]\s*(.+)')
+# path -> ((size, mtime_ns, inode), one_liner); heuristic results only, briefs are checked first.
+_HEURISTIC_CACHE: Dict[str, Tuple[Tuple[int, int, int], str]] = {}
+_HEURISTIC_LOCK = threading.Lock()
+
+
+def _read_head(p: Path, max_bytes: int = HEAD_BYTES) -> str:
+    with p.open('rb') as f:
+        data = f.read(max_bytes)
+    return data.decode('utf-8', errors='ignore')
+
+
+def _heuristic_one_liner(text: str) -> str:
+    first_two: List[str] = []
+    for ln in text.splitlines():
+        ln = ln.strip()
+        if not ln:
+            continue
+        m = _ONE_LINER_RE.match(ln)
+        if m:
+            return m.group(1).strip()
+        if len(first_two) < 2:
+            first_two.append(ln)
+
+    # Fallback: second non-empty non-heading line
+    raw = first_two[1] if len(first_two) > 1 else (first_two[0] if first_two else '')
+    return re.sub(r'^#+\s*', '', raw)[:220]
+
+
 def _extract_one_liner(p: Path, briefs: Dict[str, dict]) -> str:
-    """Return one_liner from briefs (prefer 'One-liner:' header) or heuristic fallback."""
+    """Return one_liner from briefs (prefer 'One-liner:' header) or heuristic fallback.
+
+    The heuristic only reads the first HEAD_BYTES of the file and is memoized
+    per path by (size, mtime_ns, inode).
+    """
     # Try briefs keyed by relative path (may use str(p) or relative key)
-    for key in (str(p), p.name):
+    for key in (str(p), f"memory/{p.name}", p.name):
         brief = briefs.get(key) or {}
         ol = (brief.get('one_liner') or '').strip()
         if ol:
             return ol
 
-    # Heuristic: look for "One-liner: ..." header in file
     try:
-        txt = p.read_text(encoding='utf-8', errors='ignore')
-    except Exception:
+        st = os.stat(p)
+    except OSError:
         return ''
-    for ln in txt.splitlines():
-        ln = ln.strip()
-        m = re.match(r'(?i)one.?liner\s*[:\-]\s*(.+)', ln)
-        if m:
-            return m.group(1).strip()
+    sig = (st.st_size, st.st_mtime_ns, st.st_ino)
+    key = str(p)
+    cached = _HEURISTIC_CACHE.get(key)
+    if cached is not None and cached[0] == sig:
+        return cached[1]
 
-    # Fallback: second non-empty non-heading line
-    lines = [l.strip() for l in txt.splitlines() if l.strip()]
-    raw = lines[1] if len(lines) > 1 else (lines[0] if lines else '')
-    return re.sub(r'^#+\s*', '', raw)[:220]
+    # Heuristic: look for "One-liner: ..." header near the top of the file
+    try:
+        one_liner = _heuristic_one_liner(_read_head(p))
+    except Exception:
+        return ''
+    with _HEURISTIC_LOCK:
+        _HEURISTIC_CACHE[key] = (sig, one_liner)
+    return one_liner
 
 
-def generate_project_index(cfg: ProjectIndexConfig) -> str:
+def generate_project_index(cfg: ProjectIndexConfig, max_workers: int = 8) -> str:
     briefs = _load_briefs(cfg.briefs_path)
 
-    projects: List[Tuple[str, str, str]] = []
-    for p in sorted(cfg.memory_dir.glob('*.md')):
-        if not _is_project_memo(p):
-            continue
-        one_liner = _extract_one_liner(p, briefs)
-        projects.append((p.stem, f"memory/{p.name}", one_liner))
+    memos = [p for p in sorted(cfg.memory_dir.glob('*.md')) if _is_project_memo(p)]
+    if len(memos) > 1 and max_workers > 1:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(memos))) as pool:
+            one_liners = list(pool.map(lambda p: _extract_one_liner(p, briefs), memos))
+    else:
+        one_liners = [_extract_one_liner(p, briefs) for p in memos]
+
+    projects: List[Tuple[str, str, str]] = [
+        (p.stem, f"memory/{p.name}", ol) for p, ol in zip(memos, one_liners)
+    ]
 
     out: List[str] = ["# Project Index (auto-generated)", "", "## memory/ (project memos)"]
     for key, rel, ol in projects:
@@ -80,18 +125,26 @@ def generate_project_index(cfg: ProjectIndexConfig) -> str:
         "- src/research_manager/tools/context_manager.py: snapshot/summarize/prune index.jsonl context",
         "- src/research_manager/tools/claude_code.py: run Claude Code CLI",
         "- src/research_manager/tools/briefs.py: refresh project briefs (cached)",
-        "- src/research_manager/tools/fs_utils.py: safe file read/write/list",
+        "- src/research_manager/tools/fs_utils.py: safe file read/write/list, section/byte-range reads, search_text",
         "",
         "## How to use",
         "- Startup context is intentionally hyper-brief.",
         "- To work on a project: open its file with python (read_text) and quote relevant sections.",
+        "- For long memos: list_sections(path) then read_section(path, heading) to read only what you need.",
+        "- To find which memo mentions a concept: search_text(pattern) instead of reading files one by one.",
     ]
 
     return "\n".join(out) + "\n"
 
 
 def write_project_index(cfg: ProjectIndexConfig) -> Path:
+    """Write the index, skipping the write when the content is unchanged."""
     text = generate_project_index(cfg)
+    try:
+        if cfg.output_path.read_text(encoding='utf-8') == text:
+            return cfg.output_path
+    except (OSError, UnicodeDecodeError):
+        pass
     cfg.output_path.parent.mkdir(parents=True, exist_ok=True)
     cfg.output_path.write_text(text, encoding='utf-8')
     return cfg.output_path
@@ -0,0 +1,325 @@
+"""Warm, forked worker process for the python tool.
+
+The worker is forked from the chat process, so it inherits the loaded modules
+and the tool scope, and keeps that scope alive across calls. Requests and
+replies travel over a multiprocessing Pipe tagged with request ids, which lets
+several calls run concurrently (each in a worker thread); stdout is streamed
+back as it is written. Each request carries the caller's tracing turn and span
+ids, so spans opened by tool code in the worker land in the caller's turn.
+Limits:
+
+- wall clock: the parent stops waiting after timeout_s, kills the worker and
+  starts a fresh one (the scope is lost);
+- CPU and memory: while a call is in flight the parent samples the worker's
+  CPU time and resident size from /proc every WATCHDOG_INTERVAL_S; if the
+  call used more than cpu_s of CPU, or the worker grew more than memory_mb
+  past the chat process's size at fork, the worker is killed and restarted.
+
+The limits are enforced from the parent rather than with setrlimit so that
+subprocesses started by tool code (claude, git, ...) do not inherit them.
+Without /proc only the wall clock limit applies.
+
+Fork hazard: restarts fork the chat process while its other threads (tool
+threads, pipe readers, the UI) keep running, and only the forking thread
+exists in the child, so a lock another thread held at that moment stays held
+forever there. The worker only takes locks it creates after the fork, and
+the module-level locks tool code can reach (the stdout proxy in
+tool_executor, the tracing sink) are re-created in the child through
+os.register_at_fork. A fork/spawn context would avoid this but could not
+inherit the live tool scope, which is the point of the worker.
+"""
+
+from __future__ import annotations
+
+import atexit
+import multiprocessing
+import multiprocessing.util  # registers its exit handler first, so ours (see __init__) runs before it
+import os
+import queue
+import signal
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from research_manager.tools.tool_executor import merge_scope_changes
+from research_manager.tracing import attach, span, trace_context
+
+DEFAULT_TIMEOUT_S = 3600.0
+DEFAULT_CPU_S = 600
+DEFAULT_MEMORY_MB = 4096
+WATCHDOG_INTERVAL_S = 0.1
+
+RunFn = Callable[[str, Dict[str, Any], Callable[[str], None]], Dict[str, Any]]
+
+
+def _proc_usage(pid: int) -> Optional[Tuple[float, int]]:
+    """(CPU seconds, resident bytes) of a process from /proc/<pid>/stat, or None if unavailable."""
+    try:
+        with open(f"/proc/{pid}/stat", "r", encoding="ascii") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        utime, stime, rss_pages = int(fields[11]), int(fields[12]), int(fields[21])
+        return (utime + stime) / os.sysconf("SC_CLK_TCK"), rss_pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _child_main(conn: Any, parent_conn: Any, run_fn: RunFn, scope: Dict[str, Any]) -> None:
+    # Drop the inherited parent end so the worker sees EOF if the chat process dies.
+    parent_conn.close()
+    send_lock = threading.Lock()
+    scopes: Dict[str, Dict[str, Any]] = {}
+
+    def send(msg: Any) -> None:
+        with send_lock:
+            conn.send(msg)
+
+    def work(req_id: str, code: str, token: Optional[str], trace: Tuple[Optional[str], Optional[str]]) -> None:
+        try:
+            if token and token not in scopes:
+                raise KeyError(f"unknown scope handle {token!r} (worker restarted?)")
+            with attach(*trace), span("python_worker.exec"):
+                result = run_fn(code, scopes[token] if token else scope, lambda text: send(("out", req_id, text)))
+        except BaseException as exc:  # noqa: BLE001
+            result = {"ok": False, "error": f"{type(exc).__name__}: {exc}", "error_type": type(exc).__name__}
+        fatal = result.get("error_type") == "MemoryError"
+        try:
+            send(("done", req_id, result, fatal))
+        except Exception as exc:  # noqa: BLE001 - unpicklable result
+            send(("done", req_id, {"ok": False, "error": f"Result could not be sent back: {exc}"}, fatal))
+
+    while True:
+        try:
+            msg = conn.recv()
+        except (EOFError, OSError):
+            break
+        kind = msg[0]
+        if kind == "run":
+            _, req_id, code, token, trace = msg
+            threading.Thread(target=work, args=(req_id, code, token, trace), daemon=True).start()
+        elif kind == "fork":
+            scopes[msg[1]] = dict(scope)
+        elif kind == "merge":
+            copy = scopes.pop(msg[1], None)
+            if copy is not None:
+                merge_scope_changes(scope, copy)
+        elif kind == "stop":
+            break
+    os._exit(0)
+
+
+class PythonWorker:
+    """Parent-side handle: run(code) blocks until the worker replies, restarting it on limit violations.
+
+    run_fn(code, scope, emit) executes one snippet in the worker (emit streams
+    stdout text); it must return a picklable dict.
+    """
+
+    def __init__(
+        self,
+        run_fn: RunFn,
+        scope: Dict[str, Any],
+        *,
+        timeout_s: float = DEFAULT_TIMEOUT_S,
+        cpu_s: Optional[int] = DEFAULT_CPU_S,
+        memory_mb: Optional[int] = DEFAULT_MEMORY_MB,
+    ) -> None:
+        self.run_fn = run_fn
+        self.scope = scope
+        self.timeout_s = timeout_s
+        self.cpu_s = cpu_s
+        self.memory_mb = memory_mb
+        self.restarts = 0
+        self.calls = 0
+        self._lock = threading.Lock()
+        self._send_lock = threading.Lock()
+        self._proc: Any = None
+        self._conn: Any = None
+        self._waiters: Dict[str, "queue.Queue[Any]"] = {}
+        self._generation = 0
+        self._rss_limit: Optional[int] = None
+        # atexit runs handlers last-in first-out: stop the worker before multiprocessing joins it.
+        atexit.register(self.close)
+
+    # ---- lifecycle ----
+    def start(self) -> "PythonWorker":
+        with self._lock:
+            if self._proc is None or not self._proc.is_alive():
+                self._spawn()
+        return self
+
+    def _spawn(self) -> None:
+        ctx = multiprocessing.get_context("fork")
+        parent_conn, child_conn = ctx.Pipe()
+        proc = ctx.Process(
+            target=_child_main,
+            args=(child_conn, parent_conn, self.run_fn, self.scope),
+            name="python-tool-worker",
+            # Not a daemon: tool code may start its own processes (e.g. the symbol index pool).
+            # The worker exits when its pipe closes, and close() runs at exit.
+            daemon=False,
+        )
+        proc.start()
+        child_conn.close()
+        # The worker starts as a copy of this process, so its size now is the memory baseline.
+        usage = _proc_usage(os.getpid())
+        self._rss_limit = usage[1] + self.memory_mb * 1024 * 1024 if usage and self.memory_mb else None
+        self._proc, self._conn = proc, parent_conn
+        self._generation += 1
+        threading.Thread(target=self._reader, args=(parent_conn, self._generation), daemon=True).start()
+
+    def _reader(self, conn: Any, generation: int) -> None:
+        while True:
+            try:
+                msg = conn.recv()
+            except (EOFError, OSError):
+                break
+            waiter = self._waiters.get(msg[1])
+            if waiter is not None:
+                waiter.put(msg)
+        with self._lock:
+            if generation == self._generation:
+                self._fail_waiters(("dead", None, generation))
+
+    def _fail_waiters(self, msg: Any) -> None:
+        for waiter in list(self._waiters.values()):
+            waiter.put(msg)
+
+    def _kill(self, grace_s: float = 0.0) -> Optional[int]:
+        proc, self._proc = self._proc, None
+        if proc is None:
+            return None
+        proc.join(grace_s)
+        if proc.is_alive():
+            proc.kill()
+        proc.join(5)
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+        return proc.exitcode
+
+    def restart(self, generation: Optional[int] = None) -> None:
+        """Kill and respawn the worker; with generation, only if that worker is still the current one."""
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            with span("python_worker.restart", restarts=self.restarts + 1):
+                self._restart_locked()
+
+    def _restart_locked(self) -> None:
+        self._kill()
+        self._fail_waiters(("dead", None, self._generation))
+        self.restarts += 1
+        self._spawn()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                try:
+                    self._conn.send(("stop",))
+                except OSError:
+                    pass
+            self._generation += 1
+            self._kill()
+
+    # ---- requests ----
+    def _send(self, msg: Any) -> None:
+        self.start()
+        with self._send_lock:
+            self._conn.send(msg)
+
+    def fork_scope(self) -> str:
+        """Create a private copy of the worker scope; returns its handle."""
+        token = uuid.uuid4().hex
+        self._send(("fork", token))
+        return token
+
+    def merge_scope(self, token: str) -> None:
+        self._send(("merge", token))
+
+    def run(
+        self,
+        code: str,
+        *,
+        scope_token: Optional[str] = None,
+        timeout_s: Optional[float] = None,
+        on_output: Optional[Callable[[str], None]] = None,
+    ) -> Dict[str, Any]:
+        timeout_s = self.timeout_s if timeout_s is None else timeout_s
+        req_id = uuid.uuid4().hex
+        waiter: "queue.Queue[Any]" = queue.Queue()
+        self._waiters[req_id] = waiter
+        deadline = time.monotonic() + timeout_s
+        self.calls += 1
+        try:
+            self._send(("run", req_id, code, scope_token, trace_context()))
+            generation, proc = self._generation, self._proc
+            usage = _proc_usage(proc.pid) if proc is not None else None
+            cpu_start = usage[0] if usage else 0.0
+            while True:
+                remaining = deadline - time.monotonic()
+                try:
+                    msg = waiter.get(timeout=max(0.0, min(remaining, WATCHDOG_INTERVAL_S)))
+                except queue.Empty:
+                    if time.monotonic() >= deadline:
+                        self.restart()
+                        return {"ok": False, "error": f"Python tool timed out after {timeout_s}s; worker restarted (scope reset)."}
+                    violation = self._check_limits(proc, generation, cpu_start)
+                    if violation:
+                        return {"ok": False, "error": violation}
+                    continue
+                if msg[0] == "out":
+                    if on_output is not None:
+                        on_output(msg[2])
+                elif msg[0] == "done":
+                    result, fatal = msg[2], msg[3]
+                    if fatal:
+                        self.restart()
+                        result = dict(result)
+                        result["error"] = f"{result.get('error') or 'MemoryError'} (memory limit; worker restarted, scope reset)"
+                    return result
+                else:
+                    return {"ok": False, "error": self._death_reason(msg[2])}
+        finally:
+            self._waiters.pop(req_id, None)
+
+    def _check_limits(self, proc: Any, generation: int, cpu_start: float) -> Optional[str]:
+        """Restart the worker and return the reason if it is over its CPU or memory budget."""
+        usage = _proc_usage(proc.pid) if proc is not None else None
+        if usage is None:
+            return None
+        cpu, rss = usage
+        if self.cpu_s and cpu - cpu_start > self.cpu_s:
+            reason = f"Python tool exceeded its CPU limit ({self.cpu_s}s); worker restarted (scope reset)."
+        elif self._rss_limit is not None and rss > self._rss_limit:
+            reason = f"Python tool exceeded its memory limit ({self.memory_mb} MB); worker restarted (scope reset)."
+        else:
+            return None
+        self.restart(generation)
+        return reason
+
+    def _death_reason(self, generation: int) -> str:
+        exitcode = None
+        with self._lock:
+            # Only the first waiter to notice a dead worker reaps and replaces it.
+            if generation == self._generation:
+                with span("python_worker.restart", restarts=self.restarts + 1) as sp:
+                    exitcode = self._kill(grace_s=5)
+                    self.restarts += 1
+                    self._spawn()
+                    sp.set(exitcode=exitcode)
+        if exitcode is None:
+            return "Python worker was restarted while this call was running (scope reset)."
+        if exitcode == -signal.SIGKILL:
+            return "Python worker was killed (likely out of memory); worker restarted (scope reset)."
+        return f"Python worker exited (code {exitcode}); worker restarted (scope reset)."
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pid": self._proc.pid if self._proc is not None else None,
+            "calls": self.calls,
+            "restarts": self.restarts,
+            "timeout_s": self.timeout_s,
+            "cpu_s": self.cpu_s,
+            "memory_mb": self.memory_mb,
+        }
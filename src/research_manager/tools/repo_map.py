@@ -1,27 +1,404 @@
-"""Repo mapping and discovery."""
+"""Repo mapping and discovery.
+
+The map is maintained incrementally: each directory's listing is cached with
+its mtime_ns, and a refresh only re-lists directories whose mtime changed
+(a directory's mtime moves whenever an entry is added, removed or renamed).
+
+Listings are taken with os.scandir and stored per directory in columnar form
+(names / kinds / sizes / mtimes). Entries matched by .gitignore or .rmignore
+files are dropped during the walk, so ignored trees (checkpoints, datasets,
+run logs) are never descended into. File size/mtime are as of the last time
+their directory was listed; pass stat_files=True to refresh them.
+"""
 
 from __future__ import annotations
 
+import json
 import os
+import tempfile
+import threading
 import time
+from array import array
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, Any, Set
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+from research_manager.tools.ignore_rules import (
+    DEFAULT_IGNORE_FILES,
+    IgnoreRules,
+    compile_ignore_lines,
+    is_ignored,
+)
+
+DEFAULT_SKIP_DIRS = {".git", "__pycache__", ".venv", "venv", ".pytest_cache"}
+REPO_MAP_STATE_VERSION = 2
+# Serializes load/refresh/save of persisted states between threads (e.g. RepoMapWatcher and tool calls).
+_STATE_LOCK = threading.Lock()
+
+KIND_FILE = "f"
+KIND_DIR = "d"
+KIND_LINK = "l"
+
+
+def _list_dir(path: str, skip_dirs: Set[str]) -> Dict[str, Any]:
+    rows: List[Tuple[str, str, int, int]] = []
+    with os.scandir(path) as it:
+        for entry in it:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in skip_dirs:
+                        rows.append((entry.name, KIND_DIR, 0, 0))
+                    continue
+                if entry.name.startswith('.'):
+                    continue
+                st = entry.stat(follow_symlinks=False)
+                kind = KIND_LINK if entry.is_symlink() else KIND_FILE
+                rows.append((entry.name, kind, st.st_size, st.st_mtime_ns))
+            except OSError:
+                continue
+    rows.sort()
+    return {
+        "names": [r[0] for r in rows],
+        "kinds": "".join(r[1] for r in rows),
+        "sizes": [r[2] for r in rows],
+        "mtimes": [r[3] for r in rows],
+    }
+
+
+def _restat_files(abs_dir: str, entry: Dict[str, Any]) -> Dict[str, Any]:
+    sizes, mtimes = list(entry["sizes"]), list(entry["mtimes"])
+    for i, (name, kind) in enumerate(zip(entry["names"], entry["kinds"])):
+        if kind == KIND_DIR:
+            continue
+        try:
+            st = os.lstat(os.path.join(abs_dir, name))
+        except OSError:
+            continue
+        sizes[i], mtimes[i] = st.st_size, st.st_mtime_ns
+    return {**entry, "sizes": sizes, "mtimes": mtimes}
+
+
+def restat_files(state: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy of state with file sizes/mtimes refreshed (one lstat per file, no directory listing)."""
+    base = state["base_dir"]
+    dirs = {
+        rel: _restat_files(os.path.join(base, rel) if rel else base, entry)
+        for rel, entry in (state.get("dirs") or {}).items()
+    }
+    return {**state, "dirs": dirs}
+
+
+def _load_ignore(abs_dir: str, ignore_files: Sequence[str], prev: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Return {"sig": [...], "lines": [...]} for ignore files in abs_dir, reusing prev if unchanged."""
+    sig: List[List[Any]] = []
+    for name in ignore_files:
+        try:
+            st = os.stat(os.path.join(abs_dir, name))
+        except OSError:
+            continue
+        sig.append([name, st.st_size, st.st_mtime_ns])
+    if not sig:
+        return None
+    if prev and prev.get("sig") == sig:
+        return prev
+    lines: List[str] = []
+    for name, _, _ in sig:
+        try:
+            with open(os.path.join(abs_dir, name), "r", encoding="utf-8", errors="ignore") as f:
+                lines.extend(f.read().splitlines())
+        except OSError:
+            continue
+    return {"sig": sig, "lines": lines}
+
 
+def refresh_repo_map_state(
+    base_dir: Path,
+    state: Optional[Dict[str, Any]] = None,
+    skip_dirs: Set[str] | None = None,
+    ignore_files: Sequence[str] = DEFAULT_IGNORE_FILES,
+    extra_ignore: Sequence[str] = (),
+    stat_files: bool = False,
+) -> Dict[str, Any]:
+    """Return an updated per-directory map state, re-listing only changed directories.
 
-def build_repo_map(base_dir: Path, max_files: int = 5000, skip_dirs: Set[str] | None = None) -> Dict[str, Any]:
+    ignore_files are read in every directory (gitignore semantics, deeper files
+    win); extra_ignore holds additional patterns anchored at base_dir.
+    """
     if skip_dirs is None:
-        skip_dirs = {".git", "__pycache__", ".venv", "venv", ".pytest_cache"}
-    repo_map: Dict[str, Any] = {"generated_at": time.time(), "files": [], "truncated": False}
-    count = 0
-    for root, dirs, files in os.walk(base_dir):
-        dirs[:] = [d for d in dirs if d not in skip_dirs]
-        for name in files:
-            if name.startswith('.'):
-                continue
-            rel = os.path.relpath(os.path.join(root, name), base_dir)
-            repo_map["files"].append(rel)
-            count += 1
-            if count >= max_files:
-                repo_map["truncated"] = True
-                return repo_map
-    return repo_map
+        skip_dirs = DEFAULT_SKIP_DIRS
+    base = str(base_dir)
+    config = {"skip_dirs": sorted(skip_dirs), "ignore_files": list(ignore_files), "extra_ignore": list(extra_ignore)}
+    prev_dirs: Dict[str, Any] = {}
+    if state and state.get("version") == REPO_MAP_STATE_VERSION and state.get("base_dir") == base:
+        if all(state.get(k) == v for k, v in config.items()):
+            prev_dirs = state.get("dirs") or {}
+
+    root_chain: Tuple[Tuple[str, IgnoreRules], ...] = ()
+    if extra_ignore:
+        root_chain = (("", compile_ignore_lines(tuple(extra_ignore))),)
+
+    dirs: Dict[str, Any] = {}
+    scanned = reused = 0
+    stack: List[Tuple[str, Tuple[Tuple[str, IgnoreRules], ...]]] = [("", root_chain)]
+    while stack:
+        rel, chain = stack.pop()
+        abs_path = os.path.join(base, rel) if rel else base
+        try:
+            mtime_ns = os.stat(abs_path).st_mtime_ns
+        except OSError:
+            continue
+        prev = prev_dirs.get(rel)
+        if prev is not None and prev.get("mtime_ns") == mtime_ns:
+            entry = _restat_files(abs_path, prev) if stat_files else dict(prev)
+            reused += 1
+        else:
+            try:
+                listing = _list_dir(abs_path, skip_dirs)
+            except OSError:
+                continue
+            entry = {"mtime_ns": mtime_ns, **listing}
+            scanned += 1
+
+        ignore = _load_ignore(abs_path, ignore_files, (prev or {}).get("ignore"))
+        entry.pop("ignore", None)
+        if ignore is not None:
+            entry["ignore"] = ignore
+            chain = chain + ((rel, compile_ignore_lines(tuple(ignore["lines"]))),)
+
+        hidden: List[str] = []
+        for name, kind in zip(entry["names"], entry["kinds"]):
+            path = os.path.join(rel, name) if rel else name
+            if chain and is_ignored(chain, path, kind == KIND_DIR):
+                hidden.append(name)
+            elif kind == KIND_DIR:
+                stack.append((path, chain))
+        entry["hidden"] = hidden
+        dirs[rel] = entry
+
+    return {
+        "version": REPO_MAP_STATE_VERSION,
+        "base_dir": base,
+        **config,
+        "generated_at": time.time(),
+        "dirs": dirs,
+        "stats": {"dirs_scanned": scanned, "dirs_reused": reused},
+    }
+
+
+def _iter_rows(state: Dict[str, Any]) -> Iterator[Tuple[str, str, int, int]]:
+    dirs = state.get("dirs") or {}
+    for rel in sorted(dirs):
+        entry = dirs[rel]
+        hidden = set(entry.get("hidden") or ())
+        for name, kind, size, mtime in zip(entry["names"], entry["kinds"], entry["sizes"], entry["mtimes"]):
+            if kind == KIND_DIR or name in hidden:
+                continue
+            yield (os.path.join(rel, name) if rel else name), kind, size, mtime
+
+
+def iter_repo_files(state: Dict[str, Any], exclude_prefixes: Iterable[str] = ()) -> Iterable[str]:
+    """Yield repo-relative file paths from a map state in sorted directory order."""
+    exclude = tuple(exclude_prefixes)
+    for path, _, _, _ in _iter_rows(state):
+        if exclude and path.startswith(exclude):
+            continue
+        yield path
+
+
+@dataclass
+class FileTable:
+    """Columnar per-file metadata (parallel arrays) for repeated filtered queries."""
+
+    paths: List[str] = field(default_factory=list)
+    kinds: List[str] = field(default_factory=list)
+    sizes: array = field(default_factory=lambda: array("q"))
+    mtimes_ns: array = field(default_factory=lambda: array("q"))
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any], exclude_prefixes: Iterable[str] = ()) -> "FileTable":
+        table = cls()
+        exclude = tuple(exclude_prefixes)
+        for path, kind, size, mtime in _iter_rows(state):
+            if exclude and path.startswith(exclude):
+                continue
+            table.paths.append(path)
+            table.kinds.append(kind)
+            table.sizes.append(size)
+            table.mtimes_ns.append(mtime)
+        return table
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def query(
+        self,
+        *,
+        ext: str | Sequence[str] | None = None,
+        prefix: Optional[str] = None,
+        min_size: Optional[int] = None,
+        max_size: Optional[int] = None,
+        modified_within_s: Optional[float] = None,
+        newest_first: bool = False,
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """Filter files by extension(s), path prefix, size bounds and recency."""
+        exts = (ext,) if isinstance(ext, str) else tuple(ext or ())
+        exts = tuple(e if e.startswith(".") else "." + e for e in exts)
+        cutoff = None
+        if modified_within_s is not None:
+            cutoff = time.time_ns() - int(modified_within_s * 1e9)
+        idxs = []
+        for i, path in enumerate(self.paths):
+            if exts and not path.endswith(exts):
+                continue
+            if prefix and not path.startswith(prefix):
+                continue
+            size = self.sizes[i]
+            if min_size is not None and size < min_size:
+                continue
+            if max_size is not None and size > max_size:
+                continue
+            if cutoff is not None and self.mtimes_ns[i] < cutoff:
+                continue
+            idxs.append(i)
+        if newest_first:
+            idxs.sort(key=lambda i: self.mtimes_ns[i], reverse=True)
+        if limit is not None:
+            idxs = idxs[:limit]
+        return [
+            {"path": self.paths[i], "kind": self.kinds[i], "size": self.sizes[i], "mtime_ns": self.mtimes_ns[i]}
+            for i in idxs
+        ]
+
+
+def repo_map_from_state(
+    state: Dict[str, Any], max_files: int = 5000, exclude_prefixes: Iterable[str] = ()
+) -> Dict[str, Any]:
+    """Render the classic {"files": [...], "truncated": bool} map from a map state."""
+    files: List[str] = []
+    total = 0
+    for path in iter_repo_files(state, exclude_prefixes=exclude_prefixes):
+        total += 1
+        if len(files) < max_files:
+            files.append(path)
+    return {
+        "generated_at": state.get("generated_at", time.time()),
+        "files": files,
+        "truncated": total > len(files),
+        "total_files": total,
+    }
+
+
+def load_repo_map_state(path: Path) -> Optional[Dict[str, Any]]:
+    try:
+        obj = json.loads(path.read_text(encoding="utf-8"))
+    except Exception:
+        return None
+    return obj if isinstance(obj, dict) else None
+
+
+def save_repo_map_state(path: Path, state: Dict[str, Any]) -> None:
+    """Atomically replace path; each writer uses its own temp file, so concurrent saves never collide."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.name + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(json.dumps(state, ensure_ascii=False))
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def _state_dir_pattern(base_dir: Path, state_path: Path) -> List[str]:
+    """Ignore pattern for the directory holding state_path when it lies inside base_dir."""
+    rel = os.path.relpath(os.path.abspath(state_path.parent), os.path.abspath(base_dir))
+    if rel == "." or rel.startswith(".."):
+        return []
+    return ["/" + rel.replace(os.sep, "/") + "/"]
+
+
+def update_repo_map_state(
+    base_dir: Path,
+    state_path: Path,
+    skip_dirs: Set[str] | None = None,
+    extra_ignore: Sequence[str] = (),
+    stat_files: bool = False,
+) -> Dict[str, Any]:
+    """Load the persisted state, refresh it, and persist it again if anything changed.
+
+    The directory holding state_path is left out of the walk; otherwise saving
+    the state would change the tree and force a rescan and rewrite every call.
+    """
+    extra = list(extra_ignore) + _state_dir_pattern(base_dir, state_path)
+    with _STATE_LOCK:
+        prev = load_repo_map_state(state_path)
+        # Create the state directory before the walk so the first save does not change the tree.
+        state_path.parent.mkdir(parents=True, exist_ok=True)
+        state = refresh_repo_map_state(base_dir, prev, skip_dirs=skip_dirs, extra_ignore=extra, stat_files=stat_files)
+        if prev is None or state["dirs"] != prev.get("dirs"):
+            save_repo_map_state(state_path, state)
+    return state
+
+
+def build_repo_map(
+    base_dir: Path,
+    max_files: int = 5000,
+    skip_dirs: Set[str] | None = None,
+    state_path: Optional[Path] = None,
+) -> Dict[str, Any]:
+    """Map repo files; with state_path the walk is incremental across calls."""
+    if state_path is not None:
+        state = update_repo_map_state(base_dir, state_path, skip_dirs=skip_dirs)
+    else:
+        state = refresh_repo_map_state(base_dir, skip_dirs=skip_dirs)
+    return repo_map_from_state(state, max_files=max_files)
+
+
+class RepoMapWatcher(threading.Thread):
+    """Daemon thread that keeps a persisted repo map state current by polling.
+
+    Each poll costs one stat() per directory; only directories whose mtime
+    changed are re-listed. Use .state for the latest in-memory state.
+    """
+
+    def __init__(
+        self,
+        base_dir: Path,
+        state_path: Path,
+        interval_s: float = 5.0,
+        skip_dirs: Set[str] | None = None,
+        extra_ignore: Sequence[str] = (),
+    ) -> None:
+        super().__init__(name="repo-map-watcher", daemon=True)
+        self.base_dir = base_dir
+        self.state_path = state_path
+        self.interval_s = interval_s
+        self.skip_dirs = skip_dirs
+        self.extra_ignore = tuple(extra_ignore)
+        self.state: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self._stop_event = threading.Event()
+
+    def poll_once(self) -> Dict[str, Any]:
+        self.state = update_repo_map_state(
+            self.base_dir, self.state_path, skip_dirs=self.skip_dirs, extra_ignore=self.extra_ignore
+        )
+        return self.state
+
+    def run(self) -> None:
+        while not self._stop_event.is_set():
+            try:
+                self.poll_once()
+                self.error = None
+            except Exception as exc:  # noqa: BLE001
+                self.error = str(exc)
+            self._stop_event.wait(self.interval_s)
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop_event.set()
+        if self.is_alive():
+            self.join(timeout)
@@ -0,0 +1,151 @@
+"""Heading-level section index for markdown memos (heading path -> byte range).
+
+Sections span from their heading line to the next heading of the same or a
+higher level, so a section includes its subsections. Offsets are in bytes so
+readers can seek straight to a section without loading the whole file.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+SECTION_INDEX_VERSION = 1
+PATH_SEP = " > "
+
+_HEADING_RE = re.compile(rb"^(#{1,6})\s+(.*?)\s*#*\s*$")
+_FENCE_RE = re.compile(rb"^\s*(```|~~~)")
+
+
+def scan_sections(path: Path) -> List[Dict[str, Any]]:
+    """Return [{"path", "heading", "level", "start", "length"}] for each heading in path."""
+    open_sections: List[Dict[str, Any]] = []
+    out: List[Dict[str, Any]] = []
+    offset = 0
+    in_fence = False
+    with open(path, "rb") as f:
+        for line in f:
+            if _FENCE_RE.match(line):
+                in_fence = not in_fence
+            elif not in_fence:
+                m = _HEADING_RE.match(line.rstrip(b"\r\n"))
+                if m:
+                    level = len(m.group(1))
+                    while open_sections and open_sections[-1]["level"] >= level:
+                        done = open_sections.pop()
+                        done["length"] = offset - done["start"]
+                    heading = m.group(2).decode("utf-8", errors="replace")
+                    parents = [s["heading"] for s in open_sections]
+                    sec = {
+                        "path": PATH_SEP.join(parents + [heading]),
+                        "heading": heading,
+                        "level": level,
+                        "start": offset,
+                        "length": 0,
+                    }
+                    open_sections.append(sec)
+                    out.append(sec)
+            offset += len(line)
+    for sec in open_sections:
+        sec["length"] = offset - sec["start"]
+    return out
+
+
+def _parts(heading_path: str) -> List[str]:
+    return [" ".join(p.lower().split()) for p in heading_path.split(">") if p.strip()]
+
+
+def find_section(sections: List[Dict[str, Any]], heading: str) -> Optional[Dict[str, Any]]:
+    """Match a full heading path ("A > B"), then a path suffix / bare heading, then a substring."""
+    want = _parts(heading)
+    if not want:
+        return None
+    candidates = [(_parts(sec["path"]), sec) for sec in sections]
+    for parts, sec in candidates:
+        if parts == want:
+            return sec
+    for parts, sec in candidates:
+        if parts[-len(want):] == want:
+            return sec
+    for parts, sec in candidates:
+        if want[-1] in parts[-1]:
+            return sec
+    return None
+
+
+def _stat_sig(st: os.stat_result) -> List[int]:
+    return [st.st_size, st.st_mtime_ns, st.st_ino]
+
+
+class SectionIndex:
+    """Per-file section lists cached by stat signature, optionally persisted as JSON.
+
+    get() rescans a file only when its (size, mtime_ns, inode) changed.
+    """
+
+    def __init__(self, index_path: Optional[Path] = None) -> None:
+        self.index_path = index_path
+        self._files: Optional[Dict[str, Any]] = None
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    def _load(self) -> Dict[str, Any]:
+        if self._files is None:
+            files: Dict[str, Any] = {}
+            if self.index_path is not None:
+                try:
+                    obj = json.loads(self.index_path.read_text(encoding="utf-8"))
+                    if isinstance(obj, dict) and obj.get("version") == SECTION_INDEX_VERSION:
+                        files = obj.get("files") or {}
+                except Exception:
+                    files = {}
+            self._files = files
+        return self._files
+
+    def get(self, path: Path) -> List[Dict[str, Any]]:
+        key = str(path)
+        sig = _stat_sig(os.stat(path))
+        with self._lock:
+            files = self._load()
+            entry = files.get(key)
+            if entry is not None and entry.get("sig") == sig:
+                return entry["sections"]
+        sections = scan_sections(path)
+        with self._lock:
+            files[key] = {"sig": sig, "sections": sections}
+            self._dirty = True
+        return sections
+
+    def refresh(self, paths: List[Path]) -> Dict[str, Any]:
+        """Index every path (rescanning only changed ones), drop vanished files, and save."""
+        indexed = 0
+        for p in paths:
+            try:
+                self.get(p)
+                indexed += 1
+            except OSError:
+                continue
+        with self._lock:
+            files = self._load()
+            for key in [k for k in files if not os.path.exists(k)]:
+                del files[key]
+                self._dirty = True
+        self.save()
+        return {"ok": True, "files": indexed}
+
+    def save(self) -> None:
+        if self.index_path is None:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            payload = json.dumps({"version": SECTION_INDEX_VERSION, "files": self._files}, ensure_ascii=False)
+            self._dirty = False
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.index_path.with_name(self.index_path.name + ".tmp")
+        tmp.write_text(payload, encoding="utf-8")
+        os.replace(tmp, self.index_path)
@@ -0,0 +1,176 @@
+"""Python symbol index (modules, classes, functions) built alongside the repo map.
+
+Entries are cached per file by stat signature and SHA-256: unchanged files are
+skipped on stat alone, touched-but-identical files are re-hashed but not
+re-parsed. Large batches (e.g. the first build) are parsed in a process pool.
+"""
+
+from __future__ import annotations
+
+import ast
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+SYMBOL_INDEX_VERSION = 1
+# Below this many files to (re)parse, a process pool costs more than it saves.
+POOL_THRESHOLD = 64
+
+
+def module_name_for(rel_path: str) -> str:
+    parts = rel_path[: -len(".py")].replace(os.sep, "/").split("/")
+    if parts and parts[0] == "src":
+        parts = parts[1:]
+    if parts and parts[-1] == "__init__":
+        parts = parts[:-1]
+    return ".".join(parts)
+
+
+def extract_symbols(source: str, module: str) -> List[Dict[str, Any]]:
+    """Return module/class/function/method symbols with 1-based line ranges."""
+    tree = ast.parse(source)
+    lines = source.count("\n") + 1
+    out: List[Dict[str, Any]] = [
+        {"name": module.rsplit(".", 1)[-1], "qualname": module, "kind": "module", "line": 1, "end_line": lines}
+    ]
+
+    def _visit(body: Iterable[ast.stmt], prefix: str, in_class: bool) -> None:
+        for node in body:
+            if isinstance(node, ast.ClassDef):
+                kind = "class"
+            elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                kind = "method" if in_class else "function"
+            else:
+                continue
+            qualname = f"{prefix}.{node.name}" if prefix else node.name
+            out.append(
+                {
+                    "name": node.name,
+                    "qualname": f"{module}.{qualname}" if module else qualname,
+                    "kind": kind,
+                    "line": node.lineno,
+                    "end_line": getattr(node, "end_lineno", node.lineno),
+                }
+            )
+            _visit(node.body, qualname, kind == "class")
+
+    _visit(tree.body, "", False)
+    return out
+
+
+def _index_file(job: Tuple[str, str, Optional[str]]) -> Dict[str, Any]:
+    """Worker: read, hash and (unless the hash is unchanged) parse one file."""
+    base_dir, rel, prev_sha = job
+    path = os.path.join(base_dir, rel)
+    try:
+        st = os.stat(path)
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError as exc:
+        return {"rel": rel, "error": str(exc)}
+    sha = hashlib.sha256(data).hexdigest()
+    out: Dict[str, Any] = {"rel": rel, "size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": sha}
+    if sha == prev_sha:
+        out["unchanged"] = True
+        return out
+    try:
+        out["symbols"] = extract_symbols(data.decode("utf-8", errors="replace"), module_name_for(rel))
+    except SyntaxError as exc:
+        out["symbols"] = []
+        out["parse_error"] = f"{exc.msg} (line {exc.lineno})"
+    return out
+
+
+def load_symbol_index(path: Path) -> Dict[str, Any]:
+    try:
+        obj = json.loads(path.read_text(encoding="utf-8"))
+    except Exception:
+        obj = None
+    if not isinstance(obj, dict) or obj.get("version") != SYMBOL_INDEX_VERSION:
+        return {"version": SYMBOL_INDEX_VERSION, "files": {}}
+    return obj
+
+
+def update_symbol_index(
+    base_dir: Path,
+    rel_paths: Iterable[str],
+    index_path: Path,
+    max_workers: Optional[int] = None,
+    pool_threshold: int = POOL_THRESHOLD,
+) -> Dict[str, Any]:
+    """Bring the persisted index in line with rel_paths; returns the index plus stats."""
+    index = load_symbol_index(index_path)
+    old_files: Dict[str, Any] = index["files"]
+    files: Dict[str, Any] = {}
+    jobs: List[Tuple[str, str, Optional[str]]] = []
+    base = str(base_dir)
+
+    for rel in rel_paths:
+        prev = old_files.get(rel)
+        try:
+            st = os.stat(os.path.join(base, rel))
+        except OSError:
+            continue
+        if prev and prev.get("size") == st.st_size and prev.get("mtime_ns") == st.st_mtime_ns:
+            files[rel] = prev
+            continue
+        jobs.append((base, rel, (prev or {}).get("sha256")))
+
+    if len(jobs) >= pool_threshold:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            results = list(pool.map(_index_file, jobs, chunksize=16))
+    else:
+        results = [_index_file(job) for job in jobs]
+
+    parsed = 0
+    for res in results:
+        rel = res.pop("rel")
+        if "error" in res:
+            continue
+        if res.pop("unchanged", False):
+            files[rel] = {**old_files[rel], **res}
+        else:
+            files[rel] = res
+            parsed += 1
+
+    changed = bool(jobs) or files.keys() != old_files.keys()
+    index = {"version": SYMBOL_INDEX_VERSION, "files": files}
+    if changed:
+        index_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = index_path.with_name(index_path.name + ".tmp")
+        tmp.write_text(json.dumps(index, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, index_path)
+    index["stats"] = {"files": len(files), "checked": len(jobs), "parsed": parsed}
+    return index
+
+
+def find_symbols(
+    index: Dict[str, Any],
+    name: str,
+    kind: Optional[str] = None,
+    exact: bool = False,
+    limit: int = 50,
+) -> List[Dict[str, Any]]:
+    """Look up symbols by name or dotted qualname suffix.
+
+    exact=True matches the bare name or a qualname ending in ".{name}";
+    otherwise a case-insensitive substring match on the qualname.
+    """
+    needle = name.lower()
+    hits: List[Dict[str, Any]] = []
+    for rel in sorted(index.get("files") or {}):
+        for sym in index["files"][rel].get("symbols") or ():
+            if kind and sym["kind"] != kind:
+                continue
+            if exact:
+                ok = sym["name"] == name or sym["qualname"] == name or sym["qualname"].endswith("." + name)
+            else:
+                ok = needle in sym["qualname"].lower()
+            if ok:
+                hits.append({"path": rel, **sym})
+                if len(hits) >= limit:
+                    return hits
+    return hits
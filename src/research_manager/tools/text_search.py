@@ -0,0 +1,269 @@
+"""Full-text search with a persistent trigram index.
+
+Each indexed file stores its set of lowercase character trigrams. A query
+extracts a literal from the pattern, intersects the posting lists of its
+trigrams to get candidate files, and only those candidates are scanned line
+by line (in a thread pool) to produce hits. Files that are too large to index
+are always scanned. Entries are refreshed by stat signature.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+TRIGRAM_INDEX_VERSION = 1
+MAX_INDEX_BYTES = 4_000_000
+_SNIFF_BYTES = 8192
+_REGEX_META = set(".^$*+?{}[]\\|()")
+
+
+def trigrams(text: str) -> Set[str]:
+    text = text.lower()
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+def required_literal(pattern: str, regex: bool) -> str:
+    """Return a substring every match must contain ("" when none can be derived).
+
+    For regexes this is the longest run of plain characters outside groups,
+    classes and quantified atoms; patterns with alternation yield "".
+    """
+    if not regex:
+        return pattern
+    if "|" in pattern:
+        return ""
+    best, run = "", ""
+    i, depth = 0, 0
+    while i < len(pattern):
+        c = pattern[i]
+        lit: Optional[str] = None
+        if c == "\\" and i + 1 < len(pattern):
+            nxt = pattern[i + 1]
+            lit = None if nxt.isalnum() else nxt
+            i += 2
+        elif c == "[":
+            j = pattern.find("]", i + 2)
+            i = j + 1 if j != -1 else len(pattern)
+        elif c == "(":
+            depth += 1
+            i += 1
+        elif c == ")":
+            depth -= 1
+            i += 1
+        elif c in "*?{":
+            # The preceding atom is optional, so it cannot be part of the literal.
+            run = run[:-1]
+            if c == "{":
+                j = pattern.find("}", i)
+                i = j + 1 if j != -1 else len(pattern)
+            else:
+                i += 1
+        elif c in _REGEX_META:
+            i += 1
+        else:
+            lit = c
+            i += 1
+        if lit is not None and depth == 0:
+            run += lit
+        else:
+            best = max(best, run, key=len)
+            run = ""
+    return max(best, run, key=len)
+
+
+def _stat_sig(st: os.stat_result) -> List[int]:
+    return [st.st_size, st.st_mtime_ns]
+
+
+def _read_text_file(path: str) -> Optional[str]:
+    with open(path, "rb") as f:
+        data = f.read()
+    if b"\0" in data[:_SNIFF_BYTES]:
+        return None
+    return data.decode("utf-8", errors="ignore")
+
+
+class TrigramIndex:
+    """Trigram sets per file (keyed by absolute path), persisted as JSON."""
+
+    def __init__(self, index_path: Optional[Path] = None, max_index_bytes: int = MAX_INDEX_BYTES) -> None:
+        self.index_path = index_path
+        self.max_index_bytes = max_index_bytes
+        self._files: Optional[Dict[str, Any]] = None
+        self._postings: Optional[Dict[str, Set[str]]] = None
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    def _load(self) -> Dict[str, Any]:
+        if self._files is None:
+            files: Dict[str, Any] = {}
+            if self.index_path is not None:
+                try:
+                    obj = json.loads(self.index_path.read_text(encoding="utf-8"))
+                    if isinstance(obj, dict) and obj.get("version") == TRIGRAM_INDEX_VERSION:
+                        files = obj.get("files") or {}
+                except Exception:
+                    files = {}
+            self._files = files
+        return self._files
+
+    def update(self, paths: Iterable[str]) -> Dict[str, Any]:
+        """Re-index changed files; returns {"indexed": [...], "unindexed": [...], "reindexed": n}.
+
+        Unindexed files (too large, unreadable) must be scanned directly.
+        """
+        with self._lock:
+            files = self._load()
+            indexed: List[str] = []
+            unindexed: List[str] = []
+            reindexed = 0
+            for path in paths:
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                sig = _stat_sig(st)
+                entry = files.get(path)
+                if entry is not None and entry.get("sig") == sig:
+                    (indexed if entry.get("grams") is not None else unindexed).append(path)
+                    continue
+                grams: Optional[str] = None
+                if st.st_size <= self.max_index_bytes:
+                    try:
+                        text = _read_text_file(path)
+                    except OSError:
+                        text = None
+                    if text is not None:
+                        grams = "".join(sorted(trigrams(text)))
+                binary = grams is None and st.st_size <= self.max_index_bytes
+                files[path] = {"sig": sig, "grams": grams, "binary": binary}
+                self._dirty = True
+                self._postings = None
+                reindexed += 1
+                (indexed if grams is not None else unindexed).append(path)
+            return {"indexed": indexed, "unindexed": unindexed, "reindexed": reindexed}
+
+    def _build_postings(self) -> Dict[str, Set[str]]:
+        if self._postings is None:
+            postings: Dict[str, Set[str]] = {}
+            for path, entry in self._load().items():
+                grams = entry.get("grams")
+                if not grams:
+                    continue
+                for i in range(0, len(grams), 3):
+                    postings.setdefault(grams[i : i + 3], set()).add(path)
+            self._postings = postings
+        return self._postings
+
+    def candidates(self, literal: str, among: Iterable[str]) -> List[str]:
+        """Indexed paths (from among) that contain every trigram of literal."""
+        among_list = list(among)
+        grams = trigrams(literal)
+        if not grams:
+            return among_list
+        with self._lock:
+            postings = self._build_postings()
+            sets = sorted((postings.get(g, set()) for g in grams), key=len)
+            hit = set.intersection(*sets) if sets else set()
+        return [p for p in among_list if p in hit]
+
+    def is_binary(self, path: str) -> bool:
+        entry = (self._files or {}).get(path) or {}
+        return bool(entry.get("binary"))
+
+    def prune(self) -> None:
+        with self._lock:
+            files = self._load()
+            for key in [k for k in files if not os.path.exists(k)]:
+                del files[key]
+                self._dirty = True
+                self._postings = None
+
+    def save(self) -> None:
+        if self.index_path is None:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            payload = json.dumps({"version": TRIGRAM_INDEX_VERSION, "files": self._files}, ensure_ascii=False)
+            self._dirty = False
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.index_path.with_name(self.index_path.name + ".tmp")
+        tmp.write_text(payload, encoding="utf-8")
+        os.replace(tmp, self.index_path)
+
+
+def _scan_file(path: str, rx: "re.Pattern[str]", context: int, max_hits: int) -> List[Tuple[int, str, List[str]]]:
+    hits: List[Tuple[int, str, List[str]]] = []
+    before: deque = deque(maxlen=context)
+    pending: List[Tuple[int, str, List[str], int]] = []
+    try:
+        with open(path, "r", encoding="utf-8", errors="ignore") as f:
+            for lineno, line in enumerate(f, start=1):
+                line = line.rstrip("\n")
+                still: List[Tuple[int, str, List[str], int]] = []
+                for n, text, ctx, need in pending:
+                    ctx.append(line)
+                    if need > 1:
+                        still.append((n, text, ctx, need - 1))
+                    else:
+                        hits.append((n, text, ctx))
+                pending = still
+                if rx.search(line) and len(hits) + len(pending) < max_hits:
+                    ctx = list(before) + [line]
+                    if context:
+                        pending.append((lineno, line, ctx, context))
+                    else:
+                        hits.append((lineno, line, ctx))
+                before.append(line)
+                if len(hits) >= max_hits:
+                    break
+    except OSError:
+        return hits
+    hits.extend((n, text, ctx) for n, text, ctx, _ in pending)
+    hits.sort(key=lambda h: h[0])
+    return hits[:max_hits]
+
+
+def search_files(
+    index: TrigramIndex,
+    pattern: str,
+    paths: List[str],
+    *,
+    regex: bool = False,
+    case_sensitive: bool = False,
+    context: int = 1,
+    max_hits: int = 200,
+    max_workers: int = 8,
+) -> Dict[str, Any]:
+    """Search paths for pattern; returns {"hits": [{"path", "line", "text", "context"}], ...}."""
+    flags = 0 if case_sensitive else re.IGNORECASE
+    rx = re.compile(pattern if regex else re.escape(pattern), flags)
+    state = index.update(paths)
+    index.save()
+    literal = required_literal(pattern, regex)
+    to_scan = index.candidates(literal, state["indexed"])
+    to_scan += [p for p in state["unindexed"] if not index.is_binary(p)]
+
+    hits: List[Dict[str, Any]] = []
+    if to_scan:
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(to_scan)))) as pool:
+            results = list(pool.map(lambda p: _scan_file(p, rx, context, max_hits), to_scan))
+        for path, file_hits in zip(to_scan, results):
+            for lineno, text, ctx in file_hits:
+                hits.append({"path": path, "line": lineno, "text": text, "context": ctx})
+    hits.sort(key=lambda h: (h["path"], h["line"]))
+    return {
+        "hits": hits[:max_hits],
+        "truncated": len(hits) > max_hits,
+        "files_total": len(paths),
+        "files_scanned": len(to_scan),
+        "reindexed": state["reindexed"],
+    }
@@ -0,0 +1,275 @@
+"""Concurrent executor for the function calls in one model response.
+
+Independent python tool calls run in a thread pool, each against its own
+shallow copy of the shared scope; new or rebound names are merged back in call
+order. A call runs serially (after everything before it has finished) when it
+touches shared state: index.jsonl writers, files, subprocesses, or names bound
+by a still-running call. History items are logged in call_id order either way.
+"""
+
+from __future__ import annotations
+
+import ast
+import contextlib
+import contextvars
+import io
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, TextIO, Tuple
+
+# Scope helpers and builtins that mutate shared state (history, files, processes).
+SERIAL_NAMES = frozenset(
+    {
+        "append_item",
+        "append_message",
+        "write_index_entries",
+        "delete_index_line",
+        "snapshot_index",
+        "prune_index_keep_last_messages",
+        "write_summary_markdown",
+        "run_claude",
+        "claude_jobs",
+        "open",
+        "exec",
+        "eval",
+        "input",
+        "subprocess",
+        "shutil",
+    }
+)
+SERIAL_ATTRS = frozenset(
+    {
+        "write_text",
+        "write_bytes",
+        "remove",
+        "unlink",
+        "rename",
+        "replace",
+        "rmdir",
+        "mkdir",
+        "makedirs",
+        "system",
+        "popen",
+        "putenv",
+        "chdir",
+    }
+)
+
+
+class _ThreadLocalStdout(io.TextIOBase):
+    """sys.stdout proxy: threads inside capture_stdout() write to their own buffer."""
+
+    def __init__(self, fallback: TextIO) -> None:
+        self.fallback = fallback
+        self.local = threading.local()
+
+    def _target(self) -> TextIO:
+        return getattr(self.local, "buf", None) or self.fallback
+
+    def write(self, s: str) -> int:
+        return self._target().write(s)
+
+    def flush(self) -> None:
+        self._target().flush()
+
+    def writable(self) -> bool:
+        return True
+
+
+class TeeStringIO(io.StringIO):
+    """StringIO that also forwards every write to a callback (for streaming stdout)."""
+
+    def __init__(self, on_write: Callable[[str], None]) -> None:
+        super().__init__()
+        self.on_write = on_write
+
+    def write(self, s: str) -> int:
+        if s:
+            self.on_write(s)
+        return super().write(s)
+
+
+_PROXY_LOCK = threading.Lock()
+
+
+def _reset_proxy_lock() -> None:
+    # A forked child (the python worker) must not inherit the lock held by another thread.
+    global _PROXY_LOCK
+    _PROXY_LOCK = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_proxy_lock)
+
+
+@contextlib.contextmanager
+def capture_stdout(buf: io.StringIO) -> Iterator[io.StringIO]:
+    """Thread-safe replacement for contextlib.redirect_stdout."""
+    with _PROXY_LOCK:
+        proxy = sys.stdout
+        if not isinstance(proxy, _ThreadLocalStdout):
+            proxy = _ThreadLocalStdout(sys.stdout)
+            sys.stdout = proxy
+    prev = getattr(proxy.local, "buf", None)
+    proxy.local.buf = buf
+    try:
+        yield buf
+    finally:
+        proxy.local.buf = prev
+
+
+def code_names(code: str) -> Tuple[Set[str], Set[str], bool]:
+    """Return (free loads, top-level bound names, serial) for a python tool snippet.
+
+    Free loads exclude names the snippet binds itself via import/def/class.
+    serial is True when the code calls a state-touching helper, uses a
+    `global` statement, or does not parse.
+    """
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return set(), set(), True
+    loads: Set[str] = set()
+    stores: Set[str] = set()
+    serial = False
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name):
+            if isinstance(node.ctx, ast.Load):
+                loads.add(node.id)
+                if node.id in SERIAL_NAMES:
+                    serial = True
+        elif isinstance(node, ast.Attribute) and node.attr in SERIAL_ATTRS:
+            serial = True
+        elif isinstance(node, (ast.Global, ast.Nonlocal)):
+            serial = True
+        elif isinstance(node, (ast.Import, ast.ImportFrom)):
+            for alias in node.names:
+                if alias.name.split(".")[0] in SERIAL_NAMES:
+                    serial = True
+    binders: Set[str] = set()
+    for node in tree.body:
+        for sub in ast.walk(node):
+            if isinstance(sub, ast.Name) and isinstance(sub.ctx, (ast.Store, ast.Del)):
+                stores.add(sub.id)
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            binders.add(node.name)
+        elif isinstance(node, (ast.Import, ast.ImportFrom)):
+            binders.update((a.asname or a.name).split(".")[0] for a in node.names)
+    return loads - binders, stores | binders, serial
+
+
+def merge_scope_changes(dst: Dict[str, Any], src: Dict[str, Any]) -> None:
+    """Copy names that src added or rebound (by identity) into dst."""
+    for key, value in src.items():
+        if key not in dst or dst[key] is not value:
+            dst[key] = value
+
+
+@dataclass
+class _Pending:
+    call: Any
+    future: Optional["Future[Any]"] = None
+    scope: Any = None
+    stores: Set[str] = field(default_factory=set)
+
+
+class ToolExecutor:
+    """Run a response's function calls, in parallel where safe, logging results in order.
+
+    run(call, scope) executes one call against scope and returns its output
+    dict; log(item) appends a history item. submit() may be called as calls
+    stream in; finish() waits for the rest and returns the function_call_output
+    items in call order. Per-call durations land in self.durations.
+
+    fork_scope()/merge_scope(handle) override how a parallel call gets its
+    private scope and how it is folded back (default: dict copy + merge_scope_changes);
+    an out-of-process runner can pass handles to scopes it owns instead.
+    """
+
+    def __init__(
+        self,
+        run: Callable[[Any, Dict[str, Any]], Dict[str, Any]],
+        log: Callable[[Dict[str, Any]], Any],
+        scope: Dict[str, Any],
+        parallel: bool = True,
+        max_workers: int = 8,
+        fork_scope: Optional[Callable[[], Any]] = None,
+        merge_scope: Optional[Callable[[Any], None]] = None,
+    ) -> None:
+        self.run = run
+        self.log = log
+        self.scope = scope
+        self.fork_scope = fork_scope or (lambda: dict(self.scope))
+        self.merge_scope = merge_scope or (lambda copy: merge_scope_changes(self.scope, copy))
+        self.parallel = parallel
+        self.max_workers = max_workers
+        self.outputs: List[Dict[str, Any]] = []
+        self.durations: List[Dict[str, Any]] = []
+        self._pending: List[_Pending] = []
+        self._pool: Optional[ThreadPoolExecutor] = None
+
+    def _timed(self, call: Any, scope: Any) -> Tuple[Dict[str, Any], float]:
+        start = time.perf_counter()
+        try:
+            output = self.run(call, scope)
+        except Exception as exc:  # noqa: BLE001
+            output = {"ok": False, "error": str(exc)}
+        return output, time.perf_counter() - start
+
+    def _classify(self, call: Any) -> Tuple[bool, Set[str]]:
+        if not self.parallel or call.name != "python":
+            return False, set()
+        try:
+            code = (json.loads(call.arguments) if call.arguments else {}).get("code", "")
+        except (ValueError, AttributeError):
+            return False, set()
+        loads, stores, serial = code_names(code)
+        busy = set().union(*(p.stores for p in self._pending)) if self._pending else set()
+        # Reading a name that a running call binds needs that call's result first.
+        if serial or loads & busy:
+            return False, stores
+        return True, stores
+
+    def _record(self, call: Any, output: Dict[str, Any], duration: float) -> None:
+        self.log({"type": "function_call", "name": call.name, "call_id": call.call_id, "arguments": call.arguments or ""})
+        output_str = json.dumps(output)
+        self.log({"type": "function_call_output", "call_id": call.call_id, "output": output_str, "duration_s": round(duration, 4)})
+        self.outputs.append({"type": "function_call_output", "call_id": call.call_id, "output": output_str})
+        self.durations.append({"call_id": call.call_id, "duration_s": duration})
+
+    def _drain(self) -> None:
+        for p in self._pending:
+            assert p.future is not None
+            output, duration = p.future.result()
+            self.merge_scope(p.scope)
+            self._record(p.call, output, duration)
+        self._pending = []
+
+    def submit(self, call: Any) -> None:
+        safe, stores = self._classify(call)
+        if not safe:
+            self._drain()
+            output, duration = self._timed(call, self.scope)
+            self._record(call, output, duration)
+            return
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="tool-call")
+        scope = self.fork_scope()
+        ctx = contextvars.copy_context()
+        future = self._pool.submit(ctx.run, self._timed, call, scope)
+        self._pending.append(_Pending(call=call, future=future, scope=scope, stores=stores))
+
+    def finish(self) -> List[Dict[str, Any]]:
+        try:
+            self._drain()
+        finally:
+            if self._pool is not None:
+                self._pool.shutdown(wait=True)
+                self._pool = None
+        outputs, self.outputs = self.outputs, []
+        return outputs
@@ -0,0 +1,301 @@
+"""Lightweight timing spans written to state/{env}/metrics.jsonl.
+
+    with span("s2.request", endpoint="search") as sp:
+        data = fetch()
+        sp.set(bytes=len(raw), cache_hit=False)
+
+Each finished span becomes one JSON line: name, start time, duration_s,
+ok/error, the turn id and parent span it ran under, plus any attributes
+(bytes, input_tokens/output_tokens, cache_hit, ...). Turn ids and parents
+live in context variables, so spans opened in tool threads (started with
+contextvars.copy_context) are attributed to the right turn; other processes
+get them via trace_context() / attach(). Until configure() is called spans
+only measure time and nothing is written. A forked child inherits the sink.
+
+summarize_metrics() / slowest_turns() / format_report() back
+`python -m research_manager.app metrics`.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import contextvars
+import functools
+import json
+import math
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, TypeVar
+
+DEFAULT_MAX_BYTES = 50 * 1024 * 1024
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class MetricsLog:
+    """Append-only JSONL sink shared by all threads; rotated to <name>.1 when it grows past max_bytes."""
+
+    def __init__(self, path: Path, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            if self.path.stat().st_size > max_bytes:
+                os.replace(self.path, self.path.with_name(self.path.name + ".1"))
+        except FileNotFoundError:
+            pass
+
+    def write(self, record: Dict[str, Any]) -> None:
+        line = json.dumps(record, ensure_ascii=True, default=str) + "\n"
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line)
+
+
+_SINK: Optional[MetricsLog] = None
+_TURN: "contextvars.ContextVar[Optional[str]]" = contextvars.ContextVar("rm_trace_turn", default=None)
+_CURRENT: "contextvars.ContextVar[Optional[Span]]" = contextvars.ContextVar("rm_trace_span", default=None)
+
+
+def _reset_sink_lock() -> None:
+    # Only the forking thread survives fork(); a lock held by another thread would never be released.
+    if _SINK is not None:
+        _SINK._lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_sink_lock)
+
+
+def configure(path: Optional[Path], max_bytes: int = DEFAULT_MAX_BYTES) -> Optional[MetricsLog]:
+    """Send spans to path (None disables writing)."""
+    global _SINK
+    _SINK = MetricsLog(path, max_bytes) if path is not None else None
+    return _SINK
+
+
+def enabled() -> bool:
+    return _SINK is not None
+
+
+class Span:
+    __slots__ = ("name", "span_id", "parent", "attrs", "started", "duration_s")
+
+    def __init__(self, name: str, parent: Optional[str], attrs: Dict[str, Any]) -> None:
+        self.name = name
+        self.span_id = uuid.uuid4().hex[:12]
+        self.parent = parent
+        self.attrs = attrs
+        self.started = time.time()
+        self.duration_s = 0.0
+
+    def set(self, **attrs: Any) -> "Span":
+        self.attrs.update(attrs)
+        return self
+
+    def add(self, key: str, amount: float) -> "Span":
+        self.attrs[key] = self.attrs.get(key, 0) + amount
+        return self
+
+
+class _NullSpan(Span):
+    def __init__(self) -> None:
+        super().__init__("", None, {})
+
+    def set(self, **attrs: Any) -> "Span":
+        return self
+
+    def add(self, key: str, amount: float) -> "Span":
+        return self
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def current_span() -> Span:
+    """The innermost open span (a no-op span outside any), for annotating from helpers."""
+    return _CURRENT.get() or _NULL_SPAN
+
+
+def trace_context() -> Tuple[Optional[str], Optional[str]]:
+    """(turn id, innermost span id), to hand to another process for attach()."""
+    parent = _CURRENT.get()
+    return _TURN.get(), parent.span_id if parent is not None else None
+
+
+@contextlib.contextmanager
+def attach(turn_id: Optional[str], parent_id: Optional[str]) -> Iterator[None]:
+    """Open spans inside this block under a turn and parent span from trace_context()."""
+    parent = None
+    if parent_id is not None:
+        parent = Span("remote", None, {})
+        parent.span_id = parent_id
+    turn_token, span_token = _TURN.set(turn_id), _CURRENT.set(parent)
+    try:
+        yield
+    finally:
+        _CURRENT.reset(span_token)
+        _TURN.reset(turn_token)
+
+
+@contextlib.contextmanager
+def span(name: str, **attrs: Any) -> Iterator[Span]:
+    parent = _CURRENT.get()
+    sp = Span(name, parent.span_id if parent is not None else None, attrs)
+    token = _CURRENT.set(sp)
+    t0 = time.perf_counter()
+    error: Optional[str] = None
+    try:
+        yield sp
+    except BaseException as exc:
+        error = type(exc).__name__
+        raise
+    finally:
+        sp.duration_s = time.perf_counter() - t0
+        _CURRENT.reset(token)
+        sink = _SINK
+        if sink is not None:
+            record = {
+                "ts": round(sp.started, 6),
+                "name": name,
+                "duration_s": round(sp.duration_s, 6),
+                "ok": error is None,
+                "turn": _TURN.get(),
+                "span": sp.span_id,
+                "parent": sp.parent,
+            }
+            if error is not None:
+                record["error"] = error
+            record.update(sp.attrs)
+            sink.write(record)
+
+
+def traced(name: str) -> Callable[[F], F]:
+    """Decorator: run the function inside span(name); it can annotate via current_span()."""
+
+    def decorate(fn: F) -> F:
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with span(name):
+                return fn(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorate
+
+
+@contextlib.contextmanager
+def turn(**attrs: Any) -> Iterator[Span]:
+    """Span named "turn" that also tags every span opened inside it with a new turn id."""
+    token = _TURN.set(uuid.uuid4().hex[:12])
+    try:
+        with span("turn", **attrs) as sp:
+            yield sp
+    finally:
+        _TURN.reset(token)
+
+
+# ---- reporting ----
+def load_records(path: Path, since: Optional[float] = None) -> List[Dict[str, Any]]:
+    records: List[Dict[str, Any]] = []
+    try:
+        f = open(path, "r", encoding="utf-8")
+    except FileNotFoundError:
+        return records
+    with f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(record, dict) and (since is None or record.get("ts", 0) >= since):
+                records.append(record)
+    return records
+
+
+def _percentile(ordered: List[float], q: float) -> float:
+    return ordered[max(1, math.ceil(q / 100.0 * len(ordered))) - 1] if ordered else 0.0
+
+
+def summarize_metrics(records: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Per span name: count, errors, p50/p95/max/total seconds, bytes and cache hit rate."""
+    grouped: Dict[str, List[Dict[str, Any]]] = {}
+    for record in records:
+        grouped.setdefault(record.get("name", "?"), []).append(record)
+    out: Dict[str, Dict[str, Any]] = {}
+    for name, group in grouped.items():
+        durations = sorted(float(r.get("duration_s", 0.0)) for r in group)
+        stats: Dict[str, Any] = {
+            "count": len(group),
+            "errors": sum(1 for r in group if not r.get("ok", True)),
+            "p50_s": _percentile(durations, 50),
+            "p95_s": _percentile(durations, 95),
+            "max_s": durations[-1],
+            "total_s": sum(durations),
+        }
+        sizes = [r["bytes"] for r in group if isinstance(r.get("bytes"), (int, float))]
+        if sizes:
+            stats["bytes"] = sum(sizes)
+        hits = [bool(r["cache_hit"]) for r in group if "cache_hit" in r]
+        if hits:
+            stats["cache_hit_rate"] = sum(hits) / len(hits)
+        for key in ("input_tokens", "output_tokens"):
+            tokens = [r[key] for r in group if isinstance(r.get(key), int)]
+            if tokens:
+                stats[key] = sum(tokens)
+        out[name] = stats
+    return out
+
+
+def slowest_turns(records: List[Dict[str, Any]], top: int = 5) -> List[Dict[str, Any]]:
+    """Slowest "turn" spans with the time of the spans inside them, summed per name."""
+    inside: Dict[str, Dict[str, float]] = {}
+    for record in records:
+        turn_id = record.get("turn")
+        if turn_id and record.get("name") != "turn":
+            per_name = inside.setdefault(turn_id, {})
+            per_name[record["name"]] = per_name.get(record["name"], 0.0) + float(record.get("duration_s", 0.0))
+    turns = sorted((r for r in records if r.get("name") == "turn"), key=lambda r: r.get("duration_s", 0.0), reverse=True)
+    out = []
+    for record in turns[:top]:
+        breakdown = inside.get(record.get("turn") or "", {})
+        out.append(
+            {
+                "turn": record.get("turn"),
+                "ts": record.get("ts"),
+                "duration_s": record.get("duration_s"),
+                "stages": record.get("stages", {}),
+                "spans": dict(sorted(breakdown.items(), key=lambda kv: kv[1], reverse=True)),
+            }
+        )
+    return out
+
+
+def format_report(summary: Dict[str, Dict[str, Any]], turns: List[Dict[str, Any]]) -> str:
+    lines = [f"{'operation':<28}{'count':>7}{'err':>5}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}{'total s':>9}  extra"]
+    for name, s in sorted(summary.items(), key=lambda kv: kv[1]["total_s"], reverse=True):
+        extra = []
+        if "cache_hit_rate" in s:
+            extra.append(f"hit {s['cache_hit_rate']:.0%}")
+        if "bytes" in s:
+            extra.append(f"{s['bytes'] / 1e6:.1f} MB")
+        if "input_tokens" in s or "output_tokens" in s:
+            extra.append(f"tokens {s.get('input_tokens', 0)}/{s.get('output_tokens', 0)}")
+        lines.append(
+            f"{name:<28}{s['count']:>7}{s['errors']:>5}{s['p50_s'] * 1000:>10.1f}{s['p95_s'] * 1000:>10.1f}"
+            f"{s['max_s'] * 1000:>10.1f}{s['total_s']:>9.2f}  {', '.join(extra)}"
+        )
+    if turns:
+        lines.append("")
+        lines.append("Slowest turns:")
+        for t in turns:
+            when = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(t["ts"] or 0))
+            lines.append(f"  {when}  {t['duration_s']:.2f}s  turn {t['turn']}")
+            if t["stages"]:
+                lines.append("    stages: " + ", ".join(f"{k} {v:.3f}s" for k, v in t["stages"].items()))
+            if t["spans"]:
+                lines.append("    spans:  " + ", ".join(f"{k} {v:.3f}s" for k, v in list(t["spans"].items())[:6]))
+    return "\n".join(lines)
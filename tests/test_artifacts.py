@@ -0,0 +1,29 @@
+import json
+
+import pytest
+
+from research_manager.state.artifacts import ArtifactStore, externalize_output
+
+
+def test_put_is_content_addressed_and_resolves_prefixes(tmp_path):
+    store = ArtifactStore(tmp_path / "artifacts")
+    h1 = store.put("hello")
+    assert store.put(b"hello") == h1
+    assert store.path_for(h1) == tmp_path / "artifacts" / h1[:2] / h1
+    assert store.get_text(h1[:10]) == "hello"
+    with pytest.raises(KeyError):
+        store.get_text("0" * 12)
+    with pytest.raises(ValueError):
+        store.get_text(h1[:4])
+
+
+def test_externalize_output_keeps_small_and_offloads_large(tmp_path):
+    store = ArtifactStore(tmp_path)
+    small = {"ok": True, "result": "x"}
+    assert externalize_output(small, store, threshold_chars=100) is small
+
+    big = {"ok": True, "result": "y" * 500}
+    ref = externalize_output(big, store, threshold_chars=100, preview_chars=40)
+    assert ref["ok"] is True and ref["chars"] == len(json.dumps(big))
+    assert len(ref["preview"]) == 40
+    assert json.loads(store.get_text(ref["artifact"])) == big
@@ -0,0 +1,117 @@
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+import minimal_memory_chat as chat  # noqa: E402
+from research_manager.app.batch import load_prompts, run_batch  # noqa: E402
+from research_manager.clients.rate_limit import RateLimiter, TTLCache, cached_call  # noqa: E402
+from research_manager.testing.fake_responses import FakeReply, FakeResponsesClient  # noqa: E402
+
+
+def _tool_then_echo(kwargs):
+    """User message "code: <src>" -> python call with <src>; tool output -> echoed back as text."""
+    last = kwargs["input"][-1]
+    if last.get("type") == "function_call_output":
+        return FakeReply(text=json.loads(last["output"])["result"])
+    return FakeReply(calls=[last["content"].split("code: ", 1)[1]])
+
+
+@pytest.fixture
+def instructions(tmp_path, monkeypatch):
+    path = tmp_path / "instructions.md"
+    path.write_text("be brief", encoding="utf-8")
+    monkeypatch.setattr(chat, "INSTRUCTIONS_PATH", str(path))
+    monkeypatch.setattr(chat, "_PYTHON_WORKER", None)
+
+
+def test_batch_runs_isolated_sessions_concurrently(tmp_path, instructions):
+    prompts = tmp_path / "prompts.jsonl"
+    lines = [
+        {"id": f"s{i}", "prompt": [f"code: secret = {i}\nstr(secret)", "code: str(secret)"]} for i in range(4)
+    ]
+    lines.append({"id": "bad", "prompt": "no code marker"})
+    prompts.write_text("\n".join(json.dumps(x) for x in lines), encoding="utf-8")
+    out = tmp_path / "summary.jsonl"
+
+    started = time.perf_counter()
+    result = run_batch(prompts, concurrency=5, out_path=out, client=FakeResponsesClient(responder=_tool_then_echo, latency_s=0.05), sessions_dir=tmp_path / "sessions")
+    elapsed = time.perf_counter() - started
+
+    assert (result["prompts"], result["succeeded"], result["failed"]) == (5, 4, 1)
+    assert elapsed < 4 * 4 * 0.05  # sessions overlap
+    summaries = {s["session"]: s for s in map(json.loads, out.read_text().splitlines())}
+    for i in range(4):
+        s = summaries[f"s{i}"]
+        # Each session sees only its own scope.
+        assert s["ok"] and s["text_preview"] == str(i) and s["turns"] == 2 and s["tool_calls"] == 2
+        items = [json.loads(line) for line in Path(s["index_path"]).read_text().splitlines()]
+        assert [x["role"] for x in items if "role" in x] == ["user", "assistant"] * 2
+    assert not summaries["bad"]["ok"] and "IndexError" in summaries["bad"]["error"]
+
+
+def test_rerun_namespaces_auto_ids_and_refuses_existing_sessions(tmp_path, instructions):
+    prompts = tmp_path / "prompts.jsonl"
+    prompts.write_text('"code: str(1)"\n{"id": "named", "prompt": "code: str(2)"}\n', encoding="utf-8")
+
+    def run(**kwargs):
+        out = tmp_path / f"out{len(list(tmp_path.glob('out*')))}.jsonl"
+        client = FakeResponsesClient(responder=_tool_then_echo)
+        result = run_batch(prompts, out_path=out, client=client, sessions_dir=tmp_path / "sessions", **kwargs)
+        return result, {s["session"]: s for s in map(json.loads, out.read_text().splitlines())}
+
+    first, first_summaries = run()
+    second, second_summaries = run()
+    assert first["succeeded"] == 2 and second["succeeded"] == 1
+    auto_first = next(k for k in first_summaries if k != "named")
+    auto_second = next(k for k in second_summaries if k != "named")
+    assert auto_first.startswith(first["run_id"]) and auto_second.startswith(second["run_id"])
+    assert second_summaries[auto_second]["turns"] == 1
+    assert "already exists" in second_summaries["named"]["error"]
+
+    third, third_summaries = run(resume=True)
+    assert third["succeeded"] == 2 and third_summaries["named"]["ok"]
+    items = [json.loads(line) for line in Path(third_summaries["named"]["index_path"]).read_text().splitlines()]
+    assert [x["content"] for x in items if x.get("role") == "user"] == ["code: str(2)"] * 2
+
+
+def test_load_prompts_accepts_strings_and_rejects_duplicate_ids(tmp_path):
+    path = tmp_path / "p.jsonl"
+    path.write_text('"hello"\n\n{"id": "a/b", "prompt": "x"}\n', encoding="utf-8")
+    assert load_prompts(path) == [{"id": "prompt-0001", "turns": ["hello"]}, {"id": "a_b", "turns": ["x"]}]
+    path.write_text('{"id": "a", "prompt": "x"}\n{"id": "a", "prompt": "y"}\n', encoding="utf-8")
+    with pytest.raises(ValueError, match="duplicate"):
+        load_prompts(path)
+
+
+def test_shared_limiter_spaces_calls_and_cache_dedupes():
+    limiter = RateLimiter(0.05)
+    cache = TTLCache(ttl_s=60)
+    calls = []
+
+    def fetch(key):
+        calls.append(key)
+        return {"key": key}
+
+    threads = [threading.Thread(target=cached_call, args=(cache, limiter, f"k{i}", lambda i=i: fetch(i))) for i in range(4)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert time.perf_counter() - started >= 0.15
+    assert cached_call(cache, limiter, "k0", lambda: fetch("again")) == {"key": 0}
+    assert sorted(calls) == [0, 1, 2, 3] and cache.hits == 1
+
+
+def test_cached_values_are_not_shared_between_callers():
+    cache, limiter = TTLCache(ttl_s=60), RateLimiter(0)
+    first = cached_call(cache, limiter, "k", lambda: {"data": [{"title": "a"}]})
+    first["data"].append({"title": "mutated"})
+    second = cached_call(cache, limiter, "k", lambda: {"data": []})
+    second["data"][0]["title"] = "also mutated"
+    assert cached_call(cache, limiter, "k", lambda: {"data": []}) == {"data": [{"title": "a"}]}
@@ -0,0 +1,29 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "benchmarks"))
+from bench_common import compare, percentile  # noqa: E402
+
+
+def test_percentile_and_baseline_compare():
+    assert percentile([3, 1, 2, 4], 50) == 2 and percentile([3, 1, 2, 4], 95) == 4
+    current = {"a": {"p95": 0.030}, "b": {"p95": 0.0011}, "new": {"p95": 1.0}}
+    baseline = {"a": {"p95": 0.010}, "b": {"p95": 0.0005}}
+    assert [f.split(":")[0] for f in compare(current, baseline)] == ["a"]
+
+
+def test_turn_benchmark_smoke():
+    import bench_turns
+
+    report = bench_turns.run_benchmark(turns=4, history=30, tool_every=2)
+    assert report["requests"] == 6
+    assert report["stages"]["total"]["n"] == 4 and report["stages"]["tool_exec"]["max"] > 0
+
+
+def test_state_io_benchmark_smoke():
+    import bench_state_io
+
+    report = bench_state_io.run_benchmark([200], repeats=1)
+    results = report["results"]
+    assert {"read_index_entries@200", "delete_index_line@200", "prune_keep_last_dialog_turns@200"} <= set(results)
+    assert all(r["peak_bytes"] > 0 and r["n"] == 1 for r in results.values())
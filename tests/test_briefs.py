@@ -0,0 +1,117 @@
+import json
+
+from research_manager.tools import briefs
+from research_manager.tools.briefs import BriefPaths, load_briefs, refresh_briefs
+
+
+def _paths(tmp_path):
+    return BriefPaths(briefs_path=tmp_path / "_project_briefs.json", meta_path=tmp_path / "_project_briefs_meta.json")
+
+
+def _fake_llm(calls):
+    def _summarize(prompt):
+        calls.append(prompt)
+        return json.dumps({"project_name": "p", "one_liner": f"brief {len(calls)}"})
+
+    return _summarize
+
+
+def test_refresh_skips_unchanged_files_without_hashing(tmp_path, monkeypatch):
+    mem = tmp_path / "memory"
+    mem.mkdir()
+    a = mem / "a.md"
+    a.write_text("# A\nalpha\n", encoding="utf-8")
+    paths = _paths(tmp_path)
+    calls = []
+
+    first = refresh_briefs(source_files=[a], base_dir=tmp_path, paths=paths, llm_summarize_fn=_fake_llm(calls))
+    assert first["updated"] == ["memory/a.md"]
+
+    def _no_hash(text):
+        raise AssertionError("unchanged file should not be hashed")
+
+    monkeypatch.setattr(briefs, "sha256_text", _no_hash)
+    second = refresh_briefs(source_files=[a], base_dir=tmp_path, paths=paths, llm_summarize_fn=_fake_llm(calls))
+    assert second["skipped"] == ["memory/a.md"]
+    assert len(calls) == 1
+
+
+def test_refresh_writes_one_shard_per_updated_file(tmp_path):
+    mem = tmp_path / "memory"
+    mem.mkdir()
+    a, b = mem / "a.md", mem / "b.md"
+    a.write_text("# A\nalpha\n", encoding="utf-8")
+    b.write_text("# B\nbeta\n", encoding="utf-8")
+    paths = _paths(tmp_path)
+    calls = []
+    refresh_briefs(source_files=[a, b], base_dir=tmp_path, paths=paths, llm_summarize_fn=_fake_llm(calls))
+
+    shard_b = briefs.shard_path_for(paths.briefs_path, "memory/b.md")
+    before = shard_b.stat().st_mtime_ns
+    a.write_text("# A\nalpha, revised\n", encoding="utf-8")
+    res = refresh_briefs(source_files=[a, b], base_dir=tmp_path, paths=paths, llm_summarize_fn=_fake_llm(calls))
+
+    assert res["updated"] == ["memory/a.md"]
+    assert shard_b.stat().st_mtime_ns == before
+    assert not paths.briefs_path.exists()
+    loaded = load_briefs(paths.briefs_path)
+    assert loaded["memory/a.md"]["one_liner"] == "brief 3"
+    assert loaded["memory/b.md"]["one_liner"] == "brief 2"
+
+
+def test_load_briefs_overlays_shards_on_legacy_file(tmp_path):
+    paths = _paths(tmp_path)
+    paths.briefs_path.write_text(json.dumps({"memory/old.md": {"one_liner": "legacy"}}), encoding="utf-8")
+    briefs.write_brief_shard(paths.briefs_path, "memory/new.md", {"one_liner": "sharded"})
+
+    loaded = load_briefs(paths.briefs_path)
+    assert loaded == {"memory/old.md": {"one_liner": "legacy"}, "memory/new.md": {"one_liner": "sharded"}}
+
+
+def test_chunk_markdown_splits_on_headings_and_ignores_fences():
+    text = "# A\nintro\n```\n# not a heading\n```\n## B\nbody b\n## C\nbody c\n"
+    assert briefs.split_markdown_sections(text) == [
+        "# A\nintro\n```\n# not a heading\n```\n",
+        "## B\nbody b\n",
+        "## C\nbody c\n",
+    ]
+    chunks = briefs.chunk_markdown(text, max_chars=30, min_chars=10)
+    assert "".join(chunks) == text
+    assert all(len(c) <= 30 for c in chunks)
+
+
+def test_long_memo_only_resummarizes_edited_chunks(tmp_path):
+    mem = tmp_path / "memory"
+    mem.mkdir()
+    memo = mem / "long.md"
+    sections = [f"## Section {i}\n" + (f"detail {i} " * 40) + "\n" for i in range(4)]
+    memo.write_text("".join(sections), encoding="utf-8")
+    paths = _paths(tmp_path)
+    prompts = []
+
+    def _summarize(prompt):
+        prompts.append(prompt)
+        if "PART NOTES" in prompt:
+            return json.dumps({"project_name": "long", "one_liner": "merged"})
+        return "notes"
+
+    kwargs = dict(source_files=[memo], base_dir=tmp_path, paths=paths, llm_summarize_fn=_summarize, chunk_chars=600)
+    refresh_briefs(**kwargs)
+    map_calls = [p for p in prompts if "PART NOTES" not in p]
+    assert len(map_calls) == 4
+
+    sections[2] = sections[2].replace("detail 2", "edited 2", 1)
+    memo.write_text("".join(sections), encoding="utf-8")
+    prompts.clear()
+    refresh_briefs(**kwargs)
+
+    brief = load_briefs(paths.briefs_path)["memory/long.md"]
+    assert brief["one_liner"] == "merged"
+    assert brief["_chunks"] == {"chunks": 4, "cached": 3}
+    assert len([p for p in prompts if "PART NOTES" not in p]) == 1
+
+    # The edited section's old summary is dropped; deleting the memo drops the rest.
+    assert len(list(paths.chunks_dir.glob("*.json"))) == 4
+    memo.unlink()
+    assert refresh_briefs(**{**kwargs, "source_files": []})["chunks_pruned"] == 4
+    assert list(paths.chunks_dir.glob("*.json")) == []
@@ -0,0 +1,180 @@
+import json
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+import minimal_memory_chat as chat  # noqa: E402
+from research_manager.state.artifacts import ArtifactStore  # noqa: E402
+from research_manager.testing.fake_responses import (  # noqa: E402
+    FakeReply,
+    FakeResponsesClient as FakeClient,
+    function_call,
+    make_response as _response,
+)
+
+
+@pytest.fixture
+def state(tmp_path, monkeypatch):
+    index = tmp_path / "index.jsonl"
+    index.write_text("", encoding="utf-8")
+    instructions = tmp_path / "instructions.md"
+    instructions.write_text("be brief", encoding="utf-8")
+    monkeypatch.setattr(chat, "INDEX_PATH", str(index))
+    monkeypatch.setattr(chat, "INSTRUCTIONS_PATH", str(instructions))
+    monkeypatch.setattr(chat, "RESPONSE_CHAIN_PATH", str(tmp_path / "chain.json"))
+    monkeypatch.setattr(chat, "_ARTIFACT_STORE", ArtifactStore(tmp_path / "artifacts"))
+    return index
+
+
+def _script():
+    return [
+        (_response("r1", [function_call("1 + 1", "c1")]), ["Let me ", "check."]),
+        (_response("r2", [], "It is 2."), ["It is ", "2."]),
+    ]
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_run_turn_logs_same_items_streaming_or_not(state, stream, capsys):
+    client = FakeClient(_script())
+    turn = chat.run_turn(client, "m", "what is 1+1?", stream=stream)
+
+    assert turn["text"] == "It is 2."
+    assert turn["rounds"] == 2 and turn["tool_calls"] == 1
+    assert (turn["ttft_s"] is not None) == stream
+    assert client.requests[1]["previous_response_id"] == "r1"
+    assert client.requests[1]["input"][0]["call_id"] == "c1"
+
+    items = [json.loads(line) for line in state.read_text(encoding="utf-8").splitlines()]
+    assert [i.get("role") or i["type"] for i in items] == ["user", "function_call", "function_call_output", "assistant"]
+    assert json.loads(items[2]["output"])["result"] == 2
+    if stream:
+        assert "It is 2." in capsys.readouterr().out
+
+
+def test_stream_runs_tool_calls_before_response_completes():
+    order = []
+
+    def events():
+        yield SimpleNamespace(type="response.output_item.done", item=function_call("pass", "c1"))
+        order.append("after-item")
+        yield SimpleNamespace(type="response.completed", response=_response("r", []))
+
+    final = chat._consume_stream(events(), lambda d: None, lambda item: order.append(item.call_id))
+    assert final.id == "r"
+    assert order == ["c1", "after-item"]
+
+
+class ExpiredChain(Exception):
+    status_code = 404
+
+
+def test_new_turns_chain_from_previous_response(state):
+    client = FakeClient(_script() + [(_response("r3", [], "Hi again."), [])])
+    first = chat.run_turn(client, "m", "what is 1+1?")
+    second = chat.run_turn(client, "m", "thanks")
+
+    assert not first["chained"] and second["chained"]
+    assert client.requests[1]["instructions"] == "be brief"
+    assert client.requests[2]["previous_response_id"] == "r2"
+    assert client.requests[2]["input"] == [{"role": "user", "content": "thanks"}]
+    assert client.requests[2]["instructions"] == "be brief"
+
+
+def test_chain_falls_back_after_out_of_band_edit_or_expired_id(state):
+    client = FakeClient([(_response("r1", [], "one"), []), (_response("r2", [], "two"), [])])
+    chat.run_turn(client, "m", "hello")
+    chat.append_message("user", "edited by hand")
+    chat.run_turn(client, "m", "again")
+    assert "previous_response_id" not in client.requests[1]
+    assert [i["content"] for i in client.requests[1]["input"]] == ["hello", "one", "edited by hand", "again"]
+
+    class Expiring(FakeClient):
+        def create(self, **kwargs):
+            if kwargs.get("previous_response_id") == "r2":
+                self.requests.append(kwargs)
+                raise ExpiredChain("previous response not found")
+            return super().create(**kwargs)
+
+    client = Expiring([(_response("r3", [], "three"), [])])
+    turn = chat.run_turn(client, "m", "third")
+    assert not turn["chained"] and turn["text"] == "three"
+    assert len(client.requests[1]["input"]) == 6
+
+
+def test_only_missing_previous_response_errors_are_stale(state):
+    from research_manager.state.response_chain import is_stale_chain_error
+
+    class BadRequest(Exception):
+        status_code = 400
+
+        def __init__(self, message, code=None):
+            super().__init__(message)
+            self.code = code
+
+    assert is_stale_chain_error(BadRequest("Previous response with id 'r2' not found.", "previous_response_not_found"))
+    assert is_stale_chain_error(ExpiredChain("previous response not found"))
+    assert not is_stale_chain_error(BadRequest("Invalid value for 'input'.", "invalid_value"))
+    assert not is_stale_chain_error(BadRequest("Unsupported parameter: 'temperature'."))
+
+    client = FakeClient([(_response("r1", [], "one"), [])])
+    chat.run_turn(client, "m", "hello")
+
+    class Rejecting(FakeClient):
+        def create(self, **kwargs):
+            raise BadRequest("Invalid value for 'input'.", "invalid_value")
+
+    with pytest.raises(BadRequest):
+        chat.run_turn(Rejecting([]), "m", "again")
+
+
+def test_budget_history_keeps_newest_items():
+    from research_manager.state.response_chain import budget_history
+
+    items = [{"role": "user", "content": "x" * 10} for _ in range(5)]
+    assert len(budget_history(items, 25)) == 2
+    assert budget_history(items, 1) == items[-1:]
+
+
+def test_large_tool_output_goes_to_artifact_store(state, monkeypatch):
+    monkeypatch.setenv("RM_ARTIFACT_THRESHOLD_CHARS", "1000")
+    client = FakeClient(
+        [
+            (_response("r1", [function_call("result = 'z' * 5000", "c1")]), []),
+            (_response("r2", [function_call("result = len(load_artifact(ref)['result'])", "c2")]), []),
+            (_response("r3", [], "done"), []),
+        ]
+    )
+    sent = []
+    orig = client.create
+
+    def create(**kwargs):
+        if kwargs.get("input") and kwargs["input"][0].get("type") == "function_call_output":
+            out = json.loads(kwargs["input"][0]["output"])
+            if "artifact" in out:
+                chat.PYTHON_GLOBAL_SCOPE["ref"] = out["artifact"]
+            sent.append(out)
+        return orig(**kwargs)
+
+    client.create = create
+    chat.run_turn(client, "m", "dump")
+    assert "artifact" in sent[0] and len(sent[0]["preview"]) <= 2000
+    assert sent[1]["result"] == 5000
+    logged = state.read_text(encoding="utf-8")
+    assert "z" * 3000 not in logged
+
+
+def test_run_turn_reports_stage_timings_with_scripted_latency(state):
+    client = FakeClient(
+        [FakeReply(text="computing", calls=["import time; time.sleep(0.05)"], latency_s=0.03), FakeReply(text="done")],
+        delta_delay_s=0.001,
+    )
+    turn = chat.run_turn(client, "m", "go", stream=True)
+
+    stages = turn["stages"]
+    assert set(stages) == set(chat.TURN_STAGES)
+    assert turn["text"] == "done" and turn["ttft_s"] >= 0.03
+    assert stages["model"] >= 0.03 and stages["tool_exec"] >= 0.05
+    assert sum(stages.values()) <= turn["total_s"]
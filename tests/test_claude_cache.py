@@ -0,0 +1,95 @@
+import os
+import stat
+import subprocess
+import time
+
+from research_manager.tools.claude_cache import ClaudeResultCache, dir_fingerprint
+from research_manager.tools.claude_code import run_claude
+
+
+def _counting_cli(tmp_path):
+    counter = tmp_path / "calls"
+    script = tmp_path / "fake_claude"
+    script.write_text(f"#!/bin/sh\necho x >> {counter}\ncat\n", encoding="utf-8")
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+    return str(script), counter
+
+
+def test_run_claude_cache_hits_until_tree_changes(tmp_path):
+    cli, counter = _counting_cli(tmp_path)
+    work = tmp_path / "work"
+    work.mkdir()
+    (work / "a.py").write_text("x = 1\n", encoding="utf-8")
+    cache = ClaudeResultCache(tmp_path / "cache")
+
+    first = run_claude("summarize", bin_name=cli, cwd=str(work), cache=cache)
+    second = run_claude("summarize", bin_name=cli, cwd=str(work), cache=cache)
+    assert first["stdout"] == second["stdout"] == "summarize"
+    assert second["cached"] and "cached" not in first
+    assert counter.read_text().count("x") == 1
+
+    run_claude("other prompt", bin_name=cli, cwd=str(work), cache=cache)
+    assert counter.read_text().count("x") == 2
+
+    (work / "a.py").write_text("x = 22\n", encoding="utf-8")
+    third = run_claude("summarize", bin_name=cli, cwd=str(work), cache=cache)
+    assert "cached" not in third
+    assert counter.read_text().count("x") == 3
+
+
+def _git_repo(repo):
+    repo.mkdir()
+    env = {**os.environ, "GIT_AUTHOR_NAME": "t", "GIT_AUTHOR_EMAIL": "t@t", "GIT_COMMITTER_NAME": "t", "GIT_COMMITTER_EMAIL": "t@t"}
+    (repo / "f.txt").write_text("one\n", encoding="utf-8")
+    subprocess.run(["git", "init", "-q"], cwd=repo, check=True)
+    subprocess.run(["git", "add", "f.txt"], cwd=repo, check=True)
+    subprocess.run(["git", "commit", "-qm", "init"], cwd=repo, check=True, env=env)
+
+
+def test_cache_hits_with_cache_dir_inside_cwd(tmp_path):
+    cli, counter = _counting_cli(tmp_path)
+    for name in ("repo", "plain"):
+        work = tmp_path / name
+        if name == "repo":
+            _git_repo(work)
+        else:
+            work.mkdir()
+            (work / "f.txt").write_text("one\n", encoding="utf-8")
+        (work / "state" / "dev").mkdir(parents=True)
+        (work / "state" / "dev" / "metrics.jsonl").write_text("{}\n", encoding="utf-8")
+        cache = ClaudeResultCache(work / "state" / "dev" / "generated" / "claude_cache")
+        results = [run_claude("summarize", bin_name=cli, cwd=str(work), cache=cache) for _ in range(3)]
+        (work / "state" / "dev" / "metrics.jsonl").write_text("{}\n{}\n", encoding="utf-8")
+        results.append(run_claude("summarize", bin_name=cli, cwd=str(work), cache=cache))
+        assert "cached" not in results[0] and all(r.get("cached") for r in results[1:]), name
+    assert counter.read_text().count("x") == 2
+
+    (work / "f.txt").write_text("two\n", encoding="utf-8")
+    assert "cached" not in run_claude("summarize", bin_name=cli, cwd=str(work), cache=cache)
+
+
+def test_git_fingerprint_tracks_dirty_edits(tmp_path):
+    repo = tmp_path / "repo"
+    _git_repo(repo)
+
+    clean = dir_fingerprint(str(repo))
+    assert clean.startswith("git:") and clean == dir_fingerprint(str(repo))
+    (repo / "f.txt").write_text("two\n", encoding="utf-8")
+    dirty = dir_fingerprint(str(repo))
+    assert dirty != clean
+    (repo / "f.txt").write_text("three!\n", encoding="utf-8")
+    assert dir_fingerprint(str(repo)) != dirty
+
+
+def test_cache_ttl_and_size_eviction(tmp_path):
+    cache = ClaudeResultCache(tmp_path / "cache", ttl_s=60, max_bytes=600)
+    for i in range(5):
+        cache.put(f"k{i}", {"ok": True, "stdout": "y" * 200})
+        os.utime(cache._path(f"k{i}"), (time.time() - 10 + i, time.time() - 10 + i))
+    cache.put("k5", {"ok": True, "stdout": "y" * 200})
+    left = sorted(p.stem for p in (tmp_path / "cache").glob("*.json"))
+    assert "k5" in left and "k0" not in left and len(left) <= 3
+
+    cache.ttl_s = 0
+    assert cache.get("k5") is None
+    assert not cache._path("k5").exists()
@@ -1,7 +1,81 @@
-from research_manager.tools.claude_code import which_claude
+import stat
+import time
+
+import pytest
+
+from research_manager.tools.claude_code import OutputCapture, run_claude, run_claude_stream, which_claude
 
 
 def test_which_claude_returns_dict():
     d = which_claude()
     assert isinstance(d, dict)
     assert 'claude' in d
+
+
+def _fake_cli(tmp_path, body):
+    script = tmp_path / "fake_claude"
+    script.write_text("#!/bin/sh\n" + body + "\n", encoding="utf-8")
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+    return str(script)
+
+
+def test_run_claude_stream_lines_events_and_log(tmp_path):
+    cli = _fake_cli(
+        tmp_path,
+        'read line; echo "{\\"type\\": \\"assistant\\", \\"text\\": \\"$line\\"}"; '
+        'echo oops >&2; echo "{\\"type\\": \\"result\\", \\"result\\": \\"done\\"}"; echo "$*"',
+    )
+    lines, events = [], []
+    log = tmp_path / "logs" / "run.log"
+    res = run_claude_stream(
+        "hello",
+        bin_name=cli,
+        stream_json=True,
+        log_path=str(log),
+        on_line=lambda label, line: lines.append((label, line)),
+        on_event=events.append,
+        echo=False,
+    )
+    assert res["ok"]
+    assert ("stderr", "oops") in lines
+    assert [e["type"] for e in events] == ["assistant", "result"]
+    assert events[0]["text"] == "hello"
+    assert res["result"] == "done"
+    assert "--output-format stream-json --verbose" in res["stdout"]
+    assert "[stderr] oops" in log.read_text(encoding="utf-8")
+
+
+def test_run_claude_stream_timeout_kills_process(tmp_path):
+    cli = _fake_cli(tmp_path, "echo started; exec sleep 5")
+    start = time.monotonic()
+    with pytest.raises(TimeoutError):
+        run_claude_stream("x", bin_name=cli, timeout_s=0.5, echo=False)
+    assert time.monotonic() - start < 3
+
+
+def test_output_capture_keeps_head_and_tail_and_spills(tmp_path):
+    cap = OutputCapture("stdout", spill_dir=str(tmp_path), head_bytes=10, tail_bytes=10)
+    cap.write(b"short")
+    assert not cap.truncated and cap.spill_path is None
+
+    data = b"".join(b"%04d" % i for i in range(500))
+    cap = OutputCapture("stdout", spill_dir=str(tmp_path), head_bytes=10, tail_bytes=10)
+    for i in range(0, len(data), 7):
+        cap.write(data[i : i + 7])
+    cap.close()
+    summary = cap.summary()
+    assert summary["stdout_bytes"] == len(data) and summary["stdout_truncated"]
+    assert summary["stdout"].startswith(data[:10].decode())
+    assert summary["stdout"].endswith(data[-10:].decode())
+    assert open(summary["stdout_path"], "rb").read() == data
+
+
+def test_run_claude_spills_long_output(tmp_path):
+    cli = _fake_cli(tmp_path, "cat; seq 1 20000")
+    res = run_claude("hi", bin_name=cli, spill_dir=str(tmp_path / "spill"))
+    assert res["ok"] and res["stdout_truncated"]
+    assert res["stdout"].startswith("hi") and res["stdout"].rstrip().endswith("20000")
+    assert len(res["stdout"]) < 40_000
+    full = open(res["stdout_path"], encoding="utf-8").read()
+    assert full.startswith("hi") and len(full) == res["stdout_bytes"]
+    assert res["stderr_path"] is None
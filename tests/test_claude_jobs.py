@@ -0,0 +1,95 @@
+import json
+import stat
+import time
+
+from research_manager.tools.claude_jobs import CANCELLED, DONE, FAILED, INTERRUPTED, QUEUED, RUNNING, ClaudeJobPool
+
+
+def _fake_cli(tmp_path, body):
+    script = tmp_path / "fake_claude"
+    script.write_text("#!/bin/sh\n" + body + "\n", encoding="utf-8")
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+    return str(script)
+
+
+def test_jobs_run_in_parallel_and_persist_logs(tmp_path):
+    cli = _fake_cli(tmp_path, 'sleep 0.5; cat; echo "args: $*"')
+    pool = ClaudeJobPool(tmp_path / "jobs", max_workers=3, bin_name=cli)
+
+    start = time.monotonic()
+    ids = [pool.submit(f"prompt {i}", add_dirs=["/tmp"]) for i in range(3)]
+    results = pool.wait_all(ids, timeout=10)
+    elapsed = time.monotonic() - start
+
+    assert [r["state"] for r in results] == [DONE] * 3
+    assert elapsed < 1.2  # sequential would take 1.5s
+    status = pool.status(ids[1])
+    assert status["returncode"] == 0
+    assert "prompt 1" in status["stdout_tail"]
+    assert "args: -p --add-dir /tmp" in status["stdout_tail"]
+    assert {j["id"] for j in pool.list_jobs(state=DONE)} == set(ids)
+
+
+def test_failed_and_timed_out_jobs(tmp_path):
+    pool = ClaudeJobPool(tmp_path / "jobs", max_workers=2, bin_name=_fake_cli(tmp_path, "echo boom >&2; exit 3"))
+    failed = pool.wait(pool.submit("x"), timeout=10)
+    assert failed["state"] == FAILED and failed["returncode"] == 3 and "boom" in failed["stderr_tail"]
+
+    slow = ClaudeJobPool(tmp_path / "slow", bin_name=_fake_cli(tmp_path, "sleep 5"))
+    timed_out = slow.wait(slow.submit("x", timeout_s=0.2), timeout=10)
+    assert timed_out["state"] == FAILED and "timed out" in timed_out["error"]
+
+
+def test_cancel_queued_job(tmp_path):
+    pool = ClaudeJobPool(tmp_path / "jobs", max_workers=1, bin_name=_fake_cli(tmp_path, "sleep 0.5"))
+    first = pool.submit("first")
+    second = pool.submit("second")
+    assert pool.cancel(second)["state"] == CANCELLED
+    assert pool.wait(first, timeout=10)["state"] == DONE
+    assert pool.status(second)["state"] == CANCELLED
+
+
+def test_recovery_requeues_and_marks_interrupted(tmp_path):
+    jobs_dir = tmp_path / "jobs"
+    cli = _fake_cli(tmp_path, "cat")
+    for job_id, state, pid in [("a", QUEUED, None), ("b", RUNNING, 999999)]:
+        d = jobs_dir / job_id
+        d.mkdir(parents=True)
+        (d / "prompt.txt").write_text(f"left {job_id}\n", encoding="utf-8")
+        job = {"id": job_id, "state": state, "cmd": [cli, "-p"], "cwd": None, "timeout_s": 10, "pid": pid,
+               "stdout_path": str(d / "stdout.log"), "stderr_path": str(d / "stderr.log")}
+        (d / "job.json").write_text(json.dumps(job), encoding="utf-8")
+
+    pool = ClaudeJobPool(jobs_dir, bin_name=cli)
+    assert pool.wait("a", timeout=10)["stdout_tail"] == "left a\n"
+    assert pool.status("b")["state"] == INTERRUPTED
+
+
+def test_cancel_running_job_stays_cancelled(tmp_path):
+    pool = ClaudeJobPool(tmp_path / "jobs", bin_name=_fake_cli(tmp_path, "sleep 5"))
+    job_id = pool.submit("x")
+    deadline = time.monotonic() + 5
+    while pool.status(job_id, tail_chars=0).get("pid") is None and time.monotonic() < deadline:
+        time.sleep(0.02)
+    pool.cancel(job_id)
+    done = pool.wait(job_id, timeout=10)
+    assert done["state"] == CANCELLED and done["returncode"] is not None
+
+
+def test_recovery_skips_jobs_owned_by_a_live_pool(tmp_path):
+    jobs_dir = tmp_path / "jobs"
+    owner = ClaudeJobPool(jobs_dir, max_workers=1, bin_name=_fake_cli(tmp_path, "sleep 0.5"))
+    first, second = owner.submit("first"), owner.submit("second")
+    orphan = owner.submit("orphan")
+    job = json.loads((jobs_dir / orphan / "job.json").read_text())
+    (jobs_dir / orphan / "job.json").write_text(json.dumps({**job, "owner_pid": 999999}), encoding="utf-8")
+    # Claimed by a live owner but not yet started: RUNNING with no CLI pid recorded.
+    claimed = owner.submit("claimed")
+    job = json.loads((jobs_dir / claimed / "job.json").read_text())
+    (jobs_dir / claimed / "job.json").write_text(json.dumps({**job, "state": RUNNING, "pid": None}), encoding="utf-8")
+
+    other = ClaudeJobPool(jobs_dir, bin_name=owner.bin_name)
+    assert other.wait(orphan, timeout=10)["state"] == DONE
+    assert other.status(claimed)["state"] == RUNNING
+    assert other._queue.unfinished_tasks == 0 and second not in other._events
+    assert [r["state"] for r in owner.wait_all([first, second], timeout=10)] == [DONE, DONE]
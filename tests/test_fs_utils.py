@@ -10,3 +10,120 @@ def test_safe_resolve_allows_memory():
 def test_safe_resolve_blocks_repo_escape(tmp_path):
     with pytest.raises(ValueError):
         fs_utils.safe_resolve('../secret.txt', allow_roots=['memory'])
+
+
+MEMO = """# Project
+intro
+## Plan
+steps
+### Details
+fine print
+```
+# not a heading
+```
+## Results
+numbers ✓
+"""
+
+
+def _memo(tmp_path, monkeypatch):
+    monkeypatch.setattr(fs_utils, "repo_base", lambda: tmp_path)
+    monkeypatch.setattr(fs_utils, "_SECTION_INDEX", fs_utils.SectionIndex(tmp_path / "_section_index.json"))
+    (tmp_path / "memory").mkdir()
+    (tmp_path / "memory" / "p.md").write_text(MEMO, encoding="utf-8")
+    return "memory/p.md"
+
+
+def test_list_sections_reports_heading_paths(tmp_path, monkeypatch):
+    rel = _memo(tmp_path, monkeypatch)
+    paths = [s["path"] for s in fs_utils.list_sections(rel)]
+    assert paths == ["Project", "Project > Plan", "Project > Plan > Details", "Project > Results"]
+    assert (tmp_path / "_section_index.json").exists()
+
+
+def test_read_section_includes_subsections_and_seeks(tmp_path, monkeypatch):
+    rel = _memo(tmp_path, monkeypatch)
+    plan = fs_utils.read_section(rel, "Plan")
+    assert plan.startswith("## Plan\n") and "fine print" in plan and "Results" not in plan
+    assert fs_utils.read_section(rel, "project > results") == "## Results\nnumbers ✓\n"
+    with pytest.raises(ValueError):
+        fs_utils.read_section(rel, "Missing")
+
+
+def test_refresh_section_index_stays_inside_allowed_roots(tmp_path, monkeypatch):
+    _memo(tmp_path, monkeypatch)
+    (tmp_path / "secret.md").write_text("# Secret\n", encoding="utf-8")
+    with pytest.raises(ValueError):
+        fs_utils.refresh_section_index(".")
+    with pytest.raises(ValueError):
+        fs_utils.refresh_section_index("memory/..")
+    assert fs_utils.refresh_section_index("memory", pattern="../*.md")["files"] == 0
+    fs_utils.refresh_section_index("memory")
+    assert fs_utils.list_sections("memory/p.md")[0]["heading"] == "Project"
+
+
+def test_read_range_reads_bytes(tmp_path, monkeypatch):
+    rel = _memo(tmp_path, monkeypatch)
+    assert fs_utils.read_range(rel, 0, 9) == "# Project"
+    assert fs_utils.read_range(rel, len(MEMO.encode()) - 4, 100) == "✓\n"
+
+
+def _tree(tmp_path, monkeypatch):
+    monkeypatch.setattr(fs_utils, "repo_base", lambda: tmp_path)
+    for rel in ["memory/a.md", "memory/b.txt", "memory/runs/r1/log.md", "memory/runs/r2/log.md", "memory/z.md"]:
+        (tmp_path / rel).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / rel).write_text(rel, encoding="utf-8")
+
+
+def test_list_files_glob_patterns(tmp_path, monkeypatch):
+    _tree(tmp_path, monkeypatch)
+    assert fs_utils.list_files("memory", "*.md") == ["memory/a.md", "memory/z.md"]
+    assert fs_utils.list_files("memory", "**/*.md") == [
+        "memory/a.md",
+        "memory/runs/r1/log.md",
+        "memory/runs/r2/log.md",
+        "memory/z.md",
+    ]
+    assert fs_utils.list_files("memory", "runs/*/log.md", max_results=1) == ["memory/runs/r1/log.md"]
+
+
+def test_list_files_page_cursor_walks_everything_once(tmp_path, monkeypatch):
+    _tree(tmp_path, monkeypatch)
+    seen, cursor = [], None
+    while True:
+        page = fs_utils.list_files_page("memory", "**/*", cursor=cursor, page_size=2)
+        seen += page["files"]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == fs_utils.list_files("memory", "**/*")
+    assert len(seen) == 5
+
+
+def test_read_text_pages_with_offset(tmp_path, monkeypatch):
+    monkeypatch.setattr(fs_utils, "repo_base", lambda: tmp_path)
+    (tmp_path / "memory").mkdir()
+    (tmp_path / "memory" / "big.log").write_text("0123456789" * 3, encoding="utf-8")
+    first = fs_utils.read_text("memory/big.log", max_chars=12)
+    assert first.startswith("012345678901") and "offset=12" in first
+    assert fs_utils.read_text("memory/big.log", max_chars=100, offset=25) == "56789"
+
+
+def test_read_text_offsets_are_bytes(tmp_path, monkeypatch):
+    import re
+
+    monkeypatch.setattr(fs_utils, "repo_base", lambda: tmp_path)
+    (tmp_path / "memory").mkdir()
+    text = "héllo wörld ✓ " * 50
+    (tmp_path / "memory" / "u.log").write_text(text, encoding="utf-8")
+    pages, offset = [], 0
+    while True:
+        page = fs_utils.read_text("memory/u.log", max_chars=37, offset=offset)
+        m = re.search(r"\n\n\.\.\.\[TRUNCATED: continue with offset=(\d+)\]$", page)
+        pages.append(page[: m.start()] if m else page)
+        if not m:
+            break
+        offset = int(m.group(1))
+    assert "".join(pages) == text
+    # An offset inside a multi-byte character drops the partial character.
+    assert fs_utils.read_text("memory/u.log", max_chars=4, offset=2).startswith("llo")
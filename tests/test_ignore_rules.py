@@ -0,0 +1,23 @@
+from research_manager.tools.ignore_rules import compile_ignore_lines, is_ignored
+
+
+def test_gitignore_pattern_semantics():
+    rules = compile_ignore_lines(("# comment", "*.pt", "/build", "logs/", "docs/**/*.tmp", "a?c"))
+    assert rules.match("x/model.pt", False)
+    assert rules.match("build", True)
+    assert rules.match("src/build", True) is None
+    assert rules.match("runs/logs", True)
+    assert rules.match("runs/logs", False) is None
+    assert rules.match("docs/a/b/c.tmp", False)
+    assert rules.match("docs/c.tmp", False)
+    assert rules.match("abc", False)
+
+
+def test_negation_and_nested_precedence():
+    root = compile_ignore_lines(("*.log", "!important.log"))
+    nested = compile_ignore_lines(("important.log",))
+    chain = [("", root), ("exp", nested)]
+    assert is_ignored(chain, "run.log", False)
+    assert not is_ignored(chain, "important.log", False)
+    assert is_ignored(chain, "exp/important.log", False)
+    assert not is_ignored(chain, "exp/notes.md", False)
@@ -0,0 +1,53 @@
+from research_manager.tools import project_index
+from research_manager.tools.project_index import ProjectIndexConfig, generate_project_index, write_project_index
+
+
+def _cfg(tmp_path):
+    mem = tmp_path / "memory"
+    mem.mkdir(exist_ok=True)
+    return ProjectIndexConfig(
+        repo_root=tmp_path,
+        memory_dir=mem,
+        briefs_path=tmp_path / "_project_briefs.json",
+        output_path=tmp_path / "_project_index.md",
+    )
+
+
+def test_one_liner_header_and_fallback(tmp_path):
+    cfg = _cfg(tmp_path)
+    (cfg.memory_dir / "alpha.md").write_text("# Alpha\n\nintro\nOne-liner: verifier self-play\n", encoding="utf-8")
+    (cfg.memory_dir / "beta.md").write_text("# Beta\n\nsecond line wins\n", encoding="utf-8")
+    (cfg.memory_dir / "_pinned.md").write_text("# pinned\n", encoding="utf-8")
+
+    text = generate_project_index(cfg)
+    assert "- **alpha** (memory/alpha.md): verifier self-play" in text
+    assert "- **beta** (memory/beta.md): second line wins" in text
+    assert "_pinned" not in text
+
+
+def test_heuristic_is_memoized_by_stat(tmp_path, monkeypatch):
+    cfg = _cfg(tmp_path)
+    memo = cfg.memory_dir / "gamma.md"
+    memo.write_text("# Gamma\nfirst\n", encoding="utf-8")
+    reads = []
+    real = project_index._read_head
+    monkeypatch.setattr(project_index, "_read_head", lambda p, *a: reads.append(p) or real(p, *a))
+
+    generate_project_index(cfg)
+    generate_project_index(cfg)
+    assert reads == [memo]
+
+    memo.write_text("# Gamma\nchanged line\n", encoding="utf-8")
+    assert "changed line" in generate_project_index(cfg)
+    assert len(reads) == 2
+
+
+def test_write_project_index_skips_identical_output(tmp_path):
+    cfg = _cfg(tmp_path)
+    (cfg.memory_dir / "delta.md").write_text("# Delta\nstable\n", encoding="utf-8")
+    write_project_index(cfg)
+    before = cfg.output_path.stat().st_mtime_ns
+    cfg.output_path.touch()
+    touched = cfg.output_path.stat().st_mtime_ns
+    write_project_index(cfg)
+    assert cfg.output_path.stat().st_mtime_ns == touched >= before
@@ -0,0 +1,121 @@
+import os
+import resource
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from research_manager.tools.python_worker import PythonWorker
+from research_manager.tools import tool_executor
+from research_manager.tools.tool_executor import TeeStringIO, capture_stdout
+
+
+def _run(code, scope, emit):
+    buf = TeeStringIO(emit)
+    try:
+        with capture_stdout(buf):
+            exec(code, scope, scope)
+    except Exception as exc:  # noqa: BLE001
+        return {"ok": False, "error": str(exc), "error_type": type(exc).__name__}
+    return {"ok": True, "stdout": buf.getvalue(), "result": scope.get("result")}
+
+
+@pytest.fixture
+def worker():
+    w = PythonWorker(_run, {}, timeout_s=5, cpu_s=2, memory_mb=256).start()
+    yield w
+    w.close()
+
+
+def test_scope_persists_and_stdout_streams(worker):
+    chunks = []
+    assert worker.run("x = 21")["ok"]
+    res = worker.run("print('hi')\nresult = x * 2", on_output=chunks.append)
+    assert res["result"] == 42 and res["stdout"] == "hi\n"
+    assert "".join(chunks) == "hi\n"
+
+
+def test_per_call_overhead_is_small(worker):
+    worker.run("pass")
+    start = time.perf_counter()
+    for _ in range(50):
+        worker.run("pass")
+    assert (time.perf_counter() - start) / 50 < 0.02
+
+
+def test_forked_scopes_merge_back(worker):
+    worker.run("base = 1")
+    a, b = worker.fork_scope(), worker.fork_scope()
+    worker.run("y = base + 1", scope_token=a)
+    worker.run("z = base + 2", scope_token=b)
+    assert "y" not in worker.run("result = sorted(k for k in globals() if len(k) == 1)")["result"]
+    worker.merge_scope(a)
+    worker.merge_scope(b)
+    assert worker.run("result = (y, z)")["result"] == (2, 3)
+
+
+def test_wall_clock_limit_restarts_worker(worker):
+    worker.run("keep = 1")
+    res = worker.run("import time\ntime.sleep(10)", timeout_s=0.5)
+    assert not res["ok"] and "timed out" in res["error"]
+    assert worker.restarts == 1
+    assert worker.run("result = 'keep' in globals()")["result"] is False
+
+
+def test_cpu_and_memory_limits_restart_worker(worker):
+    res = worker.run("while True:\n    pass")
+    assert not res["ok"] and "CPU limit" in res["error"]
+    res = worker.run("import time\nblob = b'x' * (512 * 1024 * 1024)\ntime.sleep(5)")
+    assert not res["ok"] and "memory limit" in res["error"]
+    assert worker.restarts == 2
+    assert worker.run("result = 1 + 1")["result"] == 2
+
+
+def test_limits_do_not_leak_into_subprocesses(worker):
+    code = (
+        "import subprocess, sys\n"
+        "probe = 'import resource; print(resource.getrlimit(resource.RLIMIT_CPU), resource.getrlimit(resource.RLIMIT_AS))'\n"
+        "result = subprocess.run([sys.executable, '-c', probe], capture_output=True, text=True).stdout"
+    )
+    expected = f"{resource.getrlimit(resource.RLIMIT_CPU)} {resource.getrlimit(resource.RLIMIT_AS)}\n"
+    assert worker.run(code)["result"] == expected
+
+
+def test_unknown_scope_handle_replies_with_error(worker):
+    res = worker.run("x = 1", scope_token="missing", timeout_s=2)
+    assert not res["ok"] and "unknown scope handle" in res["error"]
+    assert worker.restarts == 0
+
+
+def test_restart_while_stdout_lock_is_held(worker):
+    # Forking while the lock is held must not leave it locked in the new worker.
+    with tool_executor._PROXY_LOCK:
+        worker.restart()
+    assert worker.run("print('ok')", timeout_s=2)["stdout"] == "ok\n"
+
+
+def test_tool_code_can_use_a_process_pool(worker, tmp_path):
+    for i in range(70):
+        (tmp_path / f"m{i}.py").write_text(f"def f{i}():\n    return {i}\n", encoding="utf-8")
+    code = (
+        "from pathlib import Path\n"
+        "from research_manager.tools.symbol_index import update_symbol_index\n"
+        f"base = Path({str(tmp_path)!r})\n"
+        "rels = sorted(p.name for p in base.glob('*.py'))\n"
+        "result = len(update_symbol_index(base, rels, base / 'index.json')['files'])"
+    )
+    res = worker.run(code, timeout_s=30)
+    assert res.get("result") == 70, res
+
+
+def test_interpreter_exit_stops_the_worker():
+    code = (
+        "from research_manager.tools.python_worker import PythonWorker\n"
+        "w = PythonWorker(lambda code, scope, emit: {'ok': True}, {}).start()\n"
+        "print(w.run('pass')['ok'])"
+    )
+    src = str(Path(__file__).resolve().parents[1] / "src")
+    out = subprocess.run([sys.executable, "-c", code], env={**os.environ, "PYTHONPATH": src}, capture_output=True, text=True, timeout=20)
+    assert out.stdout.strip() == "True"
@@ -0,0 +1,153 @@
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+import minimal_memory_chat as chat  # noqa: E402
+from research_manager.tools import repo_map  # noqa: E402
+from research_manager.tools.repo_map import build_repo_map, refresh_repo_map_state, update_repo_map_state  # noqa: E402
+
+
+def _touch(path, text="x"):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+
+
+def test_refresh_relists_only_changed_directories(tmp_path, monkeypatch):
+    _touch(tmp_path / "a" / "one.txt")
+    _touch(tmp_path / "b" / "two.txt")
+    _touch(tmp_path / ".git" / "HEAD")
+    state = refresh_repo_map_state(tmp_path)
+    assert state["stats"] == {"dirs_scanned": 3, "dirs_reused": 0}
+
+    listed = []
+    real_list_dir = repo_map._list_dir
+    monkeypatch.setattr(repo_map, "_list_dir", lambda p, s: listed.append(p) or real_list_dir(p, s))
+    _touch(tmp_path / "b" / "three.txt")
+    st = os.stat(tmp_path / "b")
+    os.utime(tmp_path / "b", ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+    state = refresh_repo_map_state(tmp_path, state)
+    assert listed == [str(tmp_path / "b")]
+    assert list(repo_map.iter_repo_files(state)) == ["a/one.txt", "b/three.txt", "b/two.txt"]
+
+
+def test_build_repo_map_reports_truncation_total(tmp_path):
+    for i in range(5):
+        _touch(tmp_path / f"f{i}.txt")
+    out = build_repo_map(tmp_path, max_files=3)
+    assert out["files"] == ["f0.txt", "f1.txt", "f2.txt"]
+    assert out["truncated"] is True
+    assert out["total_files"] == 5
+
+
+def test_update_repo_map_state_persists_and_reuses(tmp_path):
+    repo = tmp_path / "repo"
+    _touch(repo / "x" / "y.txt")
+    state_path = tmp_path / "state.json"
+    update_repo_map_state(repo, state_path)
+    again = update_repo_map_state(repo, state_path)
+    assert again["stats"] == {"dirs_scanned": 0, "dirs_reused": 2}
+
+
+def test_state_file_inside_tree_is_not_rewritten(tmp_path, monkeypatch):
+    _touch(tmp_path / "src" / "a.py")
+    state_path = tmp_path / "state" / "dev" / "generated" / "_repo_map_state.json"
+    update_repo_map_state(tmp_path, state_path)
+    saved = []
+    real_save = repo_map.save_repo_map_state
+    monkeypatch.setattr(repo_map, "save_repo_map_state", lambda p, s: saved.append(p) or real_save(p, s))
+
+    again = update_repo_map_state(tmp_path, state_path)
+    assert saved == [] and again["stats"]["dirs_scanned"] == 0
+    assert list(repo_map.iter_repo_files(again)) == ["src/a.py"]
+
+
+def test_gitignore_rules_prune_walk_and_hide_files(tmp_path):
+    _touch(tmp_path / ".gitignore", "checkpoints/\n*.log\n!keep.log\n")
+    _touch(tmp_path / "exp" / "checkpoints" / "model.pt")
+    _touch(tmp_path / "exp" / "run.log")
+    _touch(tmp_path / "exp" / "keep.log")
+    _touch(tmp_path / "exp" / ".rmignore", "/data\n")
+    _touch(tmp_path / "exp" / "data" / "big.bin")
+    _touch(tmp_path / "data" / "small.csv")
+
+    state = refresh_repo_map_state(tmp_path)
+    assert list(repo_map.iter_repo_files(state)) == ["data/small.csv", "exp/keep.log"]
+    assert "exp/checkpoints" not in state["dirs"]
+    assert "exp/data" not in state["dirs"]
+
+
+def test_file_table_queries(tmp_path):
+    _touch(tmp_path / "a.py", "x" * 10)
+    _touch(tmp_path / "b.py", "x" * 500)
+    _touch(tmp_path / "notes.md", "x" * 50)
+    old = tmp_path / "old.py"
+    _touch(old, "x")
+    os.utime(old, (0, 0))
+
+    table = repo_map.FileTable.from_state(refresh_repo_map_state(tmp_path))
+    assert len(table) == 4
+    assert [r["path"] for r in table.query(ext="py")] == ["a.py", "b.py", "old.py"]
+    assert [r["path"] for r in table.query(ext=[".py", ".md"], min_size=20)] == ["b.py", "notes.md"]
+    assert [r["path"] for r in table.query(ext="py", modified_within_s=3600)] == ["a.py", "b.py"]
+
+
+def test_query_repo_files_sees_in_place_edits(tmp_path, monkeypatch):
+    monkeypatch.setattr(chat, "BASE_DIR", str(tmp_path))
+    monkeypatch.setattr(chat, "REPO_MAP_STATE_PATH", str(tmp_path / "state" / "dev" / "generated" / "_repo_map_state.json"))
+    monkeypatch.setattr(chat, "_FILE_TABLE_CACHE", {})
+    data = tmp_path / "data.csv"
+    _touch(data, "x" * 10)
+    _touch(tmp_path / "state" / "dev" / "index.jsonl")
+    assert [r["path"] for r in chat.query_repo_files(min_size=100)] == []
+
+    st = os.stat(tmp_path)
+    data.write_text("x" * 1000, encoding="utf-8")
+    os.utime(tmp_path, ns=(st.st_atime_ns, st.st_mtime_ns))
+    rows = chat.query_repo_files(min_size=100)
+    assert [(r["path"], r["size"]) for r in rows] == [("data.csv", 1000)]
+
+
+def test_concurrent_saves_use_separate_temp_files(tmp_path):
+    import threading
+
+    state_path = tmp_path / "state" / "map.json"
+    errors = []
+
+    def save(i):
+        try:
+            for _ in range(50):
+                repo_map.save_repo_map_state(state_path, {"n": i})
+        except Exception as exc:  # noqa: BLE001
+            errors.append(exc)
+
+    threads = [threading.Thread(target=save, args=(i,)) for i in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == []
+    assert [p.name for p in state_path.parent.iterdir()] == ["map.json"]
+
+
+def test_tools_read_the_running_watchers_state(tmp_path, monkeypatch):
+    state_path = tmp_path / "state" / "map.json"
+    monkeypatch.setattr(chat, "BASE_DIR", str(tmp_path))
+    monkeypatch.setattr(chat, "REPO_MAP_STATE_PATH", str(state_path))
+    monkeypatch.setattr(chat, "_FILE_TABLE_CACHE", {})
+    data = tmp_path / "data.csv"
+    _touch(data, "x" * 10)
+    watcher = repo_map.RepoMapWatcher(tmp_path, state_path, interval_s=60)
+    watcher.start()
+    monkeypatch.setattr(chat, "_REPO_MAP_WATCHER", watcher)
+    try:
+        while watcher.state is None:
+            watcher.join(0.01)
+        monkeypatch.setattr(repo_map, "update_repo_map_state", lambda *a, **k: 1 / 0)
+        assert chat._repo_map_state() is watcher.state
+        data.write_text("x" * 1000, encoding="utf-8")
+        rows = chat.query_repo_files(min_size=100)
+        assert [(r["path"], r["size"]) for r in rows] == [("data.csv", 1000)]
+    finally:
+        watcher.stop(timeout=5)
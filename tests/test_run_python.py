@@ -0,0 +1,81 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+import minimal_memory_chat as chat  # noqa: E402
+
+
+@pytest.fixture
+def runtime(tmp_path, monkeypatch):
+    instructions = tmp_path / "instructions.md"
+    instructions.write_text("rules", encoding="utf-8")
+    env = tmp_path / ".env"
+    env.write_text("RM_TEST_VALUE=one\n", encoding="utf-8")
+    monkeypatch.setattr(chat, "INSTRUCTIONS_PATH", str(instructions))
+    monkeypatch.setattr(chat, "ENV_PATH", str(env))
+    monkeypatch.setattr(chat, "INDEX_PATH", str(tmp_path / "index.jsonl"))
+    monkeypatch.delenv("RM_TEST_VALUE", raising=False)
+    return instructions, env
+
+
+def test_setup_is_cached_until_files_change(runtime):
+    instructions, env = runtime
+    scope = {}
+    assert chat.run_python("result = get_env('RM_TEST_VALUE')", scope)["result"] == "one"
+    before = chat.tool_runtime_stats()
+    for _ in range(5):
+        assert chat.run_python("result = 1", scope)["ok"]
+    after = chat.tool_runtime_stats()
+    assert after["env_reloads"] == before["env_reloads"]
+    assert after["instructions_reads"] == before["instructions_reads"]
+    assert after["calls"] == before["calls"] + 5
+    assert after["avg_overhead_ms"] is not None
+
+    env.write_text("RM_TEST_VALUE=two-changed\n", encoding="utf-8")
+    assert chat.run_python("result = get_env('RM_TEST_VALUE')", scope)["result"] == "two-changed"
+    assert chat.tool_runtime_stats()["env_reloads"] == after["env_reloads"] + 1
+
+
+def test_instructions_tampering_is_reverted(runtime):
+    instructions, _ = runtime
+    code = f"open({str(instructions)!r}, 'w').write('hacked')"
+    res = chat.run_python(code, {})
+    assert not res["ok"] and "instructions.md" in res["error"]
+    assert instructions.read_text(encoding="utf-8") == "rules"
+
+    os.remove(instructions)
+    instructions.write_text("rules v2", encoding="utf-8")  # edited between calls: new baseline
+    assert chat.run_python(f"os.remove({str(instructions)!r})", {})["ok"] is False
+    assert instructions.read_text(encoding="utf-8") == "rules v2"
+
+
+def test_overlapping_calls_keep_the_original_baseline(runtime):
+    import threading
+
+    instructions, _ = runtime
+    started, release = threading.Event(), threading.Event()
+    scope = {"started": started, "release": release}
+    results = {}
+    slow = threading.Thread(
+        target=lambda: results.setdefault("slow", chat.run_python("started.set(); release.wait(5)", scope))
+    )
+    slow.start()
+    try:
+        assert started.wait(5)
+        # A second call overlaps the first and tampers with the file; the first is still running.
+        instructions.write_text("hacked", encoding="utf-8")
+        res = chat.run_python("result = 1", {})
+        assert not res["ok"] and "instructions.md" in res["error"]
+        assert instructions.read_text(encoding="utf-8") == "rules"
+
+        instructions.write_text("hacked again", encoding="utf-8")
+    finally:
+        release.set()
+        slow.join(5)
+    assert not results["slow"]["ok"]
+    assert instructions.read_text(encoding="utf-8") == "rules"
+    assert chat.run_python("result = 2", {})["result"] == 2
+    assert instructions.read_text(encoding="utf-8") == "rules"
@@ -0,0 +1,107 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+import minimal_memory_chat as chat  # noqa: E402
+from research_manager.state.sessions import SessionRegistry  # noqa: E402
+
+
+def _history(registry, session_id):
+    with chat.use_session(chat.open_session(session_id, registry=registry)):
+        return [e["content"] for e in chat.read_index_entries()]
+
+
+def _say(registry, session_id, *messages):
+    with chat.use_session(chat.open_session(session_id, registry=registry)):
+        for m in messages:
+            chat.append_message("user", m)
+
+
+def test_fork_shares_history_segments_and_diverges(tmp_path):
+    registry = SessionRegistry(tmp_path)
+    registry.create("main")
+    _say(registry, "main", "a", "b")
+    child = registry.fork("main", "child")
+    grandchild = registry.fork("child", "grandchild")
+
+    assert child["parent"] == "main" and len(child["segments"]) == 1
+    # An empty live tail adds no segment: the grandchild reuses the child's.
+    assert grandchild["segments"] == child["segments"]
+    assert len(list((tmp_path / "segments").iterdir())) == 1
+
+    _say(registry, "main", "main-only")
+    _say(registry, "child", "child-only")
+    assert _history(registry, "main") == ["a", "b", "main-only"]
+    assert _history(registry, "child") == ["a", "b", "child-only"]
+    assert _history(registry, "grandchild") == ["a", "b"]
+
+
+def test_rewriting_a_forked_history_copies_it(tmp_path):
+    registry = SessionRegistry(tmp_path)
+    registry.create("main")
+    _say(registry, "main", "a", "b")
+    registry.fork("main", "child")
+    _say(registry, "child", "c")
+
+    with chat.use_session(chat.open_session("child", registry=registry)):
+        assert chat.delete_index_line(1)
+    assert registry.get("child")["segments"] == []
+    assert _history(registry, "child") == ["b", "c"]
+    assert _history(registry, "main") == ["a", "b"]
+
+
+def test_list_and_switch_use_only_the_registry(tmp_path):
+    registry = SessionRegistry(tmp_path)
+    registry.create("old")
+    registry.create("new")
+    _say(registry, "new", "hello")
+    registry.touch("new")
+    for session_id in ("old", "new"):
+        registry.paths(session_id).index_jsonl.unlink()
+
+    listed = registry.list()
+    assert [s["id"] for s in listed] == ["new", "old"]
+    assert listed[0]["size_bytes"] > 0
+    registry.switch("old")
+    assert registry.current() == "old"
+    with pytest.raises(KeyError):
+        registry.switch("missing")
+    with pytest.raises(ValueError):
+        registry.create("../escape")
+
+
+def test_switch_command_does_not_create_sessions(tmp_path, monkeypatch, capsys):
+    registry = SessionRegistry(tmp_path)
+    monkeypatch.setattr(chat, "session_registry", lambda: registry)
+    monkeypatch.setattr(chat, "_DEFAULT_SESSION", None)
+    monkeypatch.setattr(chat, "_PYTHON_WORKER", None)
+
+    assert chat._session_command("/switch typo")
+    assert "Unknown session" in capsys.readouterr().out
+    assert registry.get("typo") is None and chat._DEFAULT_SESSION is None
+
+    chat._session_command("/new main")
+    chat._session_command("/fork child")
+    assert {s["id"] for s in registry.list()} == {"child", "main"} and registry.current() == "child"
+    chat._session_command("/switch main")
+    assert chat._DEFAULT_SESSION.session_id == "main" and registry.current() == "main"
+
+
+def test_context_helpers_prune_a_forked_session(tmp_path, monkeypatch):
+    from research_manager.tools.context_manager import prune_index_keep_last_messages, snapshot_index
+
+    monkeypatch.setattr(chat, "BASE_DIR", str(tmp_path))
+    registry = SessionRegistry(tmp_path / "sessions")
+    registry.create("main")
+    _say(registry, "main", "a", "b", "c")
+    registry.fork("main", "child")
+    _say(registry, "child", "d")
+
+    with chat.use_session(chat.open_session("child", registry=registry)):
+        paths = chat.context_paths()
+        assert snapshot_index(paths)["count"] == 4
+        assert prune_index_keep_last_messages(paths, keep_last=2)["original"] == 4
+    assert _history(registry, "child") == ["c", "d"]
+    assert _history(registry, "main") == ["a", "b", "c"]
@@ -0,0 +1,71 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+# Cumulative import time of the chat entry point; generous enough for slow CI
+# machines, but an eager `import openai` alone costs more than this.
+STARTUP_BUDGET_MS = float(os.getenv("RM_STARTUP_BUDGET_MS", "300"))
+HEAVY_MODULES = ("openai", "requests", "fitz", "dotenv")
+
+
+def _python(code, *flags):
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join([str(ROOT / "src"), str(ROOT)])}
+    return subprocess.run([sys.executable, *flags, "-c", code], cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+
+
+def _cumulative_us(importtime_stderr, module):
+    for line in importtime_stderr.splitlines():
+        parts = [p.strip() for p in line.split("|")]
+        if len(parts) == 3 and parts[2] == module:
+            return int(parts[1])
+    raise AssertionError(f"{module} not found in -X importtime output")
+
+
+def test_chat_entry_point_imports_within_budget():
+    best = min(
+        _cumulative_us(_python("import minimal_memory_chat", "-X", "importtime").stderr, "minimal_memory_chat")
+        for _ in range(3)
+    )
+    assert best / 1000 < STARTUP_BUDGET_MS, f"startup import took {best / 1000:.1f} ms"
+
+
+def test_heavy_dependencies_are_not_executed_at_import():
+    code = (
+        "import minimal_memory_chat, research_manager.clients.semantic_scholar\n"
+        "from research_manager.lazy_imports import is_loaded\n"
+        f"print([n for n in {HEAVY_MODULES!r} if is_loaded(n)])"
+    )
+    assert _python(code).stdout.strip() == "[]"
+
+
+def test_lazy_module_loads_on_first_attribute_access():
+    code = (
+        "from research_manager.lazy_imports import is_loaded, lazy_import\n"
+        "m = lazy_import('json.tool')\n"
+        "before = is_loaded('json.tool')\n"
+        "m.main\n"
+        "print(before, is_loaded('json.tool'))"
+    )
+    assert _python(code).stdout.strip() == "False True"
+
+
+def test_lazy_module_first_access_is_thread_safe():
+    code = (
+        "import threading\n"
+        "from research_manager.lazy_imports import lazy_import\n"
+        "m = lazy_import('http.cookiejar')\n"
+        "barrier, errors = threading.Barrier(8), []\n"
+        "def use():\n"
+        "    barrier.wait()\n"
+        "    try:\n"
+        "        m.CookieJar().clear()\n"
+        "    except Exception as exc:\n"
+        "        errors.append(repr(exc))\n"
+        "threads = [threading.Thread(target=use) for _ in range(8)]\n"
+        "[t.start() for t in threads]\n"
+        "[t.join() for t in threads]\n"
+        "print(errors)"
+    )
+    assert _python(code).stdout.strip() == "[]"
@@ -15,3 +15,10 @@ def test_default_state_paths_uses_prod(monkeypatch):
     assert paths.env_name == "prod"
     assert str(paths.index_jsonl).endswith("state/prod/index.jsonl")
     assert str(paths.generated_dir).endswith("state/prod/generated")
+
+
+def test_session_paths_are_nested_under_sessions(monkeypatch):
+    monkeypatch.delenv("RM_ENV", raising=False)
+    paths = default_state_paths().session("topic-a")
+    assert str(paths.index_jsonl).endswith("state/dev/sessions/topic-a/index.jsonl")
+    assert paths.response_chain.parent == paths.session_dir
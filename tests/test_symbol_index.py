@@ -0,0 +1,37 @@
+from research_manager.tools import symbol_index
+from research_manager.tools.symbol_index import extract_symbols, find_symbols, module_name_for, update_symbol_index
+
+
+def test_extract_symbols_qualnames_and_lines():
+    src = "class A:\n    def m(self):\n        pass\n\nasync def f():\n    def inner():\n        pass\n"
+    syms = {s["qualname"]: s for s in extract_symbols(src, "pkg.mod")}
+    assert syms["pkg.mod"]["kind"] == "module"
+    assert syms["pkg.mod.A"]["kind"] == "class"
+    assert syms["pkg.mod.A.m"]["kind"] == "method"
+    assert (syms["pkg.mod.f"]["line"], syms["pkg.mod.f"]["end_line"]) == (5, 7)
+    assert syms["pkg.mod.f.inner"]["kind"] == "function"
+
+
+def test_module_name_for_strips_src_and_init():
+    assert module_name_for("src/research_manager/tools/__init__.py") == "research_manager.tools"
+    assert module_name_for("scripts/run.py") == "scripts.run"
+
+
+def test_update_is_incremental_and_queryable(tmp_path, monkeypatch):
+    (tmp_path / "a.py").write_text("def alpha():\n    pass\n", encoding="utf-8")
+    (tmp_path / "b.py").write_text("class Beta:\n    pass\n", encoding="utf-8")
+    index_path = tmp_path / "_symbol_index.json"
+
+    index = update_symbol_index(tmp_path, ["a.py", "b.py"], index_path, pool_threshold=1)
+    assert index["stats"] == {"files": 2, "checked": 2, "parsed": 2}
+    assert find_symbols(index, "alpha", exact=True)[0]["path"] == "a.py"
+
+    parsed = []
+    real = symbol_index.extract_symbols
+    monkeypatch.setattr(symbol_index, "extract_symbols", lambda s, m: parsed.append(m) or real(s, m))
+    (tmp_path / "b.py").write_text("class Beta:\n    def gamma(self):\n        pass\n", encoding="utf-8")
+    index = update_symbol_index(tmp_path, ["a.py", "b.py"], index_path)
+
+    assert parsed == ["b"]
+    assert [h["qualname"] for h in find_symbols(index, "gamma")] == ["b.Beta.gamma"]
+    assert find_symbols(index, "Beta", kind="class", exact=True)[0]["line"] == 1
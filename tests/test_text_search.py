@@ -0,0 +1,52 @@
+import pytest
+
+from research_manager.tools import fs_utils, text_search
+from research_manager.tools.text_search import TrigramIndex, required_literal, search_files
+
+
+def test_required_literal_from_regex():
+    assert required_literal("a.b", False) == "a.b"
+    assert required_literal(r"foo.*barbaz", True) == "barbaz"
+    assert required_literal(r"self\.play", True) == "self.play"
+    assert required_literal(r"\d+ epochs", True) == " epochs"
+    assert required_literal(r"a{2,3}bcd", True) == "bcd"
+    assert required_literal("x|y", True) == ""
+
+
+def test_search_uses_index_and_reindexes_changed_files(tmp_path):
+    a = tmp_path / "a.md"
+    b = tmp_path / "b.md"
+    a.write_text("intro\nverifier-based self-play\noutro\n", encoding="utf-8")
+    b.write_text("nothing relevant here\n", encoding="utf-8")
+    index = TrigramIndex(tmp_path / "_trigram_index.json")
+    files = [str(a), str(b)]
+
+    res = search_files(index, "Self-Play", files)
+    assert res["files_scanned"] == 1
+    assert res["hits"] == [
+        {"path": str(a), "line": 2, "text": "verifier-based self-play", "context": ["intro", "verifier-based self-play", "outro"]}
+    ]
+
+    b.write_text("now b mentions self-play too\n", encoding="utf-8")
+    res = search_files(TrigramIndex(tmp_path / "_trigram_index.json"), r"self-pl\w+", files, regex=True, context=0)
+    assert res["reindexed"] == 1
+    assert [(h["path"], h["line"]) for h in res["hits"]] == [(str(a), 2), (str(b), 1)]
+
+
+def test_oversized_files_are_scanned_without_index(tmp_path):
+    big = tmp_path / "big.log"
+    big.write_text("x" * 100 + "\nneedle\n", encoding="utf-8")
+    index = TrigramIndex(None, max_index_bytes=10)
+    res = search_files(index, "needle", [str(big)], context=0)
+    assert [h["line"] for h in res["hits"]] == [2]
+
+
+def test_search_text_respects_allowed_roots(tmp_path, monkeypatch):
+    monkeypatch.setattr(fs_utils, "repo_base", lambda: tmp_path)
+    monkeypatch.setattr(fs_utils, "_TRIGRAM_INDEX", text_search.TrigramIndex(None))
+    (tmp_path / "memory").mkdir()
+    (tmp_path / "memory" / "m.md").write_text("alpha\nbeta\n", encoding="utf-8")
+    res = fs_utils.search_text("beta", roots=["memory"])
+    assert [(h["path"], h["line"]) for h in res["hits"]] == [("memory/m.md", 2)]
+    with pytest.raises(ValueError):
+        fs_utils.search_text("beta", roots=["../elsewhere"])
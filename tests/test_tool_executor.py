@@ -0,0 +1,89 @@
+import io
+import json
+import threading
+import time
+from types import SimpleNamespace
+
+from research_manager.tools.tool_executor import ToolExecutor, capture_stdout, code_names
+
+
+def _call(call_id, code):
+    return SimpleNamespace(name="python", call_id=call_id, arguments=json.dumps({"code": code}))
+
+
+def _run(call, scope):
+    code = json.loads(call.arguments)["code"]
+    exec(code, scope, scope)
+    return {"ok": True, "result": scope.get("result")}
+
+
+def test_code_names_flags_state_touching_calls():
+    assert code_names("append_message('user', 'hi')")[2]
+    assert code_names("open('x', 'w').write('y')")[2]
+    assert code_names("p.write_text('y')")[2]
+    assert code_names("def (")[2]
+    loads, stores, serial = code_names("import time\nx = s2_search_papers(q)\ndef f(): pass")
+    assert not serial
+    assert loads == {"s2_search_papers", "q"}
+    assert stores == {"x", "time", "f"}
+
+
+def test_independent_calls_run_concurrently_and_log_in_order():
+    logged = []
+    scope = {"time": time}
+    ex = ToolExecutor(_run, logged.append, scope)
+    start = time.monotonic()
+    for i in range(4):
+        ex.submit(_call(f"c{i}", f"time.sleep(0.3)\nv{i} = {i}\nresult = {i}"))
+    outputs = ex.finish()
+    elapsed = time.monotonic() - start
+
+    assert elapsed < 0.9  # sequential would take 1.2s
+    assert [o["call_id"] for o in outputs] == ["c0", "c1", "c2", "c3"]
+    assert [i["call_id"] for i in logged] == ["c0", "c0", "c1", "c1", "c2", "c2", "c3", "c3"]
+    assert [i["type"] for i in logged[:2]] == ["function_call", "function_call_output"]
+    assert all(i["duration_s"] >= 0.3 for i in logged if i["type"] == "function_call_output")
+    assert [scope[f"v{i}"] for i in range(4)] == [0, 1, 2, 3]
+    assert scope["result"] == 3  # merged in call order
+    assert len(ex.durations) == 4
+
+
+def test_dependent_and_serial_calls_wait_for_earlier_calls():
+    logged = []
+    scope = {"time": time, "events": [], "append_item": None}
+    ex = ToolExecutor(_run, logged.append, scope)
+    ex.submit(_call("a", "time.sleep(0.2)\nx = 5"))
+    ex.submit(_call("b", "result = x * 2"))  # reads x -> waits for a
+    ex.submit(_call("c", "events.append(1)\nappend_item"))  # state-touching helper -> serial
+    assert [i["call_id"] for i in logged] == ["a", "a", "b", "b", "c", "c"]
+    outputs = ex.finish()
+    assert [o["call_id"] for o in outputs] == ["a", "b", "c"]
+    assert json.loads(outputs[1]["output"])["result"] == 10
+
+
+def test_parallel_disabled_runs_in_shared_scope():
+    scope = {}
+    ex = ToolExecutor(_run, lambda item: None, scope, parallel=False)
+    ex.submit(_call("a", "y = 1"))
+    assert scope["y"] == 1  # ran inline, before finish()
+    ex.finish()
+
+
+def test_capture_stdout_is_per_thread(capsys):
+    bufs = [io.StringIO() for _ in range(3)]
+
+    def work(i):
+        with capture_stdout(bufs[i]):
+            for _ in range(50):
+                print(f"t{i}")
+                time.sleep(0)
+
+    threads = [threading.Thread(target=work, args=(i,)) for i in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    for i, buf in enumerate(bufs):
+        assert buf.getvalue() == f"t{i}\n" * 50
+    print("main")
+    assert capsys.readouterr().out == "main\n"
@@ -0,0 +1,98 @@
+import contextvars
+import json
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+import minimal_memory_chat as chat  # noqa: E402
+from research_manager import tracing  # noqa: E402
+from research_manager.app.__main__ import main as app_main  # noqa: E402
+from research_manager.clients.rate_limit import RateLimiter, TTLCache, cached_call  # noqa: E402
+from research_manager.testing.fake_responses import FakeReply, FakeResponsesClient  # noqa: E402
+from research_manager.tools.python_worker import PythonWorker  # noqa: E402
+
+
+@pytest.fixture
+def metrics(tmp_path):
+    path = tmp_path / "metrics.jsonl"
+    tracing.configure(path)
+    yield path
+    tracing.configure(None)
+
+
+def _records(path):
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def test_spans_nest_follow_threads_and_record_errors(metrics):
+    with tracing.turn(session="s") as turn_span:
+        with tracing.span("outer", bytes=10) as outer:
+            ctx = contextvars.copy_context()
+            worker = threading.Thread(target=ctx.run, args=(lambda: tracing.current_span().set(cache_hit=True),))
+            worker.start()
+            worker.join()
+        with pytest.raises(KeyError), tracing.span("failing"):
+            raise KeyError("x")
+    tracing.current_span().set(ignored=True)
+
+    recs = {r["name"]: r for r in _records(metrics)}
+    assert recs["outer"]["parent"] == turn_span.span_id and recs["outer"]["cache_hit"] is True
+    assert recs["failing"]["ok"] is False and recs["failing"]["error"] == "KeyError"
+    assert recs["outer"]["turn"] == recs["failing"]["turn"] == recs["turn"]["turn"] is not None
+    assert recs["outer"]["span"] == outer.span_id
+
+
+def test_cached_call_annotates_enclosing_span(metrics):
+    cache, limiter = TTLCache(ttl_s=60), RateLimiter(0)
+    for _ in range(2):
+        with tracing.span("s2.request"):
+            cached_call(cache, limiter, "k", lambda: {"ok": True})
+    assert [r["cache_hit"] for r in _records(metrics)] == [False, True]
+
+
+def _traced_run(code, scope, emit):
+    with tracing.span("inside.worker"):
+        exec(code, scope, scope)
+    return {"ok": True}
+
+
+def test_worker_spans_join_the_calling_turn(metrics):
+    worker = PythonWorker(_traced_run, {}, timeout_s=5).start()
+    try:
+        with tracing.turn() as turn_span, tracing.span("tool.call") as call:
+            assert worker.run("x = 1")["ok"]
+    finally:
+        worker.close()
+    recs = {r["name"]: r for r in _records(metrics)}
+    assert recs["python_worker.exec"]["parent"] == call.span_id
+    assert recs["inside.worker"]["parent"] == recs["python_worker.exec"]["span"]
+    assert recs["inside.worker"]["turn"] == recs["turn"]["turn"] and recs["turn"]["span"] == turn_span.span_id
+
+
+def test_chat_turn_metrics_report(metrics, tmp_path, monkeypatch, capsys):
+    index = tmp_path / "index.jsonl"
+    index.write_text("", encoding="utf-8")
+    instructions = tmp_path / "instructions.md"
+    instructions.write_text("be brief", encoding="utf-8")
+    monkeypatch.setattr(chat, "INDEX_PATH", str(index))
+    monkeypatch.setattr(chat, "INSTRUCTIONS_PATH", str(instructions))
+    monkeypatch.setattr(chat, "RESPONSE_CHAIN_PATH", str(tmp_path / "chain.json"))
+    monkeypatch.setattr(chat, "_PYTHON_WORKER", None)
+    client = FakeResponsesClient([FakeReply(calls=["1 + 1"]), FakeReply(text="2"), FakeReply(text="bye")])
+    chat.run_turn(client, "m", "add")
+    chat.run_turn(client, "m", "thanks")
+
+    records = _records(metrics)
+    summary = tracing.summarize_metrics(records)
+    assert summary["turn"]["count"] == 2 and summary["model.request"]["count"] == 3
+    assert summary["tool.call"]["count"] == 1 and summary["history.read"]["bytes"] > 0
+    slowest = tracing.slowest_turns(records, top=1)[0]
+    assert set(slowest["stages"]) == set(chat.TURN_STAGES) and "model.request" in slowest["spans"]
+
+    capsys.readouterr()
+    assert app_main(["metrics", "--path", str(metrics), "--top", "1"]) == 0
+    out = capsys.readouterr().out
+    assert "tool.call" in out and "Slowest turns:" in out and "stages:" in out